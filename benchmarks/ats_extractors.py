@@ -0,0 +1,90 @@
+# Standard
+import json
+import logging
+from pathlib import Path
+
+# Stages under benchmark
+from scraping_pipelines.scrape_company_jobs.ats_extractors import ATS_EXTRACTORS, find_ats_board, ats_job_postings
+
+# Result objects
+from graph.result_dataclasses.job_posting import JobPosting
+
+# Benchmark utilities
+from benchmarks.corpus_server import serve_corpus
+from benchmarks.harness import StageTimer
+
+
+# Versioned corpora of recorded API responses of ATS job boards, with the postings expected from every response
+ATS_CORPUS_PATH: Path = Path(__file__).parent / "ats_corpus"
+ATS_CORPUS_VERSION: str = "v1"
+
+
+def load_ats_manifest(corpus_path: Path = ATS_CORPUS_PATH / ATS_CORPUS_VERSION) -> list[dict[str, any]]:
+    """
+    Load the job boards of an ATS corpus.
+
+    :param corpus_path: Directory of the corpus version
+    :return: Path of the recorded response, provider, URL of the board and expected postings of every job board
+    """
+    with open(corpus_path / "manifest.json", "r") as file:
+        return json.load(file)["boards"]
+
+
+def run_ats_extractor_benchmark(
+        timer: StageTimer,
+        repeat: int = 20,
+        corpus_path: Path = ATS_CORPUS_PATH / ATS_CORPUS_VERSION
+) -> list[str]:
+    """
+    Replay the recorded API responses of the ATS job boards from a local HTTP server. Checks that every board URL
+    is routed to its provider and that the extractor reads the recorded postings, and times the routing,
+    the extraction over HTTP and the parsing of the response alone per provider.
+
+    :param timer: Timer to add the measurements to
+    :param repeat: Number of times every board is extracted
+    :param corpus_path: Directory of the corpus version
+    :return: Description of every board that is routed or extracted differently than recorded
+    """
+    mismatches: list[str] = []
+    boards: list[dict[str, any]] = load_ats_manifest(corpus_path)
+    with serve_corpus(corpus_path) as base_url:
+        for board in boards:
+            provider: str = board["provider"]
+            for _ in range(repeat):
+                with timer.measure("find_ats_board"):
+                    ats_board: tuple[str, str] | None = find_ats_board(board["board_url"])
+            if ats_board is None or ats_board[0] != provider:
+                mismatches.append(f"{board['board_url']} is routed to {ats_board}, expected {provider}")
+                continue
+
+            # The local server stands in for the API endpoint of the provider
+            api_url: str = f"{base_url}/{board['path']}"
+            for _ in range(repeat):
+                with timer.measure(f"ats_fetch_{provider}"):
+                    job_postings: list[JobPosting] = ats_job_postings(provider, api_url, company_id=0)
+
+            posting_records: list[dict[str, any]] = [
+                {column: value for column, value in job_posting.as_record().items() if column != "company_id"}
+                for job_posting in job_postings
+            ]
+            if posting_records != board["postings"]:
+                mismatches.append(f"{provider}: extracted {posting_records}, recorded {board['postings']}")
+
+            with open(corpus_path / board["path"], "r") as file:
+                response: any = json.load(file)
+            for _ in range(repeat):
+                with timer.measure(f"ats_parse_{provider}"):
+                    ATS_EXTRACTORS[provider].parse(response, 0)
+
+    for mismatch in mismatches:
+        logging.warning(f"ATS extraction: {mismatch}")
+
+    return mismatches
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    ats_timer = StageTimer()
+    run_ats_extractor_benchmark(ats_timer)
+    for stage, stage_result in ats_timer.results().items():
+        logging.info(f"{stage:<24} {stage_result['throughput']:>10.1f} items/s p95 {stage_result['p95_ms']:.3f} ms")
@@ -0,0 +1,62 @@
+# Standard
+import json
+import logging
+import threading
+from pathlib import Path
+from functools import partial
+from typing import Iterator
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+
+# Versioned corpora of recorded VC pages, a new version is added when pages are added or changed
+CORPUS_PATH: Path = Path(__file__).parent / "corpus"
+CORPUS_VERSION: str = "v1"
+
+
+def load_manifest(corpus_path: Path = CORPUS_PATH / CORPUS_VERSION) -> list[dict[str, str]]:
+    """
+    Load the pages of a corpus.
+
+    :param corpus_path: Directory of the corpus version
+    :return: Path, kind (home, portfolio or subpage) and domain of every page
+    """
+    with open(corpus_path / "manifest.json", "r") as file:
+        return json.load(file)["pages"]
+
+
+class _QuietRequestHandler(SimpleHTTPRequestHandler):
+    """Serves the corpus files without logging every request, which would distort the timings."""
+    def log_message(self, format: str, *args):
+        pass
+
+
+@contextmanager
+def serve_corpus(corpus_path: Path = CORPUS_PATH / CORPUS_VERSION) -> Iterator[str]:
+    """
+    Serve the pages of a corpus from a local HTTP server on a free port, so the scrapers can replay
+    the recorded pages without network access.
+
+    :param corpus_path: Directory of the corpus version
+    :return: Base URL of the server, the path of a page in the manifest is appended to it
+    """
+    request_handler = partial(_QuietRequestHandler, directory=str(corpus_path))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), request_handler)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    from urllib.request import urlopen
+
+    logging.basicConfig(level=logging.INFO)
+    with serve_corpus() as base_url:
+        for page in load_manifest():
+            with urlopen(f"{base_url}/{page['path']}") as response:
+                logging.info(f"{page['kind']} page {page['path']}: {len(response.read())} bytes")
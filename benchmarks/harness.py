@@ -0,0 +1,144 @@
+# Standard
+import sys
+import json
+import time
+import logging
+import resource
+from pathlib import Path
+from typing import Iterator
+from contextlib import contextmanager
+from collections import defaultdict
+
+
+# Baseline the results of a benchmark run are compared against
+BASELINE_PATH: Path = Path(__file__).parent / "baseline.json"
+
+
+def percentile(durations: list[float], fraction: float) -> float:
+    """
+    Percentile of the durations with linear interpolation between the closest ranks.
+
+    :param durations: Measured durations
+    :param fraction: Percentile as a fraction, e.g. 0.95
+    :return: Duration at the percentile, 0 when nothing was measured
+    """
+    if not durations:
+        return 0.0
+
+    sorted_durations: list[float] = sorted(durations)
+    rank: float = fraction * (len(sorted_durations) - 1)
+    lower: int = int(rank)
+    upper: int = min(lower + 1, len(sorted_durations) - 1)
+    return sorted_durations[lower] + (sorted_durations[upper] - sorted_durations[lower]) * (rank - lower)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the process in megabytes."""
+    peak_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+
+
+class StageTimer:
+    """
+    Collects the duration of every item processed by each stage of a benchmark.
+    """
+    def __init__(self):
+        self.durations: defaultdict[str, list[float]] = defaultdict(list)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """
+        Time the processing of a single item by a stage.
+
+        :param stage: Name of the stage
+        """
+        start_time: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[stage].append(time.perf_counter() - start_time)
+
+    def results(self) -> dict[str, dict[str, float]]:
+        """
+        Summarize the durations per stage.
+
+        :return: Number of items, throughput in items per second and p50/p95 latency in milliseconds per stage
+        """
+        stage_results: dict[str, dict[str, float]] = {}
+        for stage, durations in self.durations.items():
+            total_time: float = sum(durations)
+            stage_results[stage] = {
+                "items": len(durations),
+                "throughput": len(durations) / total_time if total_time else 0.0,
+                "p50_ms": percentile(durations, 0.50) * 1000,
+                "p95_ms": percentile(durations, 0.95) * 1000,
+            }
+
+        return stage_results
+
+
+def log_results(results: dict[str, any]):
+    """Log the results of a benchmark run, one line per stage."""
+    for stage, stage_result in results["stages"].items():
+        logging.info(
+            f"{stage:<32} {stage_result['items']:>6} items {stage_result['throughput']:>10.1f} items/s "
+            f"p50 {stage_result['p50_ms']:>9.3f} ms p95 {stage_result['p95_ms']:>9.3f} ms"
+        )
+    logging.info(f"Peak RSS: {results['peak_rss_mb']:.1f} MB")
+
+
+def save_baseline(results: dict[str, any], baseline_path: Path = BASELINE_PATH):
+    """Store the results of a benchmark run as the baseline."""
+    with open(baseline_path, "w") as file:
+        json.dump(results, file, indent=4)
+
+
+def compare_to_baseline(
+        results: dict[str, any],
+        baseline_path: Path = BASELINE_PATH,
+        tolerance: float = 0.25
+) -> list[str]:
+    """
+    Compare the latencies and peak memory of a benchmark run to the baseline.
+
+    :param results: Results of the benchmark run
+    :param baseline_path: File of the baseline results
+    :param tolerance: Fraction a measurement may exceed the baseline before it counts as a regression
+    :return: Description of every regression, empty when there is no baseline or no regression
+    """
+    # Slowdowns of sub-millisecond stages below this difference are timer noise
+    MIN_DIFFERENCE_MS: float = 0.1
+
+    if not baseline_path.exists():
+        logging.info(f"No baseline at {baseline_path}, skipping the comparison")
+        return []
+
+    with open(baseline_path, "r") as file:
+        baseline: dict[str, any] = json.load(file)
+
+    if baseline.get("corpus") != results.get("corpus"):
+        logging.warning(f"Baseline was measured on corpus {baseline.get('corpus')}, not {results.get('corpus')}")
+
+    regressions: list[str] = []
+    for stage, stage_result in results["stages"].items():
+        baseline_stage: dict[str, float] | None = baseline["stages"].get(stage)
+        if baseline_stage is None:
+            continue
+
+        for metric in ("p50_ms", "p95_ms"):
+            if (
+                    stage_result[metric] > baseline_stage[metric] * (1 + tolerance)
+                    and stage_result[metric] - baseline_stage[metric] > MIN_DIFFERENCE_MS
+            ):
+                regressions.append(
+                    f"{stage} {metric}: {stage_result[metric]:.3f} ms, baseline {baseline_stage[metric]:.3f} ms"
+                )
+
+    if results["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + tolerance):
+        regressions.append(f"peak RSS: {results['peak_rss_mb']:.1f} MB, baseline {baseline['peak_rss_mb']:.1f} MB")
+
+    for regression in regressions:
+        logging.warning(f"Regression: {regression}")
+
+    return regressions
@@ -0,0 +1,92 @@
+# Standard
+import os
+import sys
+import logging
+import subprocess
+from pathlib import Path
+
+
+REPOSITORY_PATH: Path = Path(__file__).parent.parent
+# Modules loaded when a pipeline or graph is started from the command line
+ENTRY_MODULES: tuple[str, ...] = (
+    "scraping_pipelines.run",
+    "scraping_pipelines.scrape_vc_home_page.main",
+    "scraping_pipelines.scrape_vc_portfolio_page.main",
+    "scraping_pipelines.scrape_vc_portfolio_page.streaming_pipeline",
+    "graph.scraper_graph",
+    "graph.node",
+)
+# Packages which must only be imported once they are used
+HEAVY_PACKAGES: tuple[str, ...] = ("openai", "playwright", "bs4", "pg8000")
+
+
+def measure_import_time(module_name: str, repeat: int = 5) -> tuple[float, set[str]]:
+    """
+    Import the module in a fresh interpreter with -X importtime, which reports every executed import.
+
+    :param module_name: Absolute name of the module, e.g. scraping_pipelines.run
+    :param repeat: Number of fresh interpreters, the fastest import counts to reduce the noise
+    :return: Cumulative import time of the module in milliseconds, top-level packages imported along the way
+    """
+    environment: dict[str, str] = {**os.environ, "PYTHONPATH": str(REPOSITORY_PATH)}
+    # The lazy clients must not need the API key, so it is not passed to the interpreter
+    environment.pop("PERSONAL_OPEN_AI_API_KEY", None)
+
+    durations: list[float] = []
+    imported_packages: set[str] = set()
+    for _ in range(repeat):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+            cwd=REPOSITORY_PATH, env=environment, capture_output=True, text=True
+        )
+        if process.returncode != 0:
+            raise RuntimeError(f"Importing {module_name} failed:\n{process.stderr}")
+
+        # Lines have the format "import time: self [us] | cumulative | imported package", the module comes last
+        for line in process.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative_us, imported_name = line.split("|")
+            imported_packages.add(imported_name.strip().split(".")[0])
+            if imported_name.strip() == module_name:
+                durations.append(int(cumulative_us) / 1000)
+
+    return min(durations), imported_packages
+
+
+def run_import_time_benchmark(
+        modules: tuple[str, ...] = ENTRY_MODULES,
+        budget_ms: float = 300,
+        heavy_packages: tuple[str, ...] = HEAVY_PACKAGES
+) -> tuple[dict[str, any], list[str]]:
+    """
+    Time the import of the entry modules, to catch startup regressions: heavy packages imported
+    at module level or clients constructed on import.
+
+    :param modules: Modules to import
+    :param budget_ms: Import time of a module in milliseconds above which it counts as a regression
+    :param heavy_packages: Packages which must not be imported by importing a module
+    :return: Import time and heavy packages per module, description of every regression
+    """
+    results: dict[str, any] = {}
+    regressions: list[str] = []
+    for module_name in modules:
+        duration_ms, imported_packages = measure_import_time(module_name)
+        eager_packages: list[str] = sorted(set(heavy_packages) & imported_packages)
+        results[module_name] = {"milliseconds": duration_ms, "heavy_packages": eager_packages}
+        logging.info(f"Import {module_name:<65} {duration_ms:>7.1f}ms {', '.join(eager_packages)}")
+
+        if eager_packages:
+            regressions.append(f"{module_name} imports {', '.join(eager_packages)} on import")
+        if duration_ms > budget_ms:
+            regressions.append(f"{module_name} takes {duration_ms:.1f}ms to import, the budget is {budget_ms:.0f}ms")
+
+    for regression in regressions:
+        logging.warning(f"Import time: {regression}")
+
+    return results, regressions
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_import_time_benchmark()
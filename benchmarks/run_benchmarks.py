@@ -0,0 +1,253 @@
+# Standard
+import os
+import sys
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+from urllib.request import urlopen
+
+# HTML parsing
+from bs4 import BeautifulSoup, Tag
+
+# Stages under benchmark
+from scraper.playwrite_async import launch_browser_async, scrape_webpage_content_async
+from scraping_pipelines.scrape_vc_home_page.html_processing import find_all_links_on_page
+from scraping_pipelines.scrape_vc_portfolio_page.html_processing import (
+    find_tag_with_most_children,
+    extract_text_and_links
+)
+from scraping_pipelines.scrape_vc_portfolio_page import gpt_scraper_assistant
+from scraping_pipelines.scrape_vc_portfolio_page.structured_extraction import extract_structured_company_information
+from scraping_pipelines.scrape_vc_portfolio_page.db_interactions import (
+    COMPANY_COLUMN_TYPES,
+    _transform_company_data_to_db_format,
+    store_companies_data_in_db
+)
+from database.interaction_utils import records_as_sql_arrays
+
+# Benchmark harness
+from benchmarks.stub_llm import StubChatClient
+from benchmarks.scaling import run_scaling_benchmark
+from benchmarks.import_time import run_import_time_benchmark
+from benchmarks.url_normalization import run_url_normalization_benchmark
+from benchmarks.ats_extractors import run_ats_extractor_benchmark
+from benchmarks.corpus_server import CORPUS_PATH, CORPUS_VERSION, load_manifest, serve_corpus
+from benchmarks.harness import (
+    BASELINE_PATH,
+    StageTimer,
+    peak_rss_mb,
+    log_results,
+    save_baseline,
+    compare_to_baseline
+)
+
+
+def fetch_pages(urls: list[str], timer: StageTimer, use_browser: bool = False) -> list[str]:
+    """
+    Fetch the pages from the corpus server, with plain HTTP requests or with the Playwright browser.
+
+    :param urls: URLs of the pages on the corpus server
+    :param timer: Timer of the stages
+    :param use_browser: Whether to fetch the pages with the browser, which includes rendering and scrolling
+    :return: HTML content of the pages
+    """
+    if not use_browser:
+        page_htmls: list[str] = []
+        for url in urls:
+            with timer.measure("fetch"):
+                with urlopen(url) as response:
+                    page_htmls.append(response.read().decode())
+        return page_htmls
+
+    async def fetch_with_browser() -> list[str]:
+        async with launch_browser_async(headless=True) as browser:
+            browser_page_htmls: list[str] = []
+            for url in urls:
+                with timer.measure("fetch_browser"):
+                    browser_page_htmls.append(await scrape_webpage_content_async(url, browser))
+            return browser_page_htmls
+
+    return asyncio.run(fetch_with_browser())
+
+
+def benchmark_portfolio_page(
+        page_html: str,
+        domain: str,
+        timer: StageTimer,
+        use_database: bool = False
+) -> int:
+    """
+    Run the portfolio page stages on a single page: parsing, finding the portfolio companies section,
+    extracting the text of every company, the stubbed LLM extraction and the composition of the database upsert.
+
+    :param page_html: HTML content of the portfolio page
+    :param domain: Domain of the VC
+    :param timer: Timer of the stages
+    :param use_database: Whether to store the companies in the database
+    :return: Number of companies found on the page
+    """
+    with timer.measure("parse_html"):
+        soup: BeautifulSoup = BeautifulSoup(page_html, 'html.parser')
+
+    with timer.measure("find_tag_with_most_children"):
+        portfolio_companies_tag: Tag = find_tag_with_most_children(soup)
+
+    companies_text: list[str] = []
+    for company_tag in portfolio_companies_tag.find_all(recursive=False):
+        with timer.measure("extract_text_and_links"):
+            companies_text.append(extract_text_and_links(company_tag))
+
+    companies_data: list[dict[str, any]] = []
+    for company_text in companies_text:
+        with timer.measure("llm_extraction_stub"):
+            companies_data.append(gpt_scraper_assistant.extract_company_information(company_text))
+
+    companies, _ = _transform_company_data_to_db_format(companies_data, vc_id=0)
+    # Portfolio pages linking to company subpages have no websites to store
+    if not companies:
+        logging.debug(f"No company records extracted from the portfolio page of {domain}")
+        return len(companies_text)
+
+    with timer.measure("records_as_sql_arrays"):
+        records_as_sql_arrays(companies, columns=COMPANY_COLUMN_TYPES)
+
+    if use_database:
+        with timer.measure("db_upsert_companies"):
+            store_companies_data_in_db(companies)
+
+    return len(companies_text)
+
+
+def run_corpus_benchmark(
+        corpus_path: Path = CORPUS_PATH / CORPUS_VERSION,
+        repeat: int = 20,
+        llm_latency: float = 0.0,
+        use_browser: bool = False,
+        use_database: bool = False,
+        timer: StageTimer | None = None
+) -> StageTimer:
+    """
+    Replay the recorded pages of the corpus from a local HTTP server and time every stage.
+    The pages are fetched once, the processing stages are repeated to get stable percentiles.
+
+    :param corpus_path: Directory of the corpus version
+    :param repeat: Number of times the processing stages are run over the corpus
+    :param llm_latency: Seconds every stubbed LLM request takes
+    :param use_browser: Whether to fetch the pages with the Playwright browser instead of plain HTTP requests
+    :param use_database: Whether to time the upserts against the database configured in the environment
+    :param timer: Timer to add the measurements to, a new timer when None
+    :return: Timer with the measurements
+    """
+    timer: StageTimer = timer or StageTimer()
+    gpt_scraper_assistant.set_client(StubChatClient(latency=llm_latency))
+
+    pages: list[dict[str, str]] = load_manifest(corpus_path)
+    with serve_corpus(corpus_path) as base_url:
+        page_htmls: list[str] = fetch_pages([f"{base_url}/{page['path']}" for page in pages], timer, use_browser)
+
+    for _ in range(repeat):
+        for page, page_html in zip(pages, page_htmls):
+            if page["kind"] == "home":
+                # The pipeline passes the domains as fetched from the database, with the scheme
+                with timer.measure("find_all_links_on_page"):
+                    find_all_links_on_page(base_domain=f"https://{page['domain']}", page_html=page_html)
+            elif page["kind"] == "portfolio":
+                benchmark_portfolio_page(page_html, page["domain"], timer, use_database)
+            elif page["kind"] == "subpage":
+                with timer.measure("extract_text_and_links_subpage"):
+                    extract_text_and_links(BeautifulSoup(page_html, 'html.parser'))
+                with timer.measure("extract_structured_company_information"):
+                    extract_structured_company_information(page_html, page["domain"])
+
+    return timer
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse the command line arguments of the benchmarks."""
+    parser = argparse.ArgumentParser(description="Benchmark the scraping stages on the recorded page corpus.")
+    parser.add_argument("--corpus-version", default=CORPUS_VERSION, help="Version of the recorded page corpus")
+    parser.add_argument("--repeat", type=int, default=20, help="Number of runs of the processing stages")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds per stubbed LLM request")
+    parser.add_argument("--browser", action="store_true", help="Fetch the pages with the Playwright browser")
+    parser.add_argument(
+        "--database", action="store_true",
+        help="Time the upserts against the local Postgres configured with the DATABASE_* environment variables"
+    )
+    parser.add_argument(
+        "--scaling-sizes", type=int, nargs="*", default=[],
+        help="Also time the parsing and DB-write stages on generated portfolio pages with these numbers of companies"
+    )
+    parser.add_argument("--nesting-depth", type=int, default=2, help="Nesting depth of the generated portfolio pages")
+    parser.add_argument(
+        "--url-count", type=int, default=0,
+        help="Also time the normalization of this number of generated company website URLs, e.g. 1000000"
+    )
+    parser.add_argument(
+        "--import-budget-ms", type=float, default=None,
+        help="Also time the import of the entry modules and fail when one exceeds this budget or imports a heavy package"
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before a regression")
+
+    return parser.parse_args()
+
+
+def main():
+    """Entry point of the benchmarks: python -m benchmarks.run_benchmarks [options]"""
+    logging.basicConfig(level=logging.INFO)
+    arguments: argparse.Namespace = parse_arguments()
+
+    # The upserts write to the companies table, so only run them against a local database
+    if arguments.database and os.getenv("DATABASE_HOST") not in ("localhost", "127.0.0.1", "::1"):
+        raise ValueError(f"The database benchmark requires a local database, got host {os.getenv('DATABASE_HOST')}")
+
+    timer: StageTimer = run_corpus_benchmark(
+        corpus_path=CORPUS_PATH / arguments.corpus_version,
+        repeat=arguments.repeat,
+        llm_latency=arguments.llm_latency,
+        use_browser=arguments.browser,
+        use_database=arguments.database
+    )
+    # The recorded job board responses double as a check of the ATS extractors
+    ats_mismatches: list[str] = run_ats_extractor_benchmark(timer, repeat=arguments.repeat)
+    results: dict[str, any] = {
+        "corpus": arguments.corpus_version,
+        "stages": timer.results(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    log_results(results)
+
+    # Measured after the peak RSS of the corpus, as the generated pages dominate the memory usage
+    superlinear_stages: list[str] = []
+    if arguments.scaling_sizes:
+        results["scaling"], superlinear_stages = run_scaling_benchmark(
+            sorted(arguments.scaling_sizes), nesting_depth=arguments.nesting_depth
+        )
+
+    url_key_mismatches: list[str] = []
+    if arguments.url_count:
+        results["url_normalization"], url_key_mismatches = run_url_normalization_benchmark(
+            urls=arguments.url_count, companies=max(arguments.url_count // 10, 1)
+        )
+
+    import_regressions: list[str] = []
+    if arguments.import_budget_ms is not None:
+        results["import_time"], import_regressions = run_import_time_benchmark(budget_ms=arguments.import_budget_ms)
+
+    if arguments.save_baseline:
+        save_baseline(results, arguments.baseline)
+        logging.info(f"Stored the results as baseline in {arguments.baseline}")
+    elif (
+            compare_to_baseline(results, arguments.baseline, arguments.tolerance)
+            or superlinear_stages
+            or url_key_mismatches
+            or ats_mismatches
+            or import_regressions
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# Standard
+import math
+import time
+import logging
+
+# HTML parsing
+from bs4 import BeautifulSoup, Tag
+
+# Stages under benchmark
+from scraping_pipelines.scrape_vc_portfolio_page.html_processing import (
+    find_tag_with_most_children,
+    extract_text_and_links
+)
+from database.interaction_utils import records_as_sql_arrays
+from scraping_pipelines.scrape_vc_portfolio_page.db_interactions import COMPANY_COLUMN_TYPES
+from graph.result_dataclasses.company import Company
+
+# Synthetic pages
+from benchmarks.synthetic_portfolio import SyntheticPortfolioSpec, generate_portfolio_html, generate_company_records
+
+
+def scaling_exponent(sizes: list[int], durations: list[float]) -> float:
+    """
+    Exponent k of the least squares fit duration ~ size^k on a log-log scale.
+    Linear stages have an exponent around 1, quadratic stages around 2.
+
+    :param sizes: Number of companies of every measurement
+    :param durations: Duration of every measurement in seconds
+    :return: Scaling exponent, 0 when there are too few measurements
+    """
+    points: list[tuple[float, float]] = [
+        (math.log(size), math.log(duration)) for size, duration in zip(sizes, durations) if size > 0 and duration > 0
+    ]
+    if len(points) < 2:
+        return 0.0
+
+    mean_size: float = sum(log_size for log_size, _ in points) / len(points)
+    mean_duration: float = sum(log_duration for _, log_duration in points) / len(points)
+    covariance: float = sum((log_size - mean_size) * (log_duration - mean_duration) for log_size, log_duration in points)
+    variance: float = sum((log_size - mean_size) ** 2 for log_size, _ in points)
+
+    return covariance / variance if variance else 0.0
+
+
+def time_portfolio_stages(spec: SyntheticPortfolioSpec, repeat: int = 3) -> dict[str, float]:
+    """
+    Time the parsing and DB-write stages on a generated portfolio page, each over the whole page.
+    The page is processed several times and the fastest run of every stage is kept, which filters out
+    the noise of the machine (e.g. garbage collection or other processes) from the short stages.
+
+    :param spec: Shape of the generated page
+    :param repeat: Number of times the page is processed
+    :return: Fastest duration in seconds per stage
+    """
+    page_html: str = generate_portfolio_html(spec)
+    companies: list[Company] = generate_company_records(spec.companies, seed=spec.seed)
+    durations: dict[str, float] = {}
+
+    def measure(stage: str, start_time: float):
+        duration: float = time.perf_counter() - start_time
+        durations[stage] = min(durations.get(stage, duration), duration)
+
+    for _ in range(repeat):
+        start_time: float = time.perf_counter()
+        soup: BeautifulSoup = BeautifulSoup(page_html, 'html.parser')
+        measure("parse_html", start_time)
+
+        start_time = time.perf_counter()
+        portfolio_companies_tag: Tag = find_tag_with_most_children(soup)
+        measure("find_tag_with_most_children", start_time)
+
+        company_tags: list[Tag] = portfolio_companies_tag.find_all(recursive=False)
+
+        start_time = time.perf_counter()
+        for company_tag in company_tags:
+            extract_text_and_links(company_tag)
+        measure("extract_text_and_links", start_time)
+
+        start_time = time.perf_counter()
+        records_as_sql_arrays(companies, columns=COMPANY_COLUMN_TYPES)
+        measure("records_as_sql_arrays", start_time)
+
+    if len(company_tags) != spec.companies:
+        logging.warning(f"Found {len(company_tags)} of the {spec.companies} companies in the {spec.layout} layout")
+
+    return durations
+
+
+def run_scaling_benchmark(
+        sizes: list[int],
+        layouts: tuple[str, ...] = ("grid", "list", "table"),
+        nesting_depth: int = 2,
+        max_exponent: float = 1.3,
+        repeat: int = 3,
+        min_duration: float = 0.05
+) -> tuple[dict[str, any], list[str]]:
+    """
+    Time the parsing and DB-write stages on generated portfolio pages of increasing size,
+    to catch stages which scale superlinearly with the number of companies.
+
+    :param sizes: Numbers of companies of the generated pages, e.g. 1000, 10000 and 100000
+    :param layouts: Layouts of the generated pages
+    :param nesting_depth: Number of wrapper tags around the portfolio section and inside every card
+    :param max_exponent: Scaling exponent above which a stage counts as superlinear
+    :param repeat: Number of times every page is processed, the fastest run of every stage is kept
+    :param min_duration: Seconds the stage must take on the largest page for its exponent to be checked,
+        the exponent of stages of a few milliseconds is dominated by noise
+    :return: Durations and scaling exponent per layout and stage, description of every superlinear stage
+    """
+    results: dict[str, any] = {}
+    superlinear_stages: list[str] = []
+    for layout in layouts:
+        durations_per_size: list[dict[str, float]] = []
+        for size in sizes:
+            durations: dict[str, float] = time_portfolio_stages(
+                SyntheticPortfolioSpec(companies=size, layout=layout, nesting_depth=nesting_depth), repeat=repeat
+            )
+            durations_per_size.append(durations)
+            logging.info(
+                f"Scaling {layout} {size:>7} companies: "
+                + ", ".join(f"{stage} {duration:.3f}s" for stage, duration in durations.items())
+            )
+
+        results[layout] = {}
+        for stage in durations_per_size[0]:
+            stage_durations: list[float] = [durations[stage] for durations in durations_per_size]
+            exponent: float = scaling_exponent(sizes, stage_durations)
+            checked: bool = max(stage_durations) >= min_duration
+            results[layout][stage] = {
+                "sizes": sizes, "seconds": stage_durations, "exponent": exponent, "checked": checked
+            }
+
+            if checked and exponent > max_exponent:
+                superlinear_stages.append(f"{stage} on the {layout} layout scales with exponent {exponent:.2f}")
+
+    for superlinear_stage in superlinear_stages:
+        logging.warning(f"Superlinear: {superlinear_stage}")
+
+    return results, superlinear_stages
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_scaling_benchmark(sizes=[1_000, 10_000])
@@ -0,0 +1,64 @@
+# Standard
+import re
+import json
+import time
+import logging
+from types import SimpleNamespace
+
+
+def respond_with_company_fields(request_body: dict[str, any]) -> str:
+    """
+    Deterministic stand-in for the company extraction of GPT: the first line of the company text is the name,
+    the first link outside of LinkedIn is the website.
+
+    :param request_body: Body of the chat completion request
+    :return: Message content in the JSON format the extraction prompt asks for
+    """
+    prompt: str = request_body["messages"][-1]["content"]
+    company_text: str = prompt.split("'''")[1].strip() if prompt.count("'''") >= 2 else prompt
+    lines: list[str] = [line for line in company_text.splitlines() if line.strip()]
+    links: list[str] = re.findall(r"\((https?://[^)\s]+)\)", company_text)
+
+    return json.dumps({
+        "name": lines[0] if lines else None,
+        "website": next((link for link in links if "linkedin.com" not in link), None),
+        "linkedin_url": next((link for link in links if "linkedin.com" in link), None),
+        "description": lines[1] if len(lines) > 1 else None,
+        "location": None,
+        "founded_year": None,
+        "invested_year": None,
+        "industry": None,
+        "round_type": None,
+    })
+
+
+class StubChatClient:
+    """
+    Local stand-in for the chat completions endpoint of the OpenAI client, answering with a fixed latency.
+    Used by the benchmarks to time the extraction stage without network access or costs.
+    """
+    def __init__(self, latency: float = 0.0, respond=respond_with_company_fields):
+        """
+        :param latency: Seconds every request takes, to simulate the response time of the model
+        :param respond: Function receiving the body of a chat completion request and returning the message content
+        """
+        self.latency = latency
+        self.respond = respond
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_chat_completion))
+
+    def _create_chat_completion(self, **request_body) -> SimpleNamespace:
+        """Answer a chat completion request in the shape of the OpenAI response object."""
+        if self.latency:
+            time.sleep(self.latency)
+
+        message = SimpleNamespace(role="assistant", content=self.respond(request_body), tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message)])
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    client = StubChatClient()
+    response = client.chat.completions.create(messages=[
+        {"role": "user", "content": "'''\nAiven\nData cloud\nWebsite\n(https://aiven.io)\n'''"}
+    ])
+    logging.info(response.choices[0].message.content)
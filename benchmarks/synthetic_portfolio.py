@@ -0,0 +1,172 @@
+# Standard
+import random
+import logging
+from dataclasses import dataclass
+
+# Result objects
+from graph.result_dataclasses.company import Company
+
+
+# Building blocks of the synthetic companies
+NAME_PREFIXES: tuple[str, ...] = (
+    "Aurora", "Cobalt", "Fern", "Harbor", "Kinetic", "Ledger", "Nimbus", "Quill", "Stack", "Tide", "Vertex", "Willow"
+)
+NAME_SUFFIXES: tuple[str, ...] = ("Labs", "Grid", "Health", "Pay", "Robotics", "Bio", "Loop", "Works", "AI", "Cloud")
+INDUSTRIES: tuple[str, ...] = (
+    "Fintech", "Climate", "Healthcare", "Developer Tools", "Logistics", "Security", "Biotech", "Marketplace"
+)
+LOCATIONS: tuple[str, ...] = ("Berlin", "London", "Paris", "Stockholm", "Amsterdam", "Madrid", "Oslo", "Dublin")
+ROUND_TYPES: tuple[str, ...] = ("pre-seed", "seed", "series-A", "series-B", "series-C", "growth")
+DESCRIPTION_WORDS: tuple[str, ...] = (
+    "platform", "automated", "data", "teams", "software", "european", "faster", "secure", "infrastructure",
+    "customers", "marketplace", "energy", "payments", "insights", "open", "source", "workflow", "analytics"
+)
+
+
+@dataclass(frozen=True)
+class SyntheticPortfolioSpec:
+    """
+    Shape of a generated portfolio page.
+
+    :param companies: Number of company cards on the page.
+    :param layout: Layout of the portfolio section: grid (div cards), list (ul items) or table (table rows).
+    :param nesting_depth: Number of wrapper tags around the portfolio section and inside every card.
+    :param card_size: Number of text fields on every card, on top of the name.
+    :param link_pattern: Links on every card: subpage (a relative link to the company page), external
+        (website and LinkedIn) or both.
+    :param seed: Seed of the random generator, the same spec always generates the same page.
+    """
+    companies: int = 1000
+    layout: str = "grid"
+    nesting_depth: int = 2
+    card_size: int = 4
+    link_pattern: str = "both"
+    seed: int = 0
+
+    def __post_init__(self):
+        if self.layout not in ("grid", "list", "table"):
+            raise ValueError(f"Unknown layout {self.layout}, choose grid, list or table")
+        if self.link_pattern not in ("subpage", "external", "both"):
+            raise ValueError(f"Unknown link pattern {self.link_pattern}, choose subpage, external or both")
+
+
+def generate_company(company_index: int, rng: random.Random) -> dict[str, any]:
+    """
+    Generate the information of a synthetic company with a unique name and domain.
+
+    :param company_index: Position of the company on the page, makes the name and domain unique
+    :param rng: Random generator
+    :return: Company information in the format of the GPT extraction
+    """
+    name: str = f"{rng.choice(NAME_PREFIXES)} {rng.choice(NAME_SUFFIXES)} {company_index}"
+    slug: str = name.lower().replace(" ", "-")
+    return {
+        "name": name,
+        "slug": slug,
+        "website": f"https://{slug}.com",
+        "linkedin_url": f"https://www.linkedin.com/company/{slug}/",
+        "description": " ".join(rng.choices(DESCRIPTION_WORDS, k=rng.randint(8, 24))).capitalize() + ".",
+        "location": rng.choice(LOCATIONS),
+        "founded_year": str(rng.randint(2005, 2023)),
+        "invested_year": str(rng.randint(2010, 2024)),
+        "industry": rng.choice(INDUSTRIES),
+        "round_type": rng.choice(ROUND_TYPES),
+    }
+
+
+def _card_fields(company: dict[str, any], spec: SyntheticPortfolioSpec) -> list[str]:
+    """HTML of the name, text fields and links of a single card."""
+    TEXT_FIELDS: tuple[str, ...] = ("description", "industry", "location", "founded_year", "invested_year", "round_type")
+
+    fields: list[str] = [f"<h3>{company['name']}</h3>"]
+    for field_index in range(spec.card_size):
+        field: str = TEXT_FIELDS[field_index % len(TEXT_FIELDS)]
+        fields.append(f'<p class="{field}">{company[field]}</p>')
+
+    if spec.link_pattern in ("subpage", "both"):
+        fields.append(f'<a href="/portfolio/{company["slug"]}">Read more</a>')
+    if spec.link_pattern in ("external", "both"):
+        fields.append(f'<a href="{company["website"]}" target="_blank">Website</a>')
+        fields.append(f'<a href="{company["linkedin_url"]}" target="_blank">LinkedIn</a>')
+
+    return fields
+
+
+def _nest(html: str, depth: int, class_name: str) -> str:
+    """Wrap the HTML in the given number of div tags."""
+    for level in range(depth):
+        html = f'<div class="{class_name}-{level}">{html}</div>'
+    return html
+
+
+def generate_portfolio_html(spec: SyntheticPortfolioSpec) -> str:
+    """
+    Generate a portfolio page in the shape of a real VC website: a header with navigation,
+    the portfolio section with a card per company and a footer.
+
+    :param spec: Shape of the generated page
+    :return: HTML content of the page
+    """
+    rng = random.Random(spec.seed)
+    companies: list[dict[str, any]] = [generate_company(company_index, rng) for company_index in range(spec.companies)]
+
+    if spec.layout == "table":
+        cards: list[str] = [
+            "<tr>" + "".join(f"<td>{_nest(field, spec.nesting_depth, 'cell')}</td>"
+                             for field in _card_fields(company, spec)) + "</tr>"
+            for company in companies
+        ]
+        portfolio_section: str = f'<table class="portfolio"><tbody>{"".join(cards)}</tbody></table>'
+    else:
+        card_tag: str = "li" if spec.layout == "list" else "div"
+        cards: list[str] = [
+            f'<{card_tag} class="card">{_nest("".join(_card_fields(company, spec)), spec.nesting_depth, "card")}'
+            f'</{card_tag}>'
+            for company in companies
+        ]
+        container_tag: str = "ul" if spec.layout == "list" else "div"
+        portfolio_section: str = f'<{container_tag} class="portfolio">{"".join(cards)}</{container_tag}>'
+
+    navigation: str = "".join(
+        f'<li><a href="/{page.lower()}">{page}</a></li>' for page in ("About", "Portfolio", "Team", "News", "Contact")
+    )
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>Synthetic Ventures</title>'
+        '<link rel="stylesheet" href="/static/css/main.css"><script src="/static/js/app.js" defer></script></head>'
+        f'<body><header><a class="logo" href="/">Synthetic Ventures</a><nav><ul>{navigation}</ul></nav></header>'
+        f'<main><h1>Portfolio</h1>{_nest(portfolio_section, spec.nesting_depth, "section")}</main>'
+        '<footer><a href="/privacy-policy">Privacy policy</a>'
+        '<a href="https://www.linkedin.com/company/synthetic-ventures">LinkedIn</a></footer></body></html>'
+    )
+
+
+def generate_company_records(companies: int, seed: int = 0) -> list[Company]:
+    """
+    Generate companies in the format stored in the companies table, to benchmark the database writes.
+
+    :param companies: Number of records
+    :param seed: Seed of the random generator
+    :return: Companies
+    """
+    rng = random.Random(seed)
+    company_records: list[Company] = []
+    for company_index in range(companies):
+        company: dict[str, any] = generate_company(company_index, rng)
+        company_records.append(Company(
+            name=company["name"],
+            domain=f"{company['slug']}.com",
+            linkedin_endpoint=f"/company/{company['slug']}/",
+            description=company["description"],
+            location=company["location"],
+            founded_year=int(company["founded_year"]),
+            industry=company["industry"],
+        ))
+
+    return company_records
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for layout in ("grid", "list", "table"):
+        page_html: str = generate_portfolio_html(SyntheticPortfolioSpec(companies=10_000, layout=layout))
+        logging.info(f"Generated {layout} page with 10000 companies: {len(page_html) / 1e6:.1f} MB")
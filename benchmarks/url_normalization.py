@@ -0,0 +1,90 @@
+# Standard
+import time
+import random
+import logging
+
+# Stages under benchmark
+from utils.url_parsing import get_domain_name, get_registrable_domain, get_endpoint
+
+# Synthetic companies
+from benchmarks.synthetic_portfolio import generate_company
+
+
+def generate_urls(urls: int, companies: int, seed: int = 0) -> tuple[list[str], int]:
+    """
+    Generate website URLs in the shapes GPT extracts them: with and without scheme and www, upper case,
+    with subdomains and paths. Popular companies are mentioned by many VCs, so the companies are drawn
+    with a long-tailed distribution.
+
+    :param urls: Number of URLs
+    :param companies: Number of distinct companies behind the URLs
+    :param seed: Seed of the random generator
+    :return: URLs, number of companies the URLs were generated for
+    """
+    URL_SHAPES: tuple[str, ...] = (
+        "https://{domain}", "https://www.{domain}/", "http://{domain}/about", "{domain}", "www.{domain}",
+        "https://WWW.{upper_domain}", "https://app.{domain}/login?next=/", "https://{domain}:443/en/",
+    )
+    TOP_LEVEL_DOMAINS: tuple[str, ...] = ("com", "io", "de", "co.uk", "com.au", "ai")
+
+    rng = random.Random(seed)
+    domains: list[str] = [
+        f"{generate_company(company_index, rng)['slug']}.{rng.choice(TOP_LEVEL_DOMAINS)}"
+        for company_index in range(companies)
+    ]
+    # Long tail: the company index is the floor of an exponential draw, so low indexes are drawn most often
+    company_indexes: list[int] = [min(int(rng.expovariate(10 / companies)), companies - 1) for _ in range(urls)]
+
+    generated_urls: list[str] = [
+        rng.choice(URL_SHAPES).format(domain=domains[company_index], upper_domain=domains[company_index].upper())
+        for company_index in company_indexes
+    ]
+    return generated_urls, len(set(company_indexes))
+
+
+def run_url_normalization_benchmark(
+        urls: int = 1_000_000,
+        companies: int = 100_000
+) -> tuple[dict[str, any], list[str]]:
+    """
+    Time the normalization of website URLs without cache, with an empty and with a filled cache,
+    and check that every URL shape of a company normalizes to the same key.
+
+    :param urls: Number of URLs to normalize
+    :param companies: Number of distinct companies behind the URLs
+    :return: Results per stage, description of every company with more than one key
+    """
+    website_urls, mentioned_companies = generate_urls(urls, companies)
+    results: dict[str, any] = {}
+
+    for function in (get_domain_name, get_registrable_domain, get_endpoint):
+        # Without the cache of the function itself, then with an empty and with a filled cache
+        for cache, normalize in (("uncached", function.__wrapped__), ("cold", function), ("warm", function)):
+            if cache != "warm":
+                get_domain_name.cache_clear()
+                get_registrable_domain.cache_clear()
+                get_endpoint.cache_clear()
+            hits_before: int = function.cache_info().hits
+
+            start_time: float = time.perf_counter()
+            for url in website_urls:
+                normalize(url)
+            duration: float = time.perf_counter() - start_time
+
+            stage: str = f"{function.__name__}_{cache}"
+            hit_rate: float = (function.cache_info().hits - hits_before) / len(website_urls)
+            results[stage] = {"urls_per_second": len(website_urls) / duration, "cache_hit_rate": hit_rate}
+            logging.info(f"{stage:<30} {len(website_urls) / duration:>12.0f} URLs/s, cache hit rate {hit_rate:.0%}")
+
+    keys: set[str] = {get_registrable_domain(url) for url in website_urls}
+    duplicate_keys: list[str] = []
+    if len(keys) != mentioned_companies:
+        duplicate_keys.append(f"{mentioned_companies} companies normalize to {len(keys)} keys")
+        logging.warning(f"URL normalization: {duplicate_keys[-1]}")
+
+    return results, duplicate_keys
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_url_normalization_benchmark()
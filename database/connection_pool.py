@@ -0,0 +1,159 @@
+# Standard
+import logging
+import threading
+from typing import Callable, Iterator, TYPE_CHECKING
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Database interactions
+if TYPE_CHECKING:
+    import pg8000
+    from pg8000.legacy import PreparedStatement
+
+# Metrics
+from utils.metrics import CACHE_REQUESTS
+
+
+class PooledConnection:
+    """
+    Database connection of the pool, with a cache of the statements prepared on it.
+    A prepared statement is parsed and planned by the server once, and run with new parameters afterwards.
+    Prepared statements only exist on the connection they were prepared on, so every connection has its own cache.
+    """
+    def __init__(self, connection: "pg8000.Connection", statement_cache_size: int):
+        """
+        :param connection: Database connection
+        :param statement_cache_size: Maximum number of prepared statements kept on the connection,
+            the least recently used statement is deallocated beyond it
+        """
+        self.connection: "pg8000.Connection" = connection
+        self.statement_cache_size: int = statement_cache_size
+        self._statements: OrderedDict[str, "PreparedStatement"] = OrderedDict()
+
+    def prepare(self, statement: str) -> "PreparedStatement":
+        """
+        Prepare the statement, or reuse it when it was prepared on this connection before.
+
+        :param statement: SQL statement with named parameters, e.g. SELECT * FROM public.vc WHERE id = :id
+        :return: Prepared statement
+        """
+        prepared_statement: "PreparedStatement | None" = self._statements.get(statement)
+        CACHE_REQUESTS.inc(cache="prepared_statement", result="hit" if prepared_statement else "miss")
+        if prepared_statement is not None:
+            self._statements.move_to_end(statement)
+            return prepared_statement
+
+        prepared_statement = self.connection.prepare(statement)
+        self._statements[statement] = prepared_statement
+        if len(self._statements) > self.statement_cache_size:
+            _, evicted_statement = self._statements.popitem(last=False)
+            evicted_statement.close()
+
+        return prepared_statement
+
+    def close(self):
+        """Close the connection, which deallocates its prepared statements on the server."""
+        self._statements.clear()
+        try:
+            self.connection.close()
+        except Exception as e:
+            logging.debug(f"Closing a database connection failed: {e}")
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of database connections, so that the queries of a run reuse a few connections
+    instead of connecting for every query. Connections are created on demand up to the maximum size,
+    further requests wait until a connection is returned to the pool.
+    """
+    def __init__(
+            self,
+            create_connection: Callable[[], "pg8000.Connection"],
+            max_size: int = 4,
+            statement_cache_size: int = 64
+    ):
+        """
+        :param create_connection: Function creating a new database connection
+        :param max_size: Maximum number of open connections
+        :param statement_cache_size: Maximum number of prepared statements per connection
+        """
+        if max_size < 1:
+            raise ValueError(f"The maximum size of the pool must be positive, got {max_size}")
+
+        self.create_connection: Callable[[], "pg8000.Connection"] = create_connection
+        self.max_size: int = max_size
+        self.statement_cache_size: int = statement_cache_size
+
+        # Idle connections, the most recently returned connection is reused first
+        self._idle_connections: list[PooledConnection] = []
+        self._open_connections: int = 0
+        self._closed: bool = False
+        self._condition = threading.Condition()
+
+    def _acquire(self) -> PooledConnection:
+        """Take an idle connection, create one when the pool is not full, or wait for one to be returned."""
+        with self._condition:
+            while not self._idle_connections and self._open_connections >= self.max_size and not self._closed:
+                self._condition.wait()
+            if self._closed:
+                raise RuntimeError("The connection pool is closed")
+
+            if self._idle_connections:
+                return self._idle_connections.pop()
+            self._open_connections += 1
+
+        try:
+            return PooledConnection(self.create_connection(), self.statement_cache_size)
+        except Exception:
+            with self._condition:
+                self._open_connections -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, pooled_connection: PooledConnection, discard: bool = False):
+        """Return the connection to the pool, or close it when it can not be reused or the pool is closed."""
+        discard = discard or self._closed
+        if discard:
+            pooled_connection.close()
+
+        with self._condition:
+            if discard:
+                self._open_connections -= 1
+            else:
+                self._idle_connections.append(pooled_connection)
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[PooledConnection]:
+        """
+        Yields a connection of the pool, which is returned to the pool afterwards.
+        When the block raises, the transaction is rolled back, and the connection is closed when
+        even the rollback fails, e.g. because the server closed the connection.
+
+        :return: Pooled connection
+        """
+        pooled_connection: PooledConnection = self._acquire()
+        try:
+            yield pooled_connection
+        except BaseException:
+            try:
+                pooled_connection.connection.rollback()
+                discard: bool = False
+            except Exception:
+                discard: bool = True
+            self._release(pooled_connection, discard=discard)
+            raise
+
+        self._release(pooled_connection)
+
+    def close(self):
+        """Close the idle connections, connections in use are closed when they are returned."""
+        with self._condition:
+            self._closed = True
+            idle_connections: list[PooledConnection] = self._idle_connections
+            self._idle_connections = []
+            self._open_connections -= len(idle_connections)
+            self._condition.notify_all()
+
+        for pooled_connection in idle_connections:
+            pooled_connection.close()
@@ -4,16 +4,26 @@ CREATE TABLE companies (
     domain VARCHAR(255) NOT NULL UNIQUE,
     linkedin_endpoint VARCHAR(1024) UNIQUE,
     linkedin_jobs_endpoint VARCHAR(4096) UNIQUE,
+    -- Careers page or job board of the company, found by the jobs pipeline
+    careers_page_url VARCHAR(2048),
     description TEXT,
     location VARCHAR(1024),
     founded_year INT,
     industry VARCHAR(512),
     head_count INT,
     logo_url VARCHAR(1024),
+    last_scraped_at TIMESTAMP WITH TIME ZONE,
+    next_scrape_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    scrape_count INT NOT NULL DEFAULT 0,
+    change_count INT NOT NULL DEFAULT 0,
+    failure_count INT NOT NULL DEFAULT 0,
+    content_hash VARCHAR(64),
     created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE INDEX ON companies (domain);
 CREATE INDEX ON companies (linkedin_endpoint);
-CREATE INDEX ON companies (linkedin_jobs_endpoint);
\ No newline at end of file
+CREATE INDEX ON companies (linkedin_jobs_endpoint);
+-- Scheduler of the re-scrapes: the companies that are due first
+CREATE INDEX ON companies (next_scrape_at);
\ No newline at end of file
@@ -0,0 +1,26 @@
+CREATE TABLE jobs (
+    id SERIAL PRIMARY KEY,
+    company_id INTEGER NOT NULL REFERENCES companies(id) ON DELETE CASCADE,
+    url VARCHAR(2048) NOT NULL,
+    title VARCHAR(512) NOT NULL,
+    location VARCHAR(1024),
+    department VARCHAR(512),
+    employment_type VARCHAR(256),
+    remote BOOLEAN,
+    description TEXT,
+    posted_at DATE,
+    -- Where the posting was read from: json_ld, an ATS provider (greenhouse, lever, ...) or page_links
+    source VARCHAR(64) NOT NULL,
+    external_id VARCHAR(256),
+    -- Hash of the scraped posting, postings are only rewritten when it changes
+    content_hash VARCHAR(64) NOT NULL,
+    -- Set when a scrape of the company no longer lists the posting, cleared when it is listed again
+    closed_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    UNIQUE (company_id, url)
+);
+
+-- Open postings of a company, to close the postings a scrape no longer finds
+CREATE INDEX ON jobs (company_id) WHERE closed_at IS NULL;
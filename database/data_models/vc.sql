@@ -3,6 +3,15 @@ CREATE TABLE vc (
     name VARCHAR(128),
     domain VARCHAR(256) NOT NULL UNIQUE,
     portfolio_page_endpoint VARCHAR(256),
+    last_scraped_at TIMESTAMP WITH TIME ZONE,
+    next_scrape_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    scrape_count INT NOT NULL DEFAULT 0,
+    change_count INT NOT NULL DEFAULT 0,
+    failure_count INT NOT NULL DEFAULT 0,
+    content_hash VARCHAR(64),
     created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
+
+-- Scheduler of the portfolio re-scrapes: the VCs with a portfolio page that are due first
+CREATE INDEX ON vc (next_scrape_at) WHERE portfolio_page_endpoint IS NOT NULL;
@@ -2,15 +2,33 @@
 import os
 import json
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from typing import List, Dict, Any, Optional, Sequence, TYPE_CHECKING
+from operator import attrgetter, itemgetter
 from contextlib import contextmanager
 
-# Database interactions
-import pg8000
-from pg8000.converters import literal
+# Database interactions, pg8000 is imported on the first query
+from utils.lazy_import import lazy_import
+pg8000 = lazy_import("pg8000")
+pg8000_converters = lazy_import("pg8000.converters")
+if TYPE_CHECKING:
+    import pg8000
 
+# Connection pool
+from database.connection_pool import ConnectionPool
 
-def create_connection() -> pg8000.Connection:
+# Metrics
+from utils.metrics import DB_QUERIES, DB_ROWS, DB_LATENCY
+
+
+# Maximum number of characters of a logged query, the VALUES of an upsert can be megabytes
+MAX_LOGGED_QUERY_LENGTH: int = 500
+
+_POOL: ConnectionPool | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def create_connection() -> "pg8000.Connection":
     """
     Create a connection to the database.
 
@@ -29,24 +47,49 @@ def create_connection() -> pg8000.Connection:
     )
 
 
+def get_pool() -> ConnectionPool:
+    """
+    Connection pool shared by all queries of the process, created on the first query.
+    The size of the pool is configured with the DATABASE_POOL_SIZE environment variable.
+
+    :return: Connection pool
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ConnectionPool(create_connection, max_size=int(os.getenv("DATABASE_POOL_SIZE", 4)))
+
+    return _POOL
+
+
+def close_pool():
+    """Close the connections of the pool, a later query creates a new pool."""
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+
+    if pool is not None:
+        pool.close()
+
+
 @contextmanager
-def get_cursor() -> pg8000.Cursor:
+def get_cursor() -> "pg8000.Cursor":
     """
-    Yields a cursor and a connection to interact with the database.
+    Yields a cursor and a connection of the pool to interact with the database.
 
     :return: Cursor and connection
     """
-    connection: pg8000.Connection = create_connection()
-    cursor: pg8000.Cursor = connection.cursor()
+    with get_pool().connection() as pooled_connection:
+        connection: pg8000.Connection = pooled_connection.connection
+        cursor: pg8000.Cursor = connection.cursor()
 
-    try:
-        yield cursor, connection
-    finally:
-        cursor.close()
-        connection.close()
+        try:
+            yield cursor, connection
+        finally:
+            cursor.close()
 
 
-def _rows_to_dicts(cursor: pg8000.Cursor) -> List[Dict[str, Any]]:
+def _rows_to_dicts(cursor: "pg8000.Cursor") -> List[Dict[str, Any]]:
     """
     Convert the rows selected by a query with the cursor to a list of dicts.
 
@@ -64,6 +107,28 @@ def _rows_to_dicts(cursor: pg8000.Cursor) -> List[Dict[str, Any]]:
     return results
 
 
+def _query_for_log(query: str) -> str:
+    """
+    Shorten the query to a single line of at most MAX_LOGGED_QUERY_LENGTH characters.
+
+    :param query: Query to log
+    :return: Shortened query
+    """
+    query = " ".join(query.split())
+    if len(query) <= MAX_LOGGED_QUERY_LENGTH:
+        return query
+
+    return f"{query[:MAX_LOGGED_QUERY_LENGTH]}... ({len(query)} characters)"
+
+
+def _statement_type(query: str) -> str:
+    """
+    :param query: Query to label
+    :return: The first keyword of the query, e.g. INSERT, which labels the metrics of the query
+    """
+    return query.split(maxsplit=1)[0].upper() if query.strip() else ""
+
+
 def execute_sql(query: str, return_values: bool = False, verbose: bool = True) -> Optional[List[Dict[str, Any]]]:
     """
     Execute the given sql query.
@@ -73,19 +138,100 @@ def execute_sql(query: str, return_values: bool = False, verbose: bool = True) -
     :param verbose: Whether to log the query before executing
 
     """
+    statement: str = _statement_type(query)
+
     with get_cursor() as (cursor, connection):
         if verbose:
-            logging.info(f"Executing query: {query}")
+            logging.info(f"Executing query: {_query_for_log(query)}")
 
-        result = cursor.execute(query)
-        connection.commit()
+        try:
+            with DB_LATENCY.time(statement=statement):
+                result = cursor.execute(query)
+                connection.commit()
+        except Exception:
+            DB_QUERIES.inc(statement=statement, status="error")
+            raise
 
+        DB_QUERIES.inc(statement=statement, status="ok")
+        DB_ROWS.inc(max(result.rowcount, 0), statement=statement)
         logging.info(f"Rows affected: {result.rowcount}")
 
         if return_values:
             return _rows_to_dicts(cursor)
 
 
+def execute_statement(
+        statement: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        return_values: bool = False,
+        verbose: bool = True
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Execute the given parameterized statement as a prepared statement. The statement is prepared once
+    per pooled connection, so the server parses and plans a statement of a fixed shape only once.
+    Parameters are passed separately from the statement, instead of rendering them into the query.
+
+    :param statement: Statement with named parameters, e.g. SELECT * FROM public.vc WHERE id = :id
+    :param parameters: Value of every named parameter of the statement
+    :param return_values: Whether to return the values of the statement
+    :param verbose: Whether to log the statement before executing
+    :return: Selected or returned rows as a list of dicts, if return_values
+    """
+    results: List[List[Dict[str, Any]]] = execute_prepared(
+        statement, [parameters or {}], return_values=return_values, verbose=verbose
+    )
+    if return_values:
+        return results[0]
+
+
+def execute_prepared(
+        statement: str,
+        parameter_sets: List[Dict[str, Any]],
+        return_values: bool = False,
+        verbose: bool = True
+) -> Optional[List[List[Dict[str, Any]]]]:
+    """
+    Execute the given parameterized statement once for every set of parameters, in a single transaction.
+    The statement is prepared once and reused for every set, see execute_statement. Every set is a round trip
+    to the server, many rows are written faster by a single statement over arrays (see records_as_sql_arrays).
+    The rows returned by the statement are counted, statements that write rows count them with RETURNING.
+
+    :param statement: Statement with named parameters, e.g. UPDATE public.vc SET domain = :domain WHERE id = :id
+    :param parameter_sets: Value of every named parameter of the statement, per execution
+    :param return_values: Whether to return the values of the statement
+    :param verbose: Whether to log the statement before executing
+    :return: Selected or returned rows as a list of dicts, per execution, if return_values
+    """
+    statement_type: str = _statement_type(statement)
+
+    with get_pool().connection() as pooled_connection:
+        if verbose:
+            logging.info(f"Executing statement {len(parameter_sets)} times: {_query_for_log(statement)}")
+
+        results: List[List[Dict[str, Any]]] = []
+        returned_rows: int = 0
+        try:
+            with DB_LATENCY.time(statement=statement_type):
+                prepared_statement = pooled_connection.prepare(statement)
+                for parameters in parameter_sets:
+                    rows: tuple = prepared_statement.run(**parameters)
+                    returned_rows += len(rows)
+                    if return_values:
+                        columns: list[str] = [column["name"] for column in prepared_statement.row_desc or []]
+                        results.append([dict(zip(columns, row)) for row in rows])
+                pooled_connection.connection.commit()
+        except Exception:
+            DB_QUERIES.inc(len(parameter_sets), statement=statement_type, status="error")
+            raise
+
+        DB_QUERIES.inc(len(parameter_sets), statement=statement_type, status="ok")
+        DB_ROWS.inc(returned_rows, statement=statement_type)
+        logging.info(f"Rows returned: {returned_rows}")
+
+        if return_values:
+            return results
+
+
 def value_to_sql(value: Any) -> str:
     """
     Format the given value to a sql representation.
@@ -94,29 +240,69 @@ def value_to_sql(value: Any) -> str:
     :return: SQL representation of the value
     """
     if isinstance(value, dict) or isinstance(value, list):
-        return literal(json.dumps(value))
+        return pg8000_converters.literal(json.dumps(value))
     else:
-        return literal(value)
+        return pg8000_converters.literal(value)
 
 
-def records_as_sql_values(records: List[Dict[str, Any]]) -> str:
+def records_as_sql_values(records: List[Any], columns: Optional[Sequence[str]] = None) -> str:
     """
     Convert a list of records to a string of SQL values.
     Resulting in sql string with the following format: "('value1.1', 'value1.2'), ('value2.1', 'value2.2')"
 
-    :param records: List of records to convert
+    :param records: List of records to convert, dictionaries or dataclass instances
+    :param columns: Keys or attributes to take from every record, in the order of the columns of the query.
+        None to take every value of a dictionary in its key order.
     :return: SQL values string
     """
+    if columns is None:
+        get_values = dict.values
+    elif records and not isinstance(records[0], dict):
+        get_values = attrgetter(*columns) if len(columns) > 1 else lambda record: (getattr(record, columns[0]),)
+    else:
+        get_values = itemgetter(*columns) if len(columns) > 1 else lambda record: (record[columns[0]],)
+
     # Join all value strings with a comma (e.g. "('value1.1', 'value1.2'), ('value2.1', 'value2.2')")
     return ','.join(
         [
             # Create value string (e.g. "('value1.1', 'value1.2')")
-            f"({','.join(value_to_sql(value) for value in record.values())})"
+            f"({','.join(value_to_sql(value) for value in get_values(record))})"
             for record in records
         ]
     )
 
 
+def records_as_sql_arrays(records: List[Any], columns: Sequence[str]) -> Dict[str, List[Any]]:
+    """
+    Convert a list of records to an array per column, the parameters of a statement unnesting the arrays into rows:
+    "INSERT INTO ... SELECT * FROM unnest(:name::TEXT[], :founded_year::INTEGER[])".
+    Unlike VALUES rendered into the query, the statement has the same text for any number of records,
+    so it is prepared once, and the records are sent in one round trip.
+
+    :param records: List of records to convert, dictionaries or dataclass instances
+    :param columns: Keys or attributes to take from every record, the names of the parameters
+    :return: Array of the values of every column
+    """
+    arrays: Dict[str, List[Any]] = {column: [] for column in columns}
+    for record in records:
+        for column, array in arrays.items():
+            value: Any = record[column] if isinstance(record, dict) else getattr(record, column)
+            # Nested lists would be read as a multidimensional array, JSON values are sent as text like value_to_sql
+            array.append(json.dumps(value) if isinstance(value, (dict, list)) else value)
+
+    return arrays
+
+
+def sql_unnest_arrays(column_types: Dict[str, str]) -> str:
+    """
+    Rows of the arrays of records_as_sql_arrays, with the parameters named after the columns.
+
+    :param column_types: SQL type of every column, e.g. {"name": "TEXT", "founded_year": "INTEGER"}
+    :return: SQL set returning function, e.g. "unnest(:name::TEXT[], :founded_year::INTEGER[])"
+    """
+    return f"unnest({', '.join(f':{column}::{column_type}[]' for column, column_type in column_types.items())})"
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
 
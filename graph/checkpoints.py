@@ -0,0 +1,144 @@
+# Standard
+import json
+import pickle
+import shutil
+import hashlib
+import tempfile
+import logging
+from pathlib import Path
+from typing import Any
+
+
+# Directory in which the node outputs of all graph runs are stored
+CHECKPOINTS_PATH: Path = Path(__file__).parent.parent / "checkpoints"
+
+
+class CheckpointStore:
+    """
+    Local store of the outputs of executed nodes, so that an interrupted graph run (e.g. by a browser crash)
+    can be resumed from the last completed nodes instead of executing the graph again from the start node.
+
+    Checkpoints are stored per graph hash and run id in a directory, with one pickle file per executed node.
+    A node is identified by its step key: the path of node ids from the start node, which distinguishes
+    executions of the same node on different branches or for different items of a map node.
+    The checkpoints of a run are deleted once the run completes, unless the store keeps completed runs.
+    """
+    def __init__(self, root_path: Path = CHECKPOINTS_PATH, keep_completed_runs: bool = False):
+        """
+        :param root_path: Directory to store the checkpoints in
+        :param keep_completed_runs: Whether to keep the checkpoints of completed runs, e.g. to inspect the outputs
+        """
+        self.root_path = root_path
+        self.keep_completed_runs = keep_completed_runs
+
+    def _run_path(self, graph_hash: str, run_id: str) -> Path:
+        """Directory of the checkpoints of a single run."""
+        return self.root_path / graph_hash / run_id
+
+    def _checkpoint_path(self, graph_hash: str, run_id: str, step_key: str) -> Path:
+        """File of the checkpoint of a single node, the step key is hashed as it can be arbitrarily long."""
+        return self._run_path(graph_hash, run_id) / f"{hashlib.sha1(step_key.encode()).hexdigest()}.pkl"
+
+    def save_run_input(self, graph_hash: str, run_id: str, output_previous_node: Any):
+        """
+        Store the input of the start node of a run, which is needed to resume the run.
+
+        :param graph_hash: Hash of the compiled graph
+        :param run_id: ID of the run
+        :param output_previous_node: Input of the start node
+        """
+        self._run_path(graph_hash, run_id).mkdir(parents=True, exist_ok=True)
+        with open(self._run_path(graph_hash, run_id) / "run_input.pkl", "wb") as file:
+            pickle.dump(output_previous_node, file)
+
+    def load_run_input(self, graph_hash: str, run_id: str) -> Any:
+        """
+        Load the input of the start node of a run.
+
+        :param graph_hash: Hash of the compiled graph
+        :param run_id: ID of the run
+        :return: Input of the start node
+        """
+        run_input_path: Path = self._run_path(graph_hash, run_id) / "run_input.pkl"
+        if not run_input_path.exists():
+            raise KeyError(f"No run {run_id} stored for graph {graph_hash}")
+
+        with open(run_input_path, "rb") as file:
+            return pickle.load(file)
+
+    def complete_run(self, graph_hash: str, run_id: str):
+        """
+        Mark a run as completed: its checkpoints will not be resumed anymore and are deleted,
+        unless the store keeps completed runs.
+
+        :param graph_hash: Hash of the compiled graph
+        :param run_id: ID of the run
+        """
+        if self.keep_completed_runs:
+            return
+
+        shutil.rmtree(self._run_path(graph_hash, run_id), ignore_errors=True)
+        # Remove the directory of the graph once its last run is deleted
+        try:
+            (self.root_path / graph_hash).rmdir()
+        except OSError:
+            pass
+
+    def save(self, graph_hash: str, run_id: str, step_key: str, output: Any, context_updates: dict[str, Any]) -> bool:
+        """
+        Store the output of an executed node and the context it set. Outputs that can not be pickled
+        (e.g. Playwright objects) are not checkpointed, the node will be executed again when resuming.
+
+        :param graph_hash: Hash of the compiled graph
+        :param run_id: ID of the run
+        :param step_key: Path of node ids identifying the execution of the node
+        :param output: Output of the node
+        :param context_updates: Context of the branch after the node was executed, without the run context
+        :return: Whether the checkpoint was stored
+        """
+        try:
+            checkpoint: bytes = pickle.dumps({"step_key": step_key, "output": output, "context": context_updates})
+        except (pickle.PicklingError, TypeError, AttributeError) as error:
+            logging.warning(f"Can not checkpoint {step_key} of run {run_id}: {error}")
+            return False
+
+        checkpoint_path: Path = self._checkpoint_path(graph_hash, run_id, step_key)
+        checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file first, so that a crash while writing does not leave a corrupt checkpoint.
+        # Every write has its own temporary file, as the concurrent scheduler saves checkpoints from several threads
+        with tempfile.NamedTemporaryFile(dir=checkpoint_path.parent, suffix=".tmp", delete=False) as file:
+            temporary_path: Path = Path(file.name)
+            file.write(checkpoint)
+        temporary_path.replace(checkpoint_path)
+
+        return True
+
+    def load(self, graph_hash: str, run_id: str, step_key: str) -> tuple[bool, Any, dict[str, Any]]:
+        """
+        Load the checkpoint of a node.
+
+        :param graph_hash: Hash of the compiled graph
+        :param run_id: ID of the run
+        :param step_key: Path of node ids identifying the execution of the node
+        :return: Whether a checkpoint was found, the output of the node and the context it set
+        """
+        checkpoint_path: Path = self._checkpoint_path(graph_hash, run_id, step_key)
+        if not checkpoint_path.exists():
+            return False, None, {}
+
+        with open(checkpoint_path, "rb") as file:
+            checkpoint: dict[str, Any] = pickle.load(file)
+
+        return True, checkpoint["output"], checkpoint["context"]
+
+
+def graph_hash(graph_dict: dict[str, Any]) -> str:
+    """
+    Stable hash of the serialized graph, so that checkpoints of a changed graph are never reused.
+
+    :param graph_dict: Dictionary representation of the graph
+    :return: Hexadecimal hash of the graph
+    """
+    serialized_graph: str = json.dumps(graph_dict, sort_keys=True, default=str)
+    return hashlib.sha256(serialized_graph.encode()).hexdigest()[:16]
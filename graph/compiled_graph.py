@@ -0,0 +1,691 @@
+# Standard
+import asyncio
+import inspect
+import logging
+from functools import partial
+from types import MappingProxyType
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+
+# Node dataclasses
+from graph.node import Node, MapNode, GatherNode
+
+# Node functions
+from graph.constants.node_functions_map import NODE_NAME_TO_FUNCTION_MAP
+
+# Checkpointing
+from graph.checkpoints import CheckpointStore, graph_hash
+
+# Memoization of node outputs
+from graph.node_cache import CachePolicy, NodeOutputCache, DEFAULT_NODE_CACHE, node_cache_key
+
+# Instrumentation
+from graph.profiling import GraphProfiler, output_size
+
+
+class GraphValidationError(ValueError):
+    """Raised when a graph can not be compiled into an execution plan."""
+
+
+@dataclass(frozen=True)
+class CompiledStep:
+    """
+    A single node of the execution plan. The inputs of the node are bound once during compilation,
+    the step itself is never modified during execution.
+
+    :param node_id: The id of the node the step was compiled from.
+    :param function: The function to execute.
+    :param static_inputs: Read-only configuration of the step.
+    :param bound_inputs: Read-only static and initial dynamic inputs, merged once during compilation.
+    :param bound_function: The function with the bound inputs applied, only the output of the parent step
+        and the context are passed per call.
+    :param takes_node: Whether the function has a node parameter, only then a node is created per call.
+    :param children: Indices of the child steps in the plan.
+    :param is_async: Whether the function is a coroutine function.
+    :param gather_index: Index of the gather step for map steps, None for all other steps.
+    :param max_parallelism: Maximum number of items executed at the same time for map steps.
+    :param cache_policy: Cache policy of memoized steps, None for steps that are always executed.
+    """
+    node_id: str
+    function: Callable[..., Any]
+    static_inputs: Mapping[str, Any]
+    bound_inputs: Mapping[str, Any]
+    bound_function: Callable[..., Any]
+    takes_node: bool
+    children: tuple[int, ...]
+    is_async: bool
+    gather_index: int | None = None
+    max_parallelism: int = 1
+    cache_policy: CachePolicy | None = None
+
+    @property
+    def is_map(self) -> bool:
+        """Whether the step fans out the branches of its children per item."""
+        return self.gather_index is not None
+
+    def __call__(self, output_previous_node: Any, context: dict[str, Any]) -> Any:
+        """
+        Execute the function of the step. Node functions with a node parameter receive a node holding the context
+        of the branch, so functions that set context (e.g. the result object) work unchanged.
+        For coroutine functions the coroutine is returned, which has to be awaited by the caller.
+
+        :param output_previous_node: The output of the parent step.
+        :param context: The context of the branch.
+        """
+        if not self.takes_node:
+            return self.bound_function(output_previous_node=output_previous_node, **context)
+
+        node = Node(
+            id=self.node_id,
+            function=self.function,
+            static_inputs=self.static_inputs,
+            dynamic_inputs={"output_previous_node": output_previous_node},
+            context=context,
+        )
+        return self.bound_function(node=node, output_previous_node=output_previous_node, **context)
+
+
+@dataclass(frozen=True)
+class GraphRun:
+    """
+    State of a single execution of a compiled graph.
+
+    :param run_id: ID of the run, used to checkpoint the outputs of the nodes. None disables checkpointing.
+    :param context_keys: Keys of the context provided to the run, which are not part of the checkpoints.
+    :param profiler: Profiler recording the execution of every step, None disables profiling.
+    """
+    run_id: str | None
+    context_keys: frozenset[str]
+    profiler: GraphProfiler | None = None
+
+
+@dataclass(frozen=True)
+class CompiledScraperGraph:
+    """
+    Immutable execution plan of a ScraperGraph, created by ScraperGraph.compile. The graph is validated once
+    and the steps are stored in topological order with their inputs bound. Executions only create per-run state,
+    which makes the compiled graph re-entrant: it can execute many inputs, sequentially or concurrently.
+
+    When a checkpoint store is configured, executions with a run id store the output of every step,
+    and resume(run_id) continues an interrupted run without executing the completed steps again.
+    The checkpoints of a run are deleted by the store once the run completes (see CheckpointStore).
+    Steps with a cache policy reuse the output of earlier executions with the same inputs from the node cache.
+
+    :param steps: The steps of the plan in topological order.
+    :param start_index: Index of the step where the execution starts.
+    :param base_context: Context shared by all executions (e.g. the page driver of the graph).
+    :param graph_hash: Stable hash of the graph the plan was compiled from.
+    :param checkpoint_store: Store for the outputs of the steps, None disables checkpointing.
+    :param node_cache: Cache for the outputs of steps with a cache policy, None disables memoization.
+    """
+    steps: tuple[CompiledStep, ...]
+    start_index: int
+    base_context: Mapping[str, Any]
+    graph_hash: str
+    checkpoint_store: CheckpointStore | None = None
+    node_cache: NodeOutputCache | None = None
+
+    def _start_run(
+            self,
+            output_previous_node: Any,
+            context: dict[str, Any] | None,
+            run_id: str | None,
+            profiler: GraphProfiler | None
+    ) -> tuple[GraphRun, dict[str, Any]]:
+        """
+        Create the state and the context of a new execution.
+
+        :param output_previous_node: Input of the start step.
+        :param context: Context of this execution, added to the base context.
+        :param run_id: ID of the run, used to checkpoint the outputs of the steps.
+        :param profiler: Profiler recording the execution of every step.
+        :return: State of the run, context of the run
+        """
+        run_context: dict[str, Any] = {**self.base_context, **(context or {})}
+
+        if run_id is not None and self.checkpoint_store is not None:
+            self.checkpoint_store.save_run_input(self.graph_hash, run_id, output_previous_node)
+            logging.info(f"Checkpointing run {run_id} of graph {self.graph_hash}")
+
+        return GraphRun(run_id=run_id, context_keys=frozenset(run_context), profiler=profiler), run_context
+
+    def _complete_run(self, run: GraphRun):
+        """Mark a checkpointed run as completed, after which its checkpoints are no longer needed."""
+        if run.run_id is not None and self.checkpoint_store is not None:
+            self.checkpoint_store.complete_run(self.graph_hash, run.run_id)
+
+    def _restore_checkpoint(self, run: GraphRun, step_key: str, context: dict[str, Any]) -> tuple[bool, Any]:
+        """Load the output of a step completed in an earlier attempt of the run and restore the context it set."""
+        if run.run_id is None or self.checkpoint_store is None:
+            return False, None
+
+        restored, step_output, context_updates = self.checkpoint_store.load(self.graph_hash, run.run_id, step_key)
+        if restored:
+            logging.info(f"Restored {step_key} from the checkpoint of run {run.run_id}")
+            context.update(context_updates)
+
+        return restored, step_output
+
+    def _save_checkpoint(self, run: GraphRun, step_key: str, step_output: Any, context: dict[str, Any]):
+        """Store the output of a step and the context it set."""
+        if run.run_id is None or self.checkpoint_store is None:
+            return
+
+        context_updates: dict[str, Any] = {
+            key: value for key, value in context.items() if key not in run.context_keys
+        }
+        self.checkpoint_store.save(self.graph_hash, run.run_id, step_key, step_output, context_updates)
+
+    def _cached_output(self, step: CompiledStep, step_input: Any) -> tuple[bool, Any, str | None]:
+        """
+        Look up the output of a memoized step in the node cache.
+
+        :return: Whether the output was found, the cached output, the cache key to store the output with
+        """
+        if step.cache_policy is None or self.node_cache is None:
+            return False, None, None
+
+        cache_key: str | None = node_cache_key(
+            step.function.__name__, {**step.bound_inputs, "output_previous_node": step_input}
+        )
+        if cache_key is None:
+            return False, None, None
+
+        found, step_output = self.node_cache.get(step.node_id, cache_key, step.cache_policy)
+        return found, step_output, cache_key
+
+    def _cache_output(self, step: CompiledStep, cache_key: str | None, step_output: Any):
+        """Store the output of a memoized step in the node cache."""
+        if cache_key is not None:
+            self.node_cache.put(cache_key, step_output, step.cache_policy)
+
+    def _execute_step(
+            self,
+            run: GraphRun,
+            step: CompiledStep,
+            step_key: str,
+            step_input: Any,
+            context: dict[str, Any]
+    ) -> tuple[Any, str]:
+        """
+        Execute a synchronous step, unless its output was checkpointed in an earlier attempt of the run
+        or its output is memoized for the same inputs.
+
+        :return: Output of the step, source of the output (executed, cache or checkpoint)
+        """
+        restored, step_output = self._restore_checkpoint(run, step_key, context)
+        if restored:
+            return step_output, "checkpoint"
+
+        found, step_output, cache_key = self._cached_output(step, step_input)
+        if not found:
+            step_output = step(step_input, context)
+            self._cache_output(step, cache_key, step_output)
+
+        self._save_checkpoint(run, step_key, step_output, context)
+
+        return step_output, "cache" if found else "executed"
+
+    async def _execute_step_async(
+            self,
+            run: GraphRun,
+            step: CompiledStep,
+            step_key: str,
+            step_input: Any,
+            context: dict[str, Any]
+    ) -> tuple[Any, str]:
+        """
+        Execute a coroutine step, unless its output was checkpointed in an earlier attempt of the run
+        or its output is memoized for the same inputs.
+
+        :return: Output of the step, source of the output (executed, cache or checkpoint)
+        """
+        restored, step_output = self._restore_checkpoint(run, step_key, context)
+        if restored:
+            return step_output, "checkpoint"
+
+        found, step_output, cache_key = self._cached_output(step, step_input)
+        if not found:
+            step_output = await step(step_input, context)
+            self._cache_output(step, cache_key, step_output)
+
+        self._save_checkpoint(run, step_key, step_output, context)
+
+        return step_output, "cache" if found else "executed"
+
+    def _run_step(self, run: GraphRun, step: CompiledStep, step_key: str, step_input: Any, context: dict[str, Any]) -> Any:
+        """Execute a synchronous step, recording its profile when the run is profiled."""
+        if run.profiler is None:
+            return self._execute_step(run, step, step_key, step_input, context)[0]
+
+        with run.profiler.profile(step.node_id, step_key) as node_profile:
+            step_output, node_profile.source = self._execute_step(run, step, step_key, step_input, context)
+
+        # Measured after the profiled section, as pickling large outputs would inflate the wall time
+        node_profile.output_bytes = output_size(step_output)
+        return step_output
+
+    async def _run_step_async(
+            self,
+            run: GraphRun,
+            step: CompiledStep,
+            step_key: str,
+            step_input: Any,
+            context: dict[str, Any]
+    ) -> Any:
+        """Execute a coroutine step, recording its profile when the run is profiled."""
+        if run.profiler is None:
+            return (await self._execute_step_async(run, step, step_key, step_input, context))[0]
+
+        with run.profiler.profile(step.node_id, step_key) as node_profile:
+            step_output, node_profile.source = await self._execute_step_async(run, step, step_key, step_input, context)
+
+        node_profile.output_bytes = output_size(step_output)
+        return step_output
+
+    def execute(
+            self,
+            output_previous_node: Any = None,
+            context: dict[str, Any] | None = None,
+            max_parallelism: int = 1,
+            run_id: str | None = None,
+            profiler: GraphProfiler | None = None
+    ) -> list[Any]:
+        """
+        Execute the plan in a depth-first manner. The context of a step is passed to its children, so that once
+        a context like the result object is set, it is available to all children. Map steps execute the branches
+        of their children once per item, each item with its own copy of the context, after which their gather step
+        is executed with the collected outputs.
+
+        When max_parallelism is larger than one, or when the plan contains coroutine functions,
+        the plan is executed by the concurrent scheduler on a new event loop instead (see execute_async).
+        Inside a running event loop, e.g. in a coroutine, await execute_async for these plans instead.
+
+        :param output_previous_node: Input of the start step (e.g. the URL of the VC to scrape).
+        :param context: Context of this execution, added to the base context (e.g. a page driver per execution).
+        :param max_parallelism: Maximum number of steps that are executed at the same time.
+        :param run_id: ID of the run, used to checkpoint the outputs of the steps when a checkpoint store is configured.
+        :param profiler: Profiler recording the execution of every step.
+        :return: Outputs of the steps without children, in the order of execution.
+        :raises RuntimeError: When the plan needs the concurrent scheduler and an event loop is already running.
+        """
+        if max_parallelism > 1 or any(step.is_async for step in self.steps):
+            if _event_loop_is_running():
+                raise RuntimeError(
+                    "The plan is executed by the concurrent scheduler, which can not start an event loop "
+                    "inside the running event loop, await execute_async instead"
+                )
+            return asyncio.run(self.execute_async(output_previous_node, context, max_parallelism, run_id, profiler))
+
+        run, run_context = self._start_run(output_previous_node, context, run_id, profiler)
+
+        leaf_outputs: list[Any] = []
+        self._execute_branch(
+            run, self.start_index, self.steps[self.start_index].node_id, output_previous_node, run_context,
+            leaf_outputs, gathered_outputs=None, gather_index=None
+        )
+        self._complete_run(run)
+
+        return leaf_outputs
+
+    def resume(
+            self,
+            run_id: str,
+            context: dict[str, Any] | None = None,
+            max_parallelism: int = 1,
+            profiler: GraphProfiler | None = None
+    ) -> list[Any]:
+        """
+        Resume an interrupted run. The run is executed with its original input, the steps that were
+        completed in an earlier attempt are restored from their checkpoints instead of being executed.
+
+        :param run_id: ID of the run to resume.
+        :param context: Context of this execution, added to the base context (e.g. a new page driver).
+        :param max_parallelism: Maximum number of steps that are executed at the same time.
+        :param profiler: Profiler recording the execution of every step.
+        :return: Outputs of the steps without children.
+        """
+        if self.checkpoint_store is None:
+            raise ValueError("Runs can only be resumed when the graph is compiled with a checkpoint store")
+
+        output_previous_node: Any = self.checkpoint_store.load_run_input(self.graph_hash, run_id)
+        return self.execute(output_previous_node, context, max_parallelism, run_id, profiler)
+
+    def _execute_branch(
+            self,
+            run: GraphRun,
+            index: int,
+            step_key: str,
+            output_previous_node: Any,
+            context: dict[str, Any],
+            leaf_outputs: list[Any],
+            gathered_outputs: list[Any] | None,
+            gather_index: int | None
+    ):
+        """
+        Execute the step and afterwards all branches starting at its children in a depth-first manner.
+
+        :param run: State of the run.
+        :param index: Index of the step to execute.
+        :param step_key: Path of node ids identifying this execution of the step.
+        :param output_previous_node: The output of the parent step.
+        :param context: The context of the branch, shared with the children.
+        :param leaf_outputs: Outputs of the steps without children.
+        :param gathered_outputs: Outputs collected for the gather step of the enclosing map step.
+        :param gather_index: Index of the gather step of the enclosing map step, at which the branch ends.
+        """
+        step: CompiledStep = self.steps[index]
+        step_output: Any = self._run_step(run, step, step_key, output_previous_node, context)
+
+        if step.is_map:
+            # Execute the branches of the children for each item and collect the outputs for the gather step
+            item_outputs: list[Any] = []
+            for item_index, item in enumerate(step_output):
+                for child_index in reversed(step.children):
+                    self._execute_branch(
+                        run, child_index, f"{step_key}[{item_index}]/{self.steps[child_index].node_id}", item,
+                        dict(context), leaf_outputs, item_outputs, step.gather_index
+                    )
+
+            self._execute_branch(
+                run, step.gather_index, f"{step_key}/{self.steps[step.gather_index].node_id}", item_outputs,
+                dict(context), leaf_outputs, gathered_outputs, gather_index
+            )
+            return
+
+        if not step.children:
+            leaf_outputs.append(step_output)
+
+        # The last child is executed first, following the depth-first order of a node stack
+        for child_index in reversed(step.children):
+            if child_index == gather_index:
+                gathered_outputs.append(step_output)
+                continue
+
+            self._execute_branch(
+                run, child_index, f"{step_key}/{self.steps[child_index].node_id}", step_output,
+                context, leaf_outputs, gathered_outputs, gather_index
+            )
+
+    async def execute_async(
+            self,
+            output_previous_node: Any = None,
+            context: dict[str, Any] | None = None,
+            max_parallelism: int = 1,
+            run_id: str | None = None,
+            profiler: GraphProfiler | None = None
+    ) -> list[Any]:
+        """
+        Execute the plan on the running event loop by scheduling every step as soon as its parent has finished,
+        so that independent branches overlap. Coroutine functions are awaited on the event loop and
+        synchronous functions run in a thread pool. At most max_parallelism steps run at the same time.
+        The items of a map step are executed concurrently as well, bounded by the max_parallelism of the map step.
+
+        Every branch receives its own copy of the context. Context set by a step is therefore available to its
+        children, but not to its siblings. The copy is shallow, objects in the context (e.g. the page driver) are shared.
+
+        Many executions (e.g. one per VC) can run concurrently on a single event loop by gathering
+        their execute_async coroutines. Note that the synchronous Playwright page is bound to the thread that
+        created it, plans executed this way should use an asynchronous page driver and node functions.
+
+        :param output_previous_node: Input of the start step (e.g. the URL of the VC to scrape).
+        :param context: Context of this execution, added to the base context (e.g. a page driver per execution).
+        :param max_parallelism: Maximum number of steps that are executed at the same time.
+        :param run_id: ID of the run, used to checkpoint the outputs of the steps when a checkpoint store is configured.
+        :param profiler: Profiler recording the execution of every step.
+        :return: Outputs of the steps without children, in the same order as the sequential execution.
+        """
+        run, run_context = self._start_run(output_previous_node, context, run_id, profiler)
+
+        semaphore = asyncio.Semaphore(max_parallelism)
+        loop = asyncio.get_running_loop()
+
+        with ThreadPoolExecutor(max_workers=max_parallelism) as executor:
+            async def execute_branch(
+                    index: int,
+                    step_key: str,
+                    step_input: Any,
+                    branch_context: dict[str, Any],
+                    gather_index: int | None
+            ) -> tuple[list[Any], list[Any]]:
+                """
+                Execute the step and afterwards all branches starting at its children. The outputs are returned
+                in the order of the depth-first execution of the sequential scheduler, independent of which
+                branch finishes first.
+
+                :return: Outputs of the steps without children, outputs collected for the gather step
+                """
+                step: CompiledStep = self.steps[index]
+                async with semaphore:
+                    if step.is_async:
+                        step_output: Any = await self._run_step_async(run, step, step_key, step_input, branch_context)
+                    else:
+                        step_output: Any = await loop.run_in_executor(
+                            executor, self._run_step, run, step, step_key, step_input, branch_context
+                        )
+
+                if step.is_map:
+                    items_semaphore = asyncio.Semaphore(step.max_parallelism)
+
+                    async def execute_item(item_index: int, item: Any) -> tuple[list[Any], list[Any]]:
+                        """Execute the branches of the children for a single item and collect their outputs."""
+                        async with items_semaphore:
+                            item_results: list[tuple[list[Any], list[Any]]] = await asyncio.gather(*(
+                                execute_branch(
+                                    child_index, f"{step_key}[{item_index}]/{self.steps[child_index].node_id}", item,
+                                    dict(branch_context), step.gather_index
+                                )
+                                for child_index in reversed(step.children)
+                            ))
+                        return _concatenate_outputs(item_results)
+
+                    # Collect the outputs in the order of the items
+                    map_leaf_outputs, item_outputs = _concatenate_outputs(await asyncio.gather(
+                        *(execute_item(item_index, item) for item_index, item in enumerate(step_output))
+                    ))
+                    gather_leaf_outputs, gathered_outputs = await execute_branch(
+                        step.gather_index, f"{step_key}/{self.steps[step.gather_index].node_id}", item_outputs,
+                        dict(branch_context), gather_index
+                    )
+                    return map_leaf_outputs + gather_leaf_outputs, gathered_outputs
+
+                async def execute_child(child_index: int) -> tuple[list[Any], list[Any]]:
+                    """Execute the branch of a child, the gather step of the enclosing map step collects the output."""
+                    if child_index == gather_index:
+                        return [], [step_output]
+
+                    return await execute_branch(
+                        child_index, f"{step_key}/{self.steps[child_index].node_id}", step_output,
+                        dict(branch_context), gather_index
+                    )
+
+                # The last child comes first, following the depth-first order of the sequential scheduler
+                leaf_outputs, gathered_outputs = _concatenate_outputs(await asyncio.gather(
+                    *(execute_child(child_index) for child_index in reversed(step.children))
+                ))
+                return ([step_output] if not step.children else []) + leaf_outputs, gathered_outputs
+
+            leaf_outputs, _ = await execute_branch(
+                self.start_index, self.steps[self.start_index].node_id, output_previous_node, run_context,
+                gather_index=None
+            )
+
+        self._complete_run(run)
+        return leaf_outputs
+
+
+def _event_loop_is_running() -> bool:
+    """Whether the calling thread runs an event loop, in which asyncio.run can not start another one."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _concatenate_outputs(results: list[tuple[list[Any], list[Any]]]) -> tuple[list[Any], list[Any]]:
+    """Concatenate the leaf outputs and the gathered outputs of branches, keeping the order of the branches."""
+    return (
+        [output for leaf_outputs, _ in results for output in leaf_outputs],
+        [output for _, gathered_outputs in results for output in gathered_outputs],
+    )
+
+
+def _validate_graph(nodes: dict[str, Node], edges: dict[str, list[str]], start_node_id: str):
+    """
+    Validate that the graph can be executed: the start node and all nodes referenced by edges and map nodes exist,
+    all functions are registered in NODE_NAME_TO_FUNCTION_MAP, the graph does not contain cycles and every
+    per-item branch of a map node reaches its gather node.
+
+    :param nodes: The nodes of the graph.
+    :param edges: The edges of the graph.
+    :param start_node_id: The id of the node where the execution should start.
+    """
+    if start_node_id not in nodes:
+        raise GraphValidationError(f"Start node {start_node_id} is not in the graph")
+
+    for parent_id, child_ids in edges.items():
+        for node_id in [parent_id, *child_ids]:
+            if node_id not in nodes:
+                raise GraphValidationError(f"Edge {parent_id} -> {child_ids} references missing node {node_id}")
+
+    for node in nodes.values():
+        function_name: str = node.function.__name__
+        if NODE_NAME_TO_FUNCTION_MAP.get(function_name) is not node.function:
+            raise GraphValidationError(f"Node {node.id} uses unknown function {function_name}")
+
+        if isinstance(node, MapNode) and not isinstance(nodes.get(node.gather_node_id), GatherNode):
+            raise GraphValidationError(f"Map node {node.id} references missing gather node {node.gather_node_id}")
+
+    # Depth-first search for back edges, which close a cycle
+    VISITING, VISITED = 1, 2
+    node_states: dict[str, int] = {}
+    for root_id in nodes:
+        if root_id in node_states:
+            continue
+
+        node_states[root_id] = VISITING
+        dfs_stack: list[tuple[str, Iterator[str]]] = [(root_id, iter(edges.get(root_id, [])))]
+        while dfs_stack:
+            node_id, children = dfs_stack[-1]
+            child_id: str | None = next(children, None)
+
+            if child_id is None:
+                node_states[node_id] = VISITED
+                dfs_stack.pop()
+            elif node_states.get(child_id) == VISITING:
+                raise GraphValidationError(f"Graph contains a cycle through {node_id} -> {child_id}")
+            elif child_id not in node_states:
+                node_states[child_id] = VISITING
+                dfs_stack.append((child_id, iter(edges.get(child_id, []))))
+
+    # Only the outputs of the nodes with an edge to the gather node are gathered, a branch of a map node that does
+    # not reach the gather node would silently contribute nothing
+    for node in nodes.values():
+        if not isinstance(node, MapNode):
+            continue
+
+        for branch_id in edges.get(node.id, []):
+            reached_ids: set[str] = {branch_id}
+            pending_ids: list[str] = [branch_id]
+            while pending_ids and node.gather_node_id not in reached_ids:
+                for child_id in edges.get(pending_ids.pop(), []):
+                    if child_id not in reached_ids:
+                        reached_ids.add(child_id)
+                        pending_ids.append(child_id)
+
+            if node.gather_node_id not in reached_ids:
+                raise GraphValidationError(
+                    f"Branch {branch_id} of map node {node.id} does not reach gather node {node.gather_node_id}"
+                )
+
+
+def _topological_order(nodes: dict[str, Node], edges: dict[str, list[str]], start_node_id: str) -> list[str]:
+    """
+    Order the nodes reachable from the start node topologically. Gather nodes are reachable through their map node.
+
+    :param nodes: The nodes of the graph.
+    :param edges: The edges of the graph.
+    :param start_node_id: The id of the node where the execution should start.
+    :return: Ids of the reachable nodes in topological order.
+    """
+    def successors(node_id: str) -> list[str]:
+        node: Node = nodes[node_id]
+        return [*edges.get(node_id, []), *([node.gather_node_id] if isinstance(node, MapNode) else [])]
+
+    # Reverse post-order of a depth-first search is a topological order for acyclic graphs
+    post_order: list[str] = []
+    visited: set[str] = {start_node_id}
+    dfs_stack: list[tuple[str, Iterator[str]]] = [(start_node_id, iter(successors(start_node_id)))]
+    while dfs_stack:
+        node_id, children = dfs_stack[-1]
+        child_id: str | None = next(children, None)
+
+        if child_id is None:
+            post_order.append(node_id)
+            dfs_stack.pop()
+        elif child_id not in visited:
+            visited.add(child_id)
+            dfs_stack.append((child_id, iter(successors(child_id))))
+
+    return post_order[::-1]
+
+
+def compile_graph(
+        nodes: dict[str, Node],
+        edges: dict[str, list[str]],
+        start_node_id: str,
+        base_context: dict[str, Any],
+        checkpoint_store: CheckpointStore | None = None,
+        node_cache: NodeOutputCache | None = DEFAULT_NODE_CACHE
+) -> CompiledScraperGraph:
+    """
+    Validate the graph and compile it into an immutable execution plan.
+
+    :param nodes: The nodes of the graph.
+    :param edges: The edges of the graph.
+    :param start_node_id: The id of the node where the execution should start.
+    :param base_context: Context shared by all executions of the plan.
+    :param checkpoint_store: Store for the outputs of the steps, None disables checkpointing.
+    :param node_cache: Cache for the outputs of nodes with a cache policy, None disables memoization.
+    :return: The compiled graph.
+    """
+    _validate_graph(nodes, edges, start_node_id)
+
+    order: list[str] = _topological_order(nodes, edges, start_node_id)
+    index_of: dict[str, int] = {node_id: index for index, node_id in enumerate(order)}
+
+    steps: list[CompiledStep] = []
+    for node_id in order:
+        node: Node = nodes[node_id]
+        is_map: bool = isinstance(node, MapNode)
+        bound_inputs: dict[str, Any] = {**node.static_inputs, **node.dynamic_inputs}
+        steps.append(CompiledStep(
+            node_id=node_id,
+            function=node.function,
+            static_inputs=MappingProxyType(dict(node.static_inputs)),
+            bound_inputs=MappingProxyType(bound_inputs),
+            bound_function=partial(node.function, **bound_inputs),
+            takes_node="node" in inspect.signature(node.function).parameters,
+            children=tuple(index_of[child_id] for child_id in edges.get(node_id, [])),
+            is_async=node.is_async,
+            gather_index=index_of[node.gather_node_id] if is_map else None,
+            max_parallelism=node.max_parallelism if is_map else 1,
+            cache_policy=node.cache_policy,
+        ))
+
+    logging.debug(f"Compiled graph with {len(steps)} steps")
+
+    return CompiledScraperGraph(
+        steps=tuple(steps),
+        start_index=index_of[start_node_id],
+        base_context=MappingProxyType(dict(base_context)),
+        graph_hash=graph_hash({
+            "start_node_id": start_node_id,
+            "nodes": {node_id: nodes[node_id].serialize() for node_id in order},
+            "edges": {node_id: edges.get(node_id, []) for node_id in order},
+        }),
+        checkpoint_store=checkpoint_store,
+        node_cache=node_cache,
+    )
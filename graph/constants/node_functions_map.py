@@ -1,13 +1,50 @@
 # Standard
-from typing import Callable
+import importlib
+from typing import Callable, Iterator
+from collections.abc import MutableMapping
+
+
+class LazyFunctionMap(MutableMapping):
+    """
+    Mapping of node names to the executable functions, where every function is imported on its first lookup.
+    Importing the map does not import the node function modules, so e.g. Playwright is only imported
+    when a graph uses a navigation node.
+    """
+    def __init__(self, function_modules: dict[str, str]):
+        """
+        :param function_modules: Absolute name of the module defining the function, per function name
+        """
+        self._function_modules: dict[str, str] = dict(function_modules)
+        self._functions: dict[str, Callable] = {}
+
+    def __getitem__(self, function_name: str) -> Callable:
+        if function_name not in self._functions:
+            # Raises a KeyError for unknown function names
+            module_name: str = self._function_modules[function_name]
+            self._functions[function_name] = getattr(importlib.import_module(module_name), function_name)
+
+        return self._functions[function_name]
+
+    def __setitem__(self, function_name: str, function: Callable):
+        self._function_modules[function_name] = function.__module__
+        self._functions[function_name] = function
+
+    def __delitem__(self, function_name: str):
+        del self._function_modules[function_name]
+        self._functions.pop(function_name, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._function_modules)
+
+    def __len__(self) -> int:
+        return len(self._function_modules)
 
-# Node functions
-from graph.node_functions.flow_control import pass_through, add_result_object_to_context
-from graph.node_functions.navigation import navigate_to_url
 
 # Mapping of node names to the executable functions
-NODE_NAME_TO_FUNCTION_MAP: dict[str, Callable] = {
-    pass_through.__name__: pass_through,
-    add_result_object_to_context.__name__: add_result_object_to_context,
-    navigate_to_url.__name__: navigate_to_url,
-}
+NODE_NAME_TO_FUNCTION_MAP: LazyFunctionMap = LazyFunctionMap({
+    "pass_through": "graph.node_functions.flow_control",
+    "forward_output": "graph.node_functions.flow_control",
+    "add_result_object_to_context": "graph.node_functions.flow_control",
+    "navigate_to_url": "graph.node_functions.navigation",
+    "navigate_to_url_async": "graph.node_functions.navigation",
+})
@@ -0,0 +1,60 @@
+# Standard
+import asyncio
+import logging
+
+# Data structures to build the graph
+from graph.node import Node
+from graph.scraper_graph import ScraperGraph
+
+# functions to be executed by the nodes
+from graph.node_functions.flow_control import pass_through
+from graph.node_functions.navigation import navigate_to_url_async
+
+# Asynchronous browser infrastructure
+from scraper.playwrite_async import launch_browser_async, new_page_async
+from playwright.async_api import Browser, Page
+
+
+async def execute_portfolio_graph(browser: Browser, portfolio_url: str):
+    """
+    Build and execute the graph navigating to the portfolio page of a single VC on its own page of the shared browser.
+
+    :param browser: Playwright browser instance shared by all graphs
+    :param portfolio_url: URL of the portfolio page of the VC
+    """
+    page: Page = await new_page_async(browser)
+
+    graph = ScraperGraph(page_driver=page)
+    start_node = Node(id="1", function=pass_through, static_inputs={})
+    navigate_to_page_node = Node(id="2", function=navigate_to_url_async, static_inputs={"url": portfolio_url})
+
+    graph.add_node(start_node)
+    graph.add_node(navigate_to_page_node)
+    graph.add_edge(start_node, navigate_to_page_node)
+
+    await graph.execute_async()
+    await page.close()
+
+    logging.info(f"Executed graph for {portfolio_url}")
+
+
+async def execute_portfolio_graphs(portfolio_urls: list[str]):
+    """
+    Execute one graph per VC concurrently on a single event loop, sharing one browser.
+
+    :param portfolio_urls: URLs of the portfolio pages of the VCs
+    """
+    async with launch_browser_async() as browser:
+        await asyncio.gather(*(execute_portfolio_graph(browser, url) for url in portfolio_urls))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    PORTFOLIO_URLS: list[str] = [
+        "https://earlybird.com/portfolio",
+        "https://creandum.com/commitments",
+        "https://atomico.com/portfolio",
+    ]
+
+    asyncio.run(execute_portfolio_graphs(PORTFOLIO_URLS))
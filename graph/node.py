@@ -1,11 +1,15 @@
 # Standard
+import inspect
 import logging
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields, asdict
 from typing import Callable, Any
 
 # Node functions
 from graph.constants.node_functions_map import NODE_NAME_TO_FUNCTION_MAP
 
+# Memoization of node outputs
+from graph.node_cache import CachePolicy
+
 
 @dataclass
 class Node:
@@ -24,35 +28,96 @@ class Node:
     :param static_inputs: Configuration of the scraping step.
     :param dynamic_inputs: Outputs of the previous nodes in the graph.
     :param context: Inputs shared between nodes.
+    :param cache_policy: Opts the node into memoization of its output, for nodes that are pure functions of their inputs.
     """
     id: str
     function: Callable[..., Any]
     static_inputs: dict[str, any]
     dynamic_inputs: dict[str, any] = field(default_factory=dict)
     context: dict[str, any] = field(default_factory=dict)
+    cache_policy: CachePolicy | None = None
 
     def __call__(self) -> Any:
-        """Execute the function of the node."""
+        """
+        Execute the function of the node. For coroutine node functions the coroutine is returned,
+        which has to be awaited by the caller.
+        """
         function_inputs = {"node": self, **self.static_inputs, **self.dynamic_inputs, **self.context}
         return self.function(**function_inputs)
 
+    @property
+    def is_async(self) -> bool:
+        """Whether the function of the node is a coroutine function."""
+        return inspect.iscoroutinefunction(self.function)
+
     def serialize(self) -> dict[str, Any]:
-        """Transform the node to a dictionary representation. Only the static inputs are serialized."""
+        """
+        Transform the node to a dictionary representation. Only the static inputs, the cache policy and
+        the configuration fields of node subclasses (e.g. the gather node of a map node) are serialized.
+        """
         return {
             "id": self.id,
+            "type": type(self).__name__,
             "function": self.function.__name__,
             "static_inputs": self.static_inputs,
+            **({"cache_policy": asdict(self.cache_policy)} if self.cache_policy else {}),
+            **{name: getattr(self, name) for name in self._configuration_field_names()},
         }
 
     @classmethod
     def deserialize(cls, node_dict: dict[str, Any]):
-        """Compose a node from a dictionary representation."""
-        return cls(
+        """Compose a node from a dictionary representation. Nodes without a type are regular nodes."""
+        node_class: type[Node] = NODE_TYPE_NAME_TO_CLASS_MAP[node_dict.get("type", Node.__name__)]
+        return node_class(
             id=node_dict["id"],
             function=NODE_NAME_TO_FUNCTION_MAP[node_dict["function"]],
             static_inputs=node_dict["static_inputs"],
+            cache_policy=CachePolicy(**node_dict["cache_policy"]) if node_dict.get("cache_policy") else None,
+            **{name: node_dict[name] for name in node_class._configuration_field_names() if name in node_dict},
         )
 
+    @classmethod
+    def _configuration_field_names(cls) -> list[str]:
+        """Names of the fields added by a node subclass, which configure how the graph executes the node."""
+        node_field_names: set[str] = {node_field.name for node_field in fields(Node)}
+        return [node_field.name for node_field in fields(cls) if node_field.name not in node_field_names]
+
+
+@dataclass
+class MapNode(Node):
+    """
+    The map node fans out the execution of the graph. The output of its function must be an iterable,
+    for each item of the iterable the branches starting at the children of the map node are executed
+    with the item as output of the previous node (e.g. the extraction steps for each company tag of a section).
+    The per-item branches end at the gather node, which receives the collected outputs of all items.
+    Every branch starting at a child of the map node must reach the gather node through the edges of the graph,
+    the outputs of the nodes with an edge to the gather node are the outputs collected per item.
+
+    :param gather_node_id: The id of the node collecting the outputs of the per-item branches.
+    :param max_parallelism: Maximum number of items executed at the same time by the concurrent scheduler.
+    """
+    gather_node_id: str = ""
+    max_parallelism: int = 1
+
+
+@dataclass
+class GatherNode(Node):
+    """
+    The gather node collects the outputs of the per-item branches of a map node. It is executed once after
+    all items are finished, receiving the list of outputs in the order of the items as output of the previous node.
+    Only the outputs of the nodes with an edge to the gather node are collected, a node with an edge to the gather
+    node contributes one output per item (e.g. two such nodes give two outputs per item).
+    Its function reduces the outputs, after which the execution continues with the children of the gather node.
+    """
+
+
+# Mapping of node type names to the node classes, used to deserialize the nodes of a graph
+NODE_TYPE_NAME_TO_CLASS_MAP: dict[str, type[Node]] = {
+    Node.__name__: Node,
+    MapNode.__name__: MapNode,
+    GatherNode.__name__: GatherNode,
+}
+
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
@@ -0,0 +1,159 @@
+# Standard
+import json
+import time
+import pickle
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+
+# Metrics
+from utils.metrics import CACHE_REQUESTS
+
+
+# Directory of the disk tier of the node output cache
+NODE_CACHE_PATH: Path = Path(__file__).parent.parent / "node_cache"
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    Declares that the output of a node is a pure function of its static and dynamic inputs (e.g. HTML parsing),
+    so that the graph engine may reuse the output of an earlier execution with the same inputs.
+
+    :param ttl_seconds: Seconds after which a cached output expires, None to never expire.
+    :param persist: Whether to store the outputs in the disk tier as well, to reuse them across processes.
+    """
+    ttl_seconds: float | None = None
+    persist: bool = False
+
+
+def node_cache_key(function_name: str, inputs: dict[str, Any]) -> str | None:
+    """
+    Stable hash of the function and the inputs of a node. The key does not depend on the node id or the graph,
+    so graphs sharing the same steps share their cached outputs.
+
+    :param function_name: Name of the function of the node
+    :param inputs: Static and dynamic inputs of the node
+    :return: Hexadecimal key, None when the inputs can not be serialized and the output can therefore not be cached
+    """
+    try:
+        serialized_inputs: str = json.dumps([function_name, inputs], sort_keys=True)
+    except (TypeError, ValueError):
+        return None
+
+    return hashlib.sha256(serialized_inputs.encode()).hexdigest()
+
+
+class NodeOutputCache:
+    """
+    Two-tier cache of node outputs: a bounded in-memory LRU and an optional directory of pickle files.
+    The cache is thread-safe, as synchronous nodes are executed in a thread pool by the concurrent scheduler.
+    Hits and misses are counted per node id.
+    """
+    def __init__(self, max_entries: int = 1024, disk_path: Path = NODE_CACHE_PATH):
+        """
+        :param max_entries: Maximum number of outputs kept in memory
+        :param disk_path: Directory of the disk tier, used by nodes with a persisted cache policy
+        """
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._stats: defaultdict[str, dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+        self._lock = threading.Lock()
+
+    def _disk_entry_path(self, key: str) -> Path:
+        """File of a cached output in the disk tier."""
+        return self.disk_path / key[:2] / f"{key}.pkl"
+
+    def get(self, node_id: str, key: str, policy: CachePolicy) -> tuple[bool, Any]:
+        """
+        Look up the output of a node, first in memory and afterwards in the disk tier.
+
+        :param node_id: ID of the node, used for the hit and miss statistics
+        :param key: Cache key of the inputs of the node
+        :param policy: Cache policy of the node
+        :return: Whether the output was found, the cached output
+        """
+        with self._lock:
+            entry: tuple[float, Any] | None = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None and policy.persist and self._disk_entry_path(key).exists():
+            # An unreadable entry is a miss, the cache never fails the node
+            try:
+                with open(self._disk_entry_path(key), "rb") as file:
+                    entry = pickle.load(file)
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as error:
+                logging.warning(f"Can not read the cached output {key}: {error}")
+
+        found: bool = entry is not None and (policy.ttl_seconds is None or time.time() - entry[0] < policy.ttl_seconds)
+
+        with self._lock:
+            self._stats[node_id]["hits" if found else "misses"] += 1
+            if found and key not in self._entries:
+                self._store_in_memory(key, entry)
+
+        CACHE_REQUESTS.inc(cache="node_output", result="hit" if found else "miss")
+
+        return found, entry[1] if found else None
+
+    def put(self, key: str, output: Any, policy: CachePolicy):
+        """
+        Store the output of a node. Failing to persist the output is logged, the cache never fails the node.
+
+        :param key: Cache key of the inputs of the node
+        :param output: Output of the node
+        :param policy: Cache policy of the node
+        """
+        entry: tuple[float, Any] = (time.time(), output)
+        with self._lock:
+            self._store_in_memory(key, entry)
+
+        if policy.persist:
+            try:
+                serialized_entry: bytes = pickle.dumps(entry)
+            except (pickle.PicklingError, TypeError, AttributeError) as error:
+                logging.warning(f"Can not persist the cached output {key}: {error}")
+                return
+
+            # Every write has its own temporary file, concurrent puts of the same key each replace the entry whole
+            entry_path: Path = self._disk_entry_path(key)
+            temporary_path: Path | None = None
+            try:
+                entry_path.parent.mkdir(parents=True, exist_ok=True)
+                with tempfile.NamedTemporaryFile(dir=entry_path.parent, suffix=".tmp", delete=False) as file:
+                    temporary_path = Path(file.name)
+                    file.write(serialized_entry)
+                temporary_path.replace(entry_path)
+            except OSError as error:
+                logging.warning(f"Can not persist the cached output {key}: {error}")
+                if temporary_path is not None:
+                    temporary_path.unlink(missing_ok=True)
+
+    def _store_in_memory(self, key: str, entry: tuple[float, Any]):
+        """Store an entry in the LRU, evicting the least recently used entry when full. Requires the lock."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Hits and misses per node id."""
+        with self._lock:
+            return {node_id: dict(node_stats) for node_id, node_stats in self._stats.items()}
+
+    def log_stats(self):
+        """Log the hits and misses per node id."""
+        for node_id, node_stats in self.stats().items():
+            logging.info(f"Node {node_id} cache: {node_stats['hits']} hits, {node_stats['misses']} misses")
+
+
+# Cache shared by all compiled graphs of the process, unless a graph is compiled with its own cache
+DEFAULT_NODE_CACHE: NodeOutputCache = NodeOutputCache()
@@ -1,5 +1,6 @@
 # Standard
 import logging
+from typing import Any
 
 # Constants
 from graph.constants.result_objects_map import RESULT_OBJECT_NAME_TO_DATACLASS_MAP
@@ -10,6 +11,11 @@ def pass_through(**kwargs) -> None:
     pass
 
 
+def forward_output(output_previous_node: Any = None, **kwargs) -> Any:
+    """Return the output of the previous node, e.g. to fan out an iterable or to gather the outputs of a map node."""
+    return output_previous_node
+
+
 def add_result_object_to_context(node, result_object: str, **kwargs) -> None:
     """Add the result object to the context of the node."""
     node.context["result_object"] = RESULT_OBJECT_NAME_TO_DATACLASS_MAP[result_object]()
@@ -1,11 +1,14 @@
 # Standard
 import logging
+from typing import TYPE_CHECKING
 
-# Playwright
-from playwright.sync_api import Page
+# Playwright, only needed for the annotations as the page drivers are passed in
+if TYPE_CHECKING:
+    from playwright.sync_api import Page
+    from playwright.async_api import Page as AsyncPage
 
 
-def navigate_to_url(page_driver: Page, url: str, **kwargs) -> str:
+def navigate_to_url(page_driver: "Page", url: str, **kwargs) -> str:
     """
     Navigate to the URL and return the content of the page.
 
@@ -18,8 +21,22 @@ def navigate_to_url(page_driver: Page, url: str, **kwargs) -> str:
     return page_driver.content()
 
 
+async def navigate_to_url_async(page_driver: "AsyncPage", url: str, **kwargs) -> str:
+    """
+    Navigate to the URL and return the content of the page, using an asynchronous page driver.
+    Waiting for the page to load does not block the event loop, so many graphs can navigate at the same time.
+
+    :param page_driver: Asynchronous Playwright page object for interactions with the websites.
+    :param url: The URL to navigate to.
+    :return: HTML content of the page.
+    """
+    await page_driver.goto(url)
+
+    return await page_driver.content()
+
+
 if __name__ == "__main__":
-    from playwright.sync_api import sync_playwright, Browser
+    from playwright.sync_api import sync_playwright, Browser, Page
     logging.basicConfig(level=logging.INFO)
 
     with sync_playwright() as p:
@@ -0,0 +1,236 @@
+# Standard
+import os
+import re
+import json
+import time
+import pickle
+import hashlib
+import logging
+import threading
+import tracemalloc
+from pathlib import Path
+from typing import Any, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+
+
+@dataclass
+class NodeProfile:
+    """
+    Measurements of a single execution of a node.
+
+    :param node_id: The id of the node.
+    :param step_key: Path of node ids identifying the execution of the node.
+    :param start_time: Unix time in seconds at which the execution started.
+    :param wall_time: Duration of the execution in seconds.
+    :param cpu_time: CPU time of the executing thread in seconds. For coroutine nodes this includes
+        other work on the event loop while the node was awaiting.
+    :param output_bytes: Size of the output, None if the output could not be measured.
+    :param memory_delta: Change of the traced Python memory in bytes, None when memory is not tracked.
+    :param exception: Type and message of the exception raised by the node, None when it succeeded.
+    :param thread_id: ID of the thread which executed the node.
+    :param source: Where the output came from: executed, cache or checkpoint.
+    """
+    node_id: str
+    step_key: str
+    start_time: float
+    wall_time: float = 0
+    cpu_time: float = 0
+    output_bytes: int | None = None
+    memory_delta: int | None = None
+    exception: str | None = None
+    thread_id: int = 0
+    source: str = "executed"
+
+
+def output_size(output: Any) -> int | None:
+    """
+    Estimate the size of a node output in bytes. Text and bytes are measured directly,
+    other outputs by the size of their pickled representation.
+
+    :param output: Output of a node
+    :return: Size in bytes, None if the output can not be pickled
+    """
+    if output is None:
+        return 0
+    if isinstance(output, bytes):
+        return len(output)
+    if isinstance(output, str):
+        return len(output.encode())
+
+    try:
+        return len(pickle.dumps(output))
+    except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+        return None
+
+
+def _span_id(step_key: str) -> str:
+    """Deterministic 16 hex character span id of a step key."""
+    return hashlib.sha1(step_key.encode()).hexdigest()[:16]
+
+
+def _parent_step_key(step_key: str) -> str | None:
+    """Step key of the parent execution, stripping the item index of map branches."""
+    if "/" not in step_key:
+        return None
+
+    # Map branches append the item index to the key of the map step
+    return re.sub(r"\[\d+\]$", "", step_key.rsplit("/", 1)[0])
+
+
+class GraphProfiler:
+    """
+    Records wall time, CPU time, output size, memory delta and exceptions of every node executed in a graph run.
+    The profiles can be exported as Chrome trace events (to open a run in chrome://tracing or Perfetto)
+    or as OpenTelemetry-style spans, to find the slow steps per VC site.
+    A profiler tracking memory traces every allocation of the process until it is closed,
+    use it as context manager around the profiled runs.
+    """
+    def __init__(self, label: str = "graph", track_memory: bool = False):
+        """
+        :param label: Name of the profiled run (e.g. the domain of the VC), shown as process name in the trace
+        :param track_memory: Whether to measure the memory delta of the nodes with tracemalloc, which slows down execution
+        """
+        self.label = label
+        self.track_memory = track_memory
+        self.trace_id: str = hashlib.sha1(f"{label}-{time.time_ns()}".encode()).hexdigest()[:32]
+
+        self.profiles: list[NodeProfile] = []
+        self._lock = threading.Lock()
+
+        # Tracing started elsewhere (e.g. by another profiler) is left running when the profiler is closed
+        self._started_tracing: bool = False
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def __enter__(self) -> "GraphProfiler":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stop measuring the memory of the nodes, and stop tracing the allocations when this profiler started it."""
+        self.track_memory = False
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def profile(self, node_id: str, step_key: str) -> Iterator[NodeProfile]:
+        """
+        Measure the execution of a node. The output and source are set on the yielded profile by the caller.
+
+        :param node_id: The id of the node.
+        :param step_key: Path of node ids identifying the execution of the node.
+        :return: Profile of the execution
+        """
+        node_profile = NodeProfile(node_id=node_id, step_key=step_key, start_time=time.time())
+        node_profile.thread_id = threading.get_ident()
+
+        memory_before: int | None = tracemalloc.get_traced_memory()[0] if self.track_memory else None
+        wall_start: float = time.perf_counter()
+        cpu_start: float = time.thread_time()
+        try:
+            yield node_profile
+        except BaseException as exception:
+            node_profile.exception = f"{type(exception).__name__}: {exception}"
+            raise
+        finally:
+            node_profile.wall_time = time.perf_counter() - wall_start
+            node_profile.cpu_time = time.thread_time() - cpu_start
+            if memory_before is not None:
+                node_profile.memory_delta = tracemalloc.get_traced_memory()[0] - memory_before
+
+            with self._lock:
+                self.profiles.append(node_profile)
+
+    def summary(self) -> list[dict[str, Any]]:
+        """
+        Aggregate the profiles per node, sorted by total wall time.
+
+        :return: Number of executions, total wall and CPU time, total output size and errors per node
+        """
+        node_summaries: dict[str, dict[str, Any]] = {}
+        for node_profile in self.profiles:
+            node_summary: dict[str, Any] = node_summaries.setdefault(node_profile.node_id, {
+                "node_id": node_profile.node_id, "executions": 0, "wall_time": 0.0, "cpu_time": 0.0,
+                "output_bytes": 0, "errors": 0,
+            })
+            node_summary["executions"] += 1
+            node_summary["wall_time"] += node_profile.wall_time
+            node_summary["cpu_time"] += node_profile.cpu_time
+            node_summary["output_bytes"] += node_profile.output_bytes or 0
+            node_summary["errors"] += node_profile.exception is not None
+
+        return sorted(node_summaries.values(), key=lambda node_summary: node_summary["wall_time"], reverse=True)
+
+    def log_summary(self):
+        """Log the aggregated profiles per node, slowest node first."""
+        logging.info(f"Profile of {self.label}:")
+        for node_summary in self.summary():
+            logging.info(
+                f"Node {node_summary['node_id']}: {node_summary['executions']} executions, "
+                f"{node_summary['wall_time']:.3f}s wall, {node_summary['cpu_time']:.3f}s cpu, "
+                f"{node_summary['output_bytes']} output bytes, {node_summary['errors']} errors"
+            )
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """
+        Export the profiles in the Chrome trace event format, with one complete event per node execution.
+
+        :return: Trace which can be stored as JSON and opened in a trace viewer
+        """
+        process_id: int = os.getpid()
+        trace_events: list[dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": process_id, "args": {"name": self.label}}
+        ]
+        for node_profile in self.profiles:
+            trace_events.append({
+                "name": node_profile.node_id,
+                "cat": node_profile.source,
+                "ph": "X",
+                "ts": node_profile.start_time * 1e6,
+                "dur": node_profile.wall_time * 1e6,
+                "pid": process_id,
+                "tid": node_profile.thread_id,
+                "args": asdict(node_profile),
+            })
+
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, file_path: Path | str):
+        """Store the profiles as Chrome trace event JSON file."""
+        with open(file_path, "w") as file:
+            json.dump(self.to_chrome_trace(), file)
+
+    def to_spans(self) -> list[dict[str, Any]]:
+        """
+        Export the profiles as OpenTelemetry-style spans. Spans of child nodes reference the span of their parent node.
+
+        :return: Spans in the field layout of the OpenTelemetry protocol
+        """
+        spans: list[dict[str, Any]] = []
+        for node_profile in self.profiles:
+            parent_step_key: str | None = _parent_step_key(node_profile.step_key)
+            spans.append({
+                "trace_id": self.trace_id,
+                "span_id": _span_id(node_profile.step_key),
+                "parent_span_id": _span_id(parent_step_key) if parent_step_key else None,
+                "name": node_profile.node_id,
+                "start_time_unix_nano": int(node_profile.start_time * 1e9),
+                "end_time_unix_nano": int((node_profile.start_time + node_profile.wall_time) * 1e9),
+                "attributes": {
+                    "graph.label": self.label,
+                    "graph.step_key": node_profile.step_key,
+                    "node.source": node_profile.source,
+                    "node.cpu_time": node_profile.cpu_time,
+                    "node.output_bytes": node_profile.output_bytes,
+                    "node.memory_delta": node_profile.memory_delta,
+                },
+                "status": {"code": "ERROR", "message": node_profile.exception} if node_profile.exception
+                else {"code": "OK"},
+            })
+
+        return spans
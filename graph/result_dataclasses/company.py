@@ -1,18 +1,89 @@
 # Standard
-from dataclasses import dataclass, field
+import logging
+from dataclasses import dataclass, field, fields
+from typing import ClassVar
 
+# Data processing
+from utils.url_parsing import get_registrable_domain, get_endpoint
+from utils.general import str_to_int
 
-@dataclass
+
+@dataclass(slots=True)
 class Company:
     """
-    Stores the information of about a company.
+    Stores the information of about a company, in the format of the companies table.
+    Slotted, as a run holds a record for every company in the portfolios of all VCs.
 
     :param name: The name of the company.
+    :param domain: The registrable domain of the website of the company, the key of the company.
+    :param linkedin_endpoint: The endpoint of the LinkedIn page of the company, e.g. /company/example/.
     :param description: The description of the company.
+    :param location: The location of the company.
+    :param founded_year: The year the company was founded.
+    :param industry: The industry of the company.
+    :param id: The ID of the company in the database, None until the company is stored.
     """
+    # Columns of the companies table the scraped information is written to, in the order of the INSERT
+    COLUMNS: ClassVar[tuple[str, ...]] = (
+        "name", "domain", "linkedin_endpoint", "description", "location", "founded_year", "industry"
+    )
+
     name: str | None = field(default=None)
+    domain: str | None = field(default=None)
+    linkedin_endpoint: str | None = field(default=None)
     description: str | None = field(default=None)
+    location: str | None = field(default=None)
+    founded_year: int | None = field(default=None)
+    industry: str | None = field(default=None)
+    id: int | None = field(default=None)
 
     @classmethod
     def __name__(cls) -> str:
         return "Company"
+
+    @classmethod
+    def from_extraction(cls, company_information: dict[str, any]) -> "Company | None":
+        """
+        Validate and convert the company information extracted by GPT.
+
+        :param company_information: Company information in the JSON format of the extraction prompt
+        :return: Company, None when the name or website is missing
+        """
+        # The registrable domain is the key of the company, www.example.com and app.example.com are the same company
+        domain: str | None = get_registrable_domain(company_information.get("website"))
+        # Force required fields: name, website
+        if not company_information.get("name") or not domain:
+            return None
+
+        return cls(
+            name=company_information["name"],
+            domain=domain,
+            linkedin_endpoint=get_endpoint(company_information.get("linkedin_url")),
+            description=company_information.get("description"),
+            location=company_information.get("location"),
+            # Make sure that the year is in the correct format
+            founded_year=str_to_int(company_information.get("founded_year")),
+            industry=company_information.get("industry"),
+        )
+
+    @classmethod
+    def from_record(cls, record: dict[str, any]) -> "Company":
+        """
+        Convert a row of the companies table or a persisted record, ignoring columns which are not fields.
+
+        :param record: Company record with the column names as keys
+        :return: Company
+        """
+        return cls(**{company_field.name: record.get(company_field.name) for company_field in fields(cls)})
+
+    def as_record(self) -> dict[str, any]:
+        """
+        :return: Company record with the column names as keys, e.g. to persist it as JSON
+        """
+        return {company_field.name: getattr(self, company_field.name) for company_field in fields(self)}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    company = Company.from_extraction({"name": "Aiven", "website": "https://www.aiven.io/", "founded_year": "2016"})
+    logging.info(f"{company}, {company.as_record()}")
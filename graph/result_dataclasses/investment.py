@@ -0,0 +1,50 @@
+# Standard
+import logging
+from dataclasses import dataclass, field
+from typing import ClassVar
+
+# Data processing
+from utils.general import str_to_int
+
+
+@dataclass(frozen=True, slots=True)
+class Investment:
+    """
+    Stores the investment of a VC in a company, in the format of the investments table.
+    The company is referred to by its domain, its ID is only known once the company is stored.
+
+    :param vc_id: The ID of the VC in the database.
+    :param domain: The registrable domain of the company the VC invested in.
+    :param funding_year: The year the VC invested in the company.
+    :param round_type: The funding round of the investment, e.g. Seed or Series A.
+    """
+    # Columns of the investments table the scraped information is written to, besides the company ID
+    COLUMNS: ClassVar[tuple[str, ...]] = ("vc_id", "funding_year", "round_type")
+
+    vc_id: int
+    domain: str
+    funding_year: int | None = field(default=None)
+    round_type: str | None = field(default=None)
+
+    @classmethod
+    def from_extraction(cls, company_information: dict[str, any], vc_id: int, domain: str) -> "Investment":
+        """
+        Convert the investment information extracted by GPT along with the company.
+
+        :param company_information: Company information in the JSON format of the extraction prompt
+        :param vc_id: ID of the VC in the database
+        :param domain: Registrable domain of the company
+        :return: Investment
+        """
+        return cls(
+            vc_id=vc_id,
+            domain=domain,
+            # Make sure that the year is in the correct format, GPT calls the funding year the invested year
+            funding_year=str_to_int(company_information.get("invested_year")),
+            round_type=company_information.get("round_type"),
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    logging.info(Investment.from_extraction({"invested_year": "2019", "round_type": "Seed"}, vc_id=1, domain="aiven.io"))
@@ -0,0 +1,59 @@
+# Standard
+import logging
+from dataclasses import dataclass, field, fields
+from typing import ClassVar
+
+
+@dataclass(frozen=True, slots=True)
+class JobPosting:
+    """
+    Stores a job posting of a company, in the format of the jobs table.
+    A posting is identified by the company and its URL. Text longer than its column is truncated,
+    so that a single posting cannot fail the write of a batch.
+
+    :param company_id: The ID of the company in the database.
+    :param url: The URL of the posting, or of the job board listing it.
+    :param title: The title of the job.
+    :param location: The location of the job, e.g. Berlin, Germany.
+    :param department: The department or team of the job.
+    :param employment_type: The employment type of the job, e.g. FULL_TIME.
+    :param remote: Whether the job is remote, None when unknown.
+    :param description: The description of the job, as plain text.
+    :param posted_at: The date the job was posted, in ISO format (YYYY-MM-DD).
+    :param source: Where the posting was read from: json_ld, the name of an ATS provider or page_links.
+    :param external_id: The ID of the posting at the source.
+    """
+    # Maximum length of the text columns of the jobs table
+    COLUMN_LENGTHS: ClassVar[dict[str, int]] = {
+        "url": 2048, "title": 512, "location": 1024, "department": 512, "employment_type": 256, "source": 64,
+        "external_id": 256,
+    }
+
+    company_id: int
+    url: str
+    title: str
+    location: str | None = field(default=None)
+    department: str | None = field(default=None)
+    employment_type: str | None = field(default=None)
+    remote: bool | None = field(default=None)
+    description: str | None = field(default=None)
+    posted_at: str | None = field(default=None)
+    source: str = field(default="json_ld")
+    external_id: str | None = field(default=None)
+
+    def __post_init__(self):
+        for column, max_length in self.COLUMN_LENGTHS.items():
+            value: str | None = getattr(self, column)
+            if value is not None and len(value) > max_length:
+                object.__setattr__(self, column, value[:max_length])
+
+    def as_record(self) -> dict[str, any]:
+        """
+        :return: Posting record with the column names as keys, e.g. to hash it
+        """
+        return {posting_field.name: getattr(self, posting_field.name) for posting_field in fields(self)}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    logging.info(JobPosting(company_id=1, url="https://example.com/jobs/1", title="Backend engineer").as_record())
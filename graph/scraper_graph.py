@@ -1,29 +1,37 @@
 # Standard
 import json
 import logging
-from typing import Any
+from typing import Any, TYPE_CHECKING
 from collections import defaultdict
 
 # Node dataclasses
 from graph.node import Node
+from graph.compiled_graph import CompiledScraperGraph, compile_graph
+from graph.checkpoints import CheckpointStore
+from graph.node_cache import NodeOutputCache, DEFAULT_NODE_CACHE
+from graph.profiling import GraphProfiler
 
 # Result objects
 from graph.result_dataclasses.company import Company
 
-# Playwright
-from playwright.sync_api import sync_playwright, Browser, Page
+# Playwright, only needed for the annotations as the page driver is passed in
+if TYPE_CHECKING:
+    from playwright.sync_api import Page
+    from playwright.async_api import Page as AsyncPage
 
 
 class ScraperGraph:
     """
     Class representing a graph of nodes. Each node is an executable step in the scraping process.
     The graph is executed in a depth-first manner, passing the output of each node to its children.
+    Alternatively, independent branches of the graph can be executed concurrently.
+    Node functions can be regular functions or coroutine functions, the latter are awaited on the event loop.
     """
-    def __init__(self, page_driver: Page, start_node_id: str = "1"):
+    def __init__(self, page_driver: "Page | AsyncPage", start_node_id: str = "1"):
         """
         Initializes an empty graph. Nodes and edges are stored as dictionaries.
 
-        :param page_driver: Playwright page object for interactions with the websites.
+        :param page_driver: Playwright page object (sync or async) for interactions with the websites.
         :param start_node_id: The id of the node where the execution should start.
         """
         self.nodes: dict[str, Node] = {}
@@ -32,29 +40,89 @@ class ScraperGraph:
         self.start_node_id = start_node_id
         self.page_driver = page_driver
 
-    def execute(self):
+    def compile(
+            self,
+            checkpoint_store: CheckpointStore | None = None,
+            node_cache: NodeOutputCache | None = DEFAULT_NODE_CACHE
+    ) -> CompiledScraperGraph:
         """
-        Execute the steps of the graph in a depth-first manner. Each node is executed once,
+        Validate the graph (missing nodes, unknown functions and cycles) and compile it into an immutable,
+        re-entrant execution plan. Compile once to execute the same graph for many inputs.
+
+        :param checkpoint_store: Store for the outputs of the nodes of runs with a run id, None disables checkpointing.
+        :param node_cache: Cache for the outputs of nodes with a cache policy, shared by all graphs of the process
+            by default. None disables memoization.
+        :return: The compiled graph.
+        """
+        return compile_graph(
+            nodes=self.nodes,
+            edges=self.edges,
+            start_node_id=self.start_node_id,
+            base_context=self.nodes[self.start_node_id].context if self.start_node_id in self.nodes else {},
+            checkpoint_store=checkpoint_store,
+            node_cache=node_cache,
+        )
+
+    def execute(
+            self,
+            max_parallelism: int = 1,
+            run_id: str | None = None,
+            profiler: GraphProfiler | None = None
+    ) -> list[Any]:
+        """
+        Compile and execute the steps of the graph in a depth-first manner. Each node is executed once,
         passing the output to its children. Additionally, the context of a node is passed to its children.
         This ensures that once a context like the result object is set, it is available to all children.
-        """
-        # Add the first node to the node stack, which will be executed first
-        nodes_stack: list[Node] = [self.nodes[self.start_node_id]]
-
-        # Execute the nodes in a depth-first manner
-        while nodes_stack:
-            node: Node = nodes_stack.pop()
-            # Execute the node function with the inputs
-            node_output: Any = node()
-
-            for child_id in self.edges[node.id]:
-                child_node: Node = self.nodes[child_id]
+        See CompiledScraperGraph.execute for the execution of map nodes and the concurrent scheduler.
 
-                # Add the output of the node to the input of the children
-                child_node.dynamic_inputs["output_previous_node"] = node_output
-                child_node.context = node.context
+        :param max_parallelism: Maximum number of nodes that are executed at the same time.
+        :param run_id: When given, the output of every node is checkpointed so the run can be resumed.
+        :param profiler: When given, the wall time, CPU time, output size and exceptions of every node are recorded.
+        :return: Outputs of the nodes without children.
+        """
+        checkpoint_store: CheckpointStore | None = CheckpointStore() if run_id is not None else None
+        return self.compile(checkpoint_store).execute(max_parallelism=max_parallelism, run_id=run_id, profiler=profiler)
+
+    async def execute_async(
+            self,
+            max_parallelism: int = 1,
+            run_id: str | None = None,
+            profiler: GraphProfiler | None = None
+    ) -> list[Any]:
+        """
+        Compile and execute the graph on the running event loop, executing independent branches concurrently.
+        See CompiledScraperGraph.execute_async.
 
-                nodes_stack.append(child_node)
+        :param max_parallelism: Maximum number of nodes that are executed at the same time.
+        :param run_id: When given, the output of every node is checkpointed so the run can be resumed.
+        :param profiler: When given, the wall time, CPU time, output size and exceptions of every node are recorded.
+        :return: Outputs of the nodes without children.
+        """
+        checkpoint_store: CheckpointStore | None = CheckpointStore() if run_id is not None else None
+        return await self.compile(checkpoint_store).execute_async(
+            max_parallelism=max_parallelism, run_id=run_id, profiler=profiler
+        )
+
+    def resume(
+            self,
+            run_id: str,
+            max_parallelism: int = 1,
+            context: dict[str, Any] | None = None,
+            profiler: GraphProfiler | None = None
+    ) -> list[Any]:
+        """
+        Resume a run that was interrupted (e.g. by a browser crash), skipping all nodes completed
+        in an earlier attempt. Only runs of the exact same graph can be resumed.
+
+        :param run_id: ID of the run given to execute.
+        :param max_parallelism: Maximum number of nodes that are executed at the same time.
+        :param context: Context replacing the context of the nodes, e.g. a new page driver after a browser crash.
+        :param profiler: When given, the wall time, CPU time, output size and exceptions of every node are recorded.
+        :return: Outputs of the nodes without children.
+        """
+        return self.compile(CheckpointStore()).resume(
+            run_id, context=context, max_parallelism=max_parallelism, profiler=profiler
+        )
 
     def add_node(self, node: Node):
         """Add a node to the graph."""
@@ -79,7 +147,7 @@ class ScraperGraph:
             json.dump(self.serialize(), file)
 
     @classmethod
-    def deserialize(cls, graph_dict: dict[str, Any], page_driver: Page) -> "ScraperGraph":
+    def deserialize(cls, graph_dict: dict[str, Any], page_driver: "Page | AsyncPage") -> "ScraperGraph":
         """Compose a graph from a dictionary representation."""
         graph = cls(page_driver=page_driver)
         for node_dict in graph_dict["nodes"].values():
@@ -92,12 +160,12 @@ class ScraperGraph:
         return graph
 
 
-def scraper_graph_from_file(file_path: str, page_driver: Page) -> "ScraperGraph":
+def scraper_graph_from_file(file_path: str, page_driver: "Page | AsyncPage") -> "ScraperGraph":
     """
     Create a graph from a file.
 
     :param file_path: The path to the file to load the graph configuration from.
-    :param page_driver: Playwright page object for interactions with the websites.
+    :param page_driver: Playwright page object (sync or async) for interactions with the websites.
     :return: The graph object.
     """
     with open(file_path, "r") as file:
@@ -106,6 +174,7 @@ def scraper_graph_from_file(file_path: str, page_driver: Page) -> "ScraperGraph"
 
 
 if __name__ == "__main__":
+    from playwright.sync_api import sync_playwright, Browser, Page
     from graph.node_functions.flow_control import pass_through, add_result_object_to_context
     logging.basicConfig(level=logging.INFO)
 
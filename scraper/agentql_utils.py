@@ -1,10 +1,25 @@
 # Standard
+import json
+import queue
+import hashlib
 import logging
+import threading
+from pathlib import Path
+from functools import lru_cache
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import TYPE_CHECKING
 
-# AgentQL
-import webql
-from webql.sync_api import Session, WQLResponseProxy
-from webql.sync_api.web import PlaywrightWebDriver
+# AgentQL, imported when the first session is started
+from utils.lazy_import import lazy_import
+webql = lazy_import("webql")
+webql_web = lazy_import("webql.sync_api.web")
+if TYPE_CHECKING:
+    from webql.sync_api import Session, WQLResponseProxy
+    from webql.sync_api.web import PlaywrightWebDriver
+
+# Metrics
+from utils.metrics import CACHE_REQUESTS, ERRORS, track_llm_request
 
 
 DIFFERENT_NAMING_QUERY_TEMPLATE: str = """
@@ -14,7 +29,31 @@ DIFFERENT_NAMING_QUERY_TEMPLATE: str = """
 """
 
 
-def get_link_from_clickable_options(query_response: WQLResponseProxy, clickable_options: list[str]) -> str | None:
+@lru_cache(maxsize=256)
+def naming_options_query(naming_options: tuple[str, ...]) -> str:
+    """
+    Generate the AgentQL query which searches any clickable with one of the naming options.
+    Generated once per set of naming options, as every domain is queried with the same options.
+
+    :param naming_options: Different naming conventions for the clickable page items
+    :return: AgentQL query
+    """
+    return DIFFERENT_NAMING_QUERY_TEMPLATE.format(naming_options='\n\t'.join(naming_options))
+
+
+def page_fingerprint(driver: "PlaywrightWebDriver") -> str:
+    """
+    Fingerprint of the page open in the driver: the hash of its accessibility tree, which is what AgentQL queries.
+    An unchanged page gives the same answer to the same query.
+
+    :param driver: Web driver with the page open
+    :return: Hexadecimal fingerprint of the page
+    """
+    accessibility_tree: str = json.dumps(driver.get_accessibility_tree(), sort_keys=True, default=str)
+    return hashlib.sha256(accessibility_tree.encode()).hexdigest()
+
+
+def get_link_from_clickable_options(query_response: "WQLResponseProxy", clickable_options: list[str]) -> str | None:
     """
     This function loops over all the clickable options that was queried to AgentQL
     and returns the first link found. When a clickable is not found in the query response,
@@ -29,11 +68,16 @@ def get_link_from_clickable_options(query_response: WQLResponseProxy, clickable_
             return getattr(query_response, clickable_option).get_attribute('href')
 
 
-def query_agentql_for_clickable_link(domain: str, naming_options: list[str], driver: PlaywrightWebDriver) -> str | None:
+def query_agentql_for_clickable_link(
+        domain: str,
+        naming_options: list[str],
+        driver: "PlaywrightWebDriver"
+) -> str | None:
     """
     Query AgentQL to find a clickable link on the website out of several multiple potential naming conventions
     for the clickable. Multiple options help AgentQL to find the right link even if sites use
     different naming conventions for the link.
+    Starts and stops a session for the single domain, use AgentQLLinkFinder to look up many domains.
 
     :param domain: Domain of the website to query
     :param naming_options: Different naming conventions for the clickable page items
@@ -47,12 +91,11 @@ def query_agentql_for_clickable_link(domain: str, naming_options: list[str], dri
     driver.wait_for_page_ready_state()
 
     # Generate an agentql query which searches of any button with the given naming options
-    query: str = DIFFERENT_NAMING_QUERY_TEMPLATE.format(
-        naming_options='\n\t'.join(naming_options)
-    )
+    query: str = naming_options_query(tuple(naming_options))
     logging.info(f"Querying AgentQL with: {query}")
 
-    query_response: WQLResponseProxy = session.query(query=query)
+    with track_llm_request("query_agentql_for_clickable_link", "agentql"):
+        query_response: WQLResponseProxy = session.query(query=query)
 
     # Get the first link found in the query response that matches one of the naming options
     clickable_link: str | None = get_link_from_clickable_options(query_response, naming_options)
@@ -62,15 +105,180 @@ def query_agentql_for_clickable_link(domain: str, naming_options: list[str], dri
     return clickable_link
 
 
+class AgentQLLinkFinder:
+    """
+    Finds clickable links with AgentQL on a pool of browser sessions, which are kept open across domains
+    instead of started and stopped per domain. Each session is owned by a worker thread, as the Playwright
+    driver of a session may only be used by the thread that started it, and the workers query different
+    domains at the same time.
+
+    The links are cached by domain, fingerprint of the page and query. A domain whose page did not change
+    is answered from the cache after loading the page, without an AgentQL request.
+    """
+    def __init__(
+            self,
+            sessions: int = 4,
+            headless: bool = True,
+            max_entries: int = 4096,
+            persist_path: Path | None = None
+    ):
+        """
+        :param sessions: Number of browser sessions, the number of domains queried at the same time
+        :param headless: Whether to run the browsers without a window
+        :param max_entries: Maximum number of cached links
+        :param persist_path: JSON file the cached links are loaded from and saved to, None to keep them in memory
+        """
+        self.headless = headless
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+
+        self._links: OrderedDict[str, str | None] = OrderedDict()
+        self._links_lock = threading.Lock()
+        if persist_path is not None and persist_path.exists():
+            with open(persist_path, "r") as file:
+                self._links.update(json.load(file))
+
+        self._jobs: queue.Queue[tuple[str, list[str], Future] | None] = queue.Queue()
+        self._workers: list[threading.Thread] = [
+            threading.Thread(target=self._work, name=f"agentql-session-{index}", daemon=True)
+            for index in range(sessions)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def __enter__(self) -> "AgentQLLinkFinder":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _cached_link(self, key: str) -> tuple[bool, str | None]:
+        """Look up a cached link, the link itself can be None when the page has no matching clickable."""
+        with self._links_lock:
+            found: bool = key in self._links
+            if found:
+                self._links.move_to_end(key)
+            link: str | None = self._links.get(key)
+
+        CACHE_REQUESTS.inc(cache="agentql", result="hit" if found else "miss")
+        return found, link
+
+    def _cache_link(self, key: str, link: str | None):
+        """Cache a link, evicting the least recently used link when full."""
+        with self._links_lock:
+            self._links[key] = link
+            self._links.move_to_end(key)
+            if len(self._links) > self.max_entries:
+                self._links.popitem(last=False)
+
+    def _query_page(
+            self,
+            domain: str,
+            naming_options: list[str],
+            session: "Session",
+            driver: "PlaywrightWebDriver"
+    ) -> str | None:
+        """Query the page open in the session, unless the same page was queried before."""
+        driver.wait_for_page_ready_state()
+
+        query: str = naming_options_query(tuple(naming_options))
+        key: str = hashlib.sha256(json.dumps([domain, page_fingerprint(driver), query]).encode()).hexdigest()
+        found, clickable_link = self._cached_link(key)
+        if found:
+            return clickable_link
+
+        with track_llm_request("query_agentql_for_clickable_link", "agentql"):
+            query_response: WQLResponseProxy = session.query(query=query)
+        clickable_link = get_link_from_clickable_options(query_response, naming_options)
+
+        self._cache_link(key, clickable_link)
+        return clickable_link
+
+    def _work(self):
+        """Answer the lookups of the queue with the session of the thread, which is started by the first lookup."""
+        session: Session | None = None
+        driver: PlaywrightWebDriver | None = None
+        while (job := self._jobs.get()) is not None:
+            domain, naming_options, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                if session is None:
+                    driver = webql_web.PlaywrightWebDriver(headless=self.headless)
+                    session = webql.start_session(domain, web_driver=driver)
+                else:
+                    driver.open_url(domain)
+                future.set_result(self._query_page(domain, naming_options, session, driver))
+            except Exception as error:
+                future.set_exception(error)
+                # The browser may be left in a broken state, the next lookup starts a new session
+                if session is not None:
+                    try:
+                        session.stop()
+                    except Exception as stop_error:
+                        logging.debug(f"Failed to stop the AgentQL session: {stop_error}")
+                session = None
+
+        if session is not None:
+            session.stop()
+
+    def find_clickable_link(self, domain: str, naming_options: list[str]) -> str | None:
+        """
+        Find a clickable link on the website out of several potential naming conventions for the clickable.
+
+        :param domain: Domain of the website to query
+        :param naming_options: Different naming conventions for the clickable page items
+        :return: Link of the first clickable option found out of the potential naming conventions
+        """
+        future: Future = Future()
+        self._jobs.put((domain, naming_options, future))
+        return future.result()
+
+    def find_clickable_links(self, domains: list[str], naming_options: list[str]) -> dict[str, str | None]:
+        """
+        Find the clickable link on many websites at the same time, one website per session.
+
+        :param domains: Domains of the websites to query
+        :param naming_options: Different naming conventions for the clickable page items
+        :return: Link of the first clickable option found per domain, None when not found or the lookup failed
+        """
+        futures: dict[str, Future] = {}
+        for domain in dict.fromkeys(domains):
+            futures[domain] = Future()
+            self._jobs.put((domain, naming_options, futures[domain]))
+
+        clickable_links: dict[str, str | None] = {}
+        for domain, future in futures.items():
+            try:
+                clickable_links[domain] = future.result()
+            except Exception as error:
+                logging.error(f"Failed to find the clickable link on {domain}: {error}")
+                ERRORS.inc(stage="agentql", domain=domain)
+                clickable_links[domain] = None
+
+        return clickable_links
+
+    def close(self):
+        """Stop the sessions once the queued lookups are answered, and save the cached links."""
+        for _ in self._workers:
+            self._jobs.put(None)
+        for worker in self._workers:
+            worker.join()
+
+        if self.persist_path is not None:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path: Path = self.persist_path.with_suffix(".tmp")
+            with self._links_lock, open(temporary_path, "w") as file:
+                json.dump(self._links, file)
+            temporary_path.replace(self.persist_path)
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
 
-    DOMAIN: str = "earlybird.com"
+    DOMAINS: list[str] = ["earlybird.com", "pointnine.com", "cherry.vc"]
     BTNS: list[str] = ["portfolio_btn", "companies_btn"]
 
-    # Start Playwright web driver
-    driver: PlaywrightWebDriver = PlaywrightWebDriver(headless=False)
-
-    link: str | None = query_agentql_for_clickable_link(DOMAIN, BTNS, driver)
-
-    logging.info(link)
+    with AgentQLLinkFinder(sessions=2, headless=False) as link_finder:
+        logging.info(link_finder.find_clickable_links(DOMAINS, BTNS))
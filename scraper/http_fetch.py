@@ -0,0 +1,69 @@
+# Standard Libraries
+import gzip
+import zlib
+import json
+import logging
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+
+# General utilities
+from utils.url_parsing import get_domain_name
+from utils.metrics import PAGES_FETCHED, FETCH_LATENCY, ERRORS
+
+
+# Browser-like headers, some websites refuse requests without a user agent
+DEFAULT_HEADERS: dict[str, str] = {
+    "User-Agent": "Mozilla/5.0 (compatible; vc-jobs-scraper/1.0)",
+    "Accept-Encoding": "gzip, deflate",
+    "Accept-Language": "en",
+}
+
+
+def fetch_url(url: str, accept: str = "text/html", timeout: float = 15) -> str:
+    """
+    Fetch a URL with a plain HTTP request, without rendering it in the browser.
+    Much cheaper than the browser for pages which do not need JavaScript and for JSON APIs.
+
+    :param url: URL to fetch
+    :param accept: Accepted content type, e.g. application/json
+    :param timeout: Seconds to wait for the server
+    :return: Decoded body of the response
+    """
+    domain: str | None = get_domain_name(url)
+    request = Request(url, headers={**DEFAULT_HEADERS, "Accept": accept})
+    try:
+        with FETCH_LATENCY.time(source="http"):
+            with urlopen(request, timeout=timeout) as response:
+                body: bytes = response.read()
+                encoding: str = response.headers.get("Content-Encoding", "")
+                charset: str = response.headers.get_content_charset() or "utf-8"
+    except Exception as error:
+        PAGES_FETCHED.inc(source="http", status="error")
+        # A missing page is an answer, not an error of the scraper
+        if not (isinstance(error, HTTPError) and error.code == 404):
+            ERRORS.inc(stage="fetch", domain=domain)
+        raise
+
+    if encoding == "gzip":
+        body = gzip.decompress(body)
+    elif encoding == "deflate":
+        body = zlib.decompress(body)
+
+    PAGES_FETCHED.inc(source="http", status="ok")
+    return body.decode(charset, errors="replace")
+
+
+def fetch_json(url: str, timeout: float = 15) -> any:
+    """
+    Fetch and parse a JSON API response.
+
+    :param url: URL of the API endpoint
+    :param timeout: Seconds to wait for the server
+    :return: Parsed JSON
+    """
+    return json.loads(fetch_url(url, accept="application/json", timeout=timeout))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    logging.info(fetch_url("https://example.com")[:200])
@@ -1,16 +1,51 @@
 # Standard Libraries
 import logging
 import asyncio
-from time import sleep
+from typing import AsyncIterator, TYPE_CHECKING
+from contextlib import asynccontextmanager
 
-# Playwright
-from playwright.async_api import async_playwright, Browser
+# Playwright, imported when the first browser is launched
+from utils.lazy_import import lazy_import
+async_api = lazy_import("playwright.async_api")
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, Page
 
 # General utilities
 from utils.general import lst_in_batches
+from utils.url_parsing import get_domain_name
+from utils.metrics import PAGES_FETCHED, FETCH_LATENCY, PAGES_IN_FLIGHT, ERRORS
 
 
-async def scrape_webpage_content_async(url: str, browser: Browser) -> str:
+@asynccontextmanager
+async def launch_browser_async(headless: bool = False) -> "AsyncIterator[Browser]":
+    """
+    Launches a Chromium browser which can be shared by all asynchronous scraping on the event loop.
+
+    :param headless: Whether to run the browser without a window
+    :return: Playwright browser instance
+    """
+    async with async_api.async_playwright() as playwright:
+        browser: Browser = await playwright.chromium.launch(headless=headless)
+        try:
+            yield browser
+        finally:
+            await browser.close()
+
+
+async def new_page_async(browser: "Browser") -> "Page":
+    """
+    Opens a new page in the browser with image loading disabled to speed up scraping.
+
+    :param browser: Playwright browser instance
+    :return: Playwright page instance
+    """
+    page: Page = await browser.new_page()
+    await page.route('**/*.{png,jpg,jpeg,webp,gif}', lambda route: route.abort())
+
+    return page
+
+
+async def scrape_webpage_content_async(url: str, browser: "Browser") -> str:
     """
     Asynchronous function using Playwright to scrape the content of a webpage.
     Features include:
@@ -22,43 +57,48 @@ async def scrape_webpage_content_async(url: str, browser: Browser) -> str:
     :param browser: Playwright browser instance
     :return: HTML content of the webpage
     """
-    page = await browser.new_page()
-    # Disable image loading to speed up scraping
-    await page.route('**/*.{png,jpg,jpeg,webp,gif}', lambda route: route.abort())
-    await page.goto(url, wait_until='load')
-
-    # Scroll down
-    await page.mouse.wheel(0, 15000)
-
-    # Wait for the dynamic content to load
-    sleep(1.5)
-
-    html_content = await page.content()
-    await page.close()
-
+    domain: str | None = get_domain_name(url)
+    PAGES_IN_FLIGHT.inc()
+    try:
+        with FETCH_LATENCY.time(source="browser"):
+            page = await new_page_async(browser)
+            await page.goto(url, wait_until='load')
+
+            # Scroll down
+            await page.mouse.wheel(0, 15000)
+
+            # Wait for the dynamic content to load, without blocking the other pages on the event loop
+            await asyncio.sleep(1.5)
+
+            html_content = await page.content()
+            await page.close()
+    except Exception:
+        PAGES_FETCHED.inc(source="browser", status="error")
+        ERRORS.inc(stage="fetch", domain=domain)
+        raise
+    finally:
+        PAGES_IN_FLIGHT.dec()
+
+    PAGES_FETCHED.inc(source="browser", status="ok")
     return html_content
 
 
-async def scrape_webpages_content_async(urls: list[str]) -> list[str]:
+async def scrape_webpages_content_async(urls: list[str], batch_size: int = 5) -> list[str]:
     """
     Asynchronous function using Playwright to scrape the content of multiple webpages.
 
     :param urls: List of URLs of the webpages to scrape
+    :param batch_size: Number of webpages scraped at the same time
     :return: List of HTML content of the webpages
     """
-    BATCH_SIZE = 5
-
     webpages_content = []
-    async with async_playwright() as playwright:
-        browser = await playwright.chromium.launch(headless=False)
-        for batch_urls in lst_in_batches(urls, BATCH_SIZE):
+    async with launch_browser_async() as browser:
+        for batch_urls in lst_in_batches(urls, batch_size):
             # Scrape the content of each webpage using asyncio.gather for concurrency
             tasks = [scrape_webpage_content_async(url, browser) for url in batch_urls]
             batch_webpages_content = await asyncio.gather(*tasks)
             webpages_content.extend(batch_webpages_content)
 
-        await browser.close()
-
     return webpages_content
 
 
@@ -1,12 +1,20 @@
 # Standard
 import logging
 from time import sleep
+from typing import TYPE_CHECKING
 
-# Playwright
-from playwright.sync_api import sync_playwright, Browser
+# Playwright, imported when the first browser is launched
+from utils.lazy_import import lazy_import
+sync_api = lazy_import("playwright.sync_api")
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser
 
+# Metrics
+from utils.url_parsing import get_domain_name
+from utils.metrics import PAGES_FETCHED, FETCH_LATENCY, PAGES_IN_FLIGHT, ERRORS
 
-def scrape_webpage_content_sync(url: str, browser: Browser) -> str:
+
+def scrape_webpage_content_sync(url: str, browser: "Browser") -> str:
     """
     This function uses Playwright to scrape the content of a webpage in a synchronous manner.
     Some additional feature of the function include:
@@ -18,20 +26,31 @@ def scrape_webpage_content_sync(url: str, browser: Browser) -> str:
     :param browser: Playwright browser instance
     :return: HTML content of the webpage
     """
-    page = browser.new_page()
-    # Disable image loading to speed up the scraping
-    page.route('**/*.{png,jpg,jpeg,webp,gif}', lambda route: route.abort())
-    page.goto(url, wait_until='load')
-
-    # Scroll down
-    page.mouse.wheel(0, 15000)
-
-    # Wait for the dynamic content to load
-    sleep(1.5)
-
-    html_content = page.content()
-    page.close()
-
+    domain: str | None = get_domain_name(url)
+    PAGES_IN_FLIGHT.inc()
+    try:
+        with FETCH_LATENCY.time(source="browser"):
+            page = browser.new_page()
+            # Disable image loading to speed up the scraping
+            page.route('**/*.{png,jpg,jpeg,webp,gif}', lambda route: route.abort())
+            page.goto(url, wait_until='load')
+
+            # Scroll down
+            page.mouse.wheel(0, 15000)
+
+            # Wait for the dynamic content to load
+            sleep(1.5)
+
+            html_content = page.content()
+            page.close()
+    except Exception:
+        PAGES_FETCHED.inc(source="browser", status="error")
+        ERRORS.inc(stage="fetch", domain=domain)
+        raise
+    finally:
+        PAGES_IN_FLIGHT.dec()
+
+    PAGES_FETCHED.inc(source="browser", status="ok")
     return html_content
 
 
@@ -42,7 +61,7 @@ def scrape_webpages_content_sync(urls: list[str]) -> list[str]:
     :param urls: List of URLs of the webpages to scrape
     :return: List of HTML content of the webpages
     """
-    with sync_playwright() as playwright:
+    with sync_api.sync_playwright() as playwright:
         browser: Browser = playwright.chromium.launch(headless=False)
 
         # Scrape the content of each webpage
@@ -0,0 +1,256 @@
+# Standard
+import re
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Callable
+from dataclasses import replace
+
+# DB interactions
+from database.interaction_utils import execute_sql
+
+# Url parsing
+from utils.url_parsing import get_registrable_domain, get_endpoint
+
+# Hashing of the company texts
+from scraping_pipelines.scrape_scheduling import content_hash
+
+# Result objects
+from graph.result_dataclasses.company import Company
+
+
+# Columns of the companies table which are scraped, besides the domain
+COMPANY_FIELDS: tuple[str, ...] = tuple(column for column in Company.COLUMNS if column != "domain")
+# Links in the company text, as formatted by extract_text_and_links: "Website\n(https://example.com)"
+LINK_PATTERN: re.Pattern = re.compile(r"\((https?://[^\s()]+)\)")
+
+
+class CompanyIndex:
+    """
+    Index of the companies known in a run, keyed by their canonical domain and their LinkedIn endpoint.
+    The same startup is in the portfolio of many VCs, the index makes sure it is extracted and written once:
+        - Extractions are cached by the company text, and a company text linking to the website or LinkedIn page
+          of a known company reuses the known company information instead of prompting the LLM.
+        - Company records are merged with the known record, and only written when the merge changed it.
+
+    The index is preloaded from the companies table, and optionally persisted to a file between runs.
+    All methods are thread-safe, the LLM requests run outside of the lock.
+    """
+    def __init__(self, persist_path: Path | None = None, reuse_known_companies: bool = True):
+        """
+        :param persist_path: JSON file the index is loaded from and saved to, None to keep the index in memory
+        :param reuse_known_companies: Whether a company text linking to a known company skips the LLM extraction.
+            The investment fields (invested_year, round_type) are not known for a new VC and stay empty.
+        """
+        self.persist_path: Path | None = persist_path
+        self.reuse_known_companies: bool = reuse_known_companies
+
+        # Companies by canonical domain, with the id once the company is in the database
+        self._companies: dict[str, Company] = {}
+        # Copies of the companies as they are in the database, to skip writes which would not change anything
+        self._stored_companies: dict[str, Company] = {}
+        self._domains_by_linkedin_endpoint: dict[str, str] = {}
+        # Extracted company information by hash of the company text
+        self._extractions: dict[str, dict[str, any]] = {}
+        self._lock = threading.Lock()
+
+        if persist_path is not None and persist_path.exists():
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._companies)
+
+    def _add_company(self, company: Company, stored: bool):
+        """Add a company to the index, without the lock."""
+        self._companies[company.domain] = company
+        if stored:
+            self._stored_companies[company.domain] = replace(company)
+        if company.linkedin_endpoint:
+            self._domains_by_linkedin_endpoint[company.linkedin_endpoint] = company.domain
+
+    def preload(self) -> int:
+        """
+        Load the companies which are already in the database.
+
+        :return: Number of loaded companies
+        """
+        query: str = f"""
+        SELECT id, domain, {', '.join(COMPANY_FIELDS)}
+        FROM public.companies;
+        """
+        company_records: list[dict[str, any]] = execute_sql(query, return_values=True, verbose=False)
+
+        with self._lock:
+            for company_record in company_records:
+                self._add_company(Company.from_record(company_record), stored=True)
+
+        logging.info(f"Preloaded {len(company_records)} companies into the company index")
+        return len(company_records)
+
+    def canonical_domain(self, company: Company) -> str:
+        """
+        Domain under which the company is known: a company with the LinkedIn endpoint of a known company
+        is that company, even when its website has another domain.
+
+        :param company: Company in the format of the companies table
+        :return: Canonical domain of the company
+        """
+        return self._domains_by_linkedin_endpoint.get(company.linkedin_endpoint, company.domain)
+
+    def _find_linked_company(self, company_text: str) -> Company | None:
+        """Known company of which the company text links to the home page or the LinkedIn page, without the lock."""
+        for link in LINK_PATTERN.findall(company_text):
+            domain: str | None = get_registrable_domain(link)
+            endpoint: str | None = get_endpoint(link)
+            if domain == "linkedin.com":
+                known_company: Company | None = self._companies.get(self._domains_by_linkedin_endpoint.get(endpoint))
+            # Only the home page identifies the company, e.g. twitter.com/example is not the company twitter.com
+            elif endpoint in ("", "/"):
+                known_company: Company | None = self._companies.get(domain)
+            else:
+                continue
+
+            # Companies which were never fully extracted, e.g. only a name and domain, are extracted again
+            if known_company and known_company.description:
+                return known_company
+
+        return None
+
+    def extract(self, company_text: str, extract: Callable[[str], dict[str, any]]) -> dict[str, any]:
+        """
+        Extract the company information from the company text, unless it was extracted before in the run
+        or the text links to a known company.
+
+        :param company_text: Text and links of the company tag or subpage
+        :param extract: Extraction of the company information, e.g. the LLM extraction
+        :return: Company information in the format of the LLM extraction
+        """
+        text_hash: str = content_hash(company_text)
+        with self._lock:
+            if text_hash in self._extractions:
+                return self._extractions[text_hash]
+
+            known_company: Company | None = (
+                self._find_linked_company(company_text) if self.reuse_known_companies else None
+            )
+
+        if known_company:
+            logging.info(f"Reusing the known company {known_company.domain} instead of extracting it")
+            company_information: dict[str, any] = {
+                "name": known_company.name,
+                "website": f"https://{known_company.domain}",
+                "linkedin_url": (
+                    f"https://www.linkedin.com{known_company.linkedin_endpoint}"
+                    if known_company.linkedin_endpoint else None
+                ),
+                "description": known_company.description,
+                "location": known_company.location,
+                "founded_year": known_company.founded_year,
+                "industry": known_company.industry,
+                "invested_year": None,
+                "round_type": None,
+            }
+        else:
+            company_information: dict[str, any] = extract(company_text)
+
+        with self._lock:
+            self._extractions[text_hash] = company_information
+
+        return company_information
+
+    def merge(self, companies: list[Company]) -> tuple[list[Company], list[Company]]:
+        """
+        Merge the companies into the index. Fields the new company has overwrite the known fields,
+        fields it misses are kept, so a VC listing less information does not erase what another VC listed.
+
+        :param companies: Companies in the format of the companies table
+        :return: Merged company of every company, merged companies which must be written
+        """
+        merged_companies: list[Company] = []
+        changed_companies: dict[str, Company] = {}
+        with self._lock:
+            for company in companies:
+                domain: str = self.canonical_domain(company)
+                known_company: Company = self._companies.get(domain) or Company(domain=domain)
+                merged_company = Company(
+                    domain=domain,
+                    id=known_company.id,
+                    **{
+                        field: getattr(company, field) if getattr(company, field) is not None
+                        else getattr(known_company, field)
+                        for field in COMPANY_FIELDS
+                    },
+                )
+                self._add_company(merged_company, stored=False)
+                merged_companies.append(merged_company)
+
+                stored_company: Company = self._stored_companies.get(domain) or Company(domain=domain)
+                if any(getattr(merged_company, field) != getattr(stored_company, field) for field in COMPANY_FIELDS):
+                    changed_companies[domain] = merged_company
+
+        return merged_companies, list(changed_companies.values())
+
+    def mark_stored(self, company_ids: list[dict[str, any]]):
+        """
+        Record that the merged companies were written to the database.
+
+        :param company_ids: Records with the id and domain of the written companies
+        """
+        with self._lock:
+            for company_id in company_ids:
+                company: Company = self._companies[company_id["domain"]]
+                company.id = company_id["id"]
+                self._stored_companies[company.domain] = replace(company)
+
+    def company_id(self, domain: str) -> int | None:
+        """
+        :param domain: Canonical domain of the company
+        :return: ID of the company in the database, None when it is not stored yet
+        """
+        company: Company | None = self._companies.get(domain)
+        return company.id if company else None
+
+    def _load(self):
+        """Load the index from the persist file."""
+        with open(self.persist_path, "r") as file:
+            persisted_index: dict[str, any] = json.load(file)
+
+        for company_record in persisted_index["companies"]:
+            self._add_company(Company.from_record(company_record), stored=False)
+        self._extractions.update(persisted_index["extractions"])
+        logging.info(f"Loaded {len(self._companies)} companies and {len(self._extractions)} extractions "
+                     f"from {self.persist_path}")
+
+    def save(self):
+        """Save the index to the persist file, written to a temporary file first so a crash never truncates it."""
+        if self.persist_path is None:
+            return
+
+        with self._lock:
+            persisted_index: dict[str, any] = {
+                "companies": [company.as_record() for company in self._companies.values()],
+                "extractions": dict(self._extractions),
+            }
+
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path: Path = self.persist_path.with_suffix(".tmp")
+        with open(temporary_path, "w") as file:
+            json.dump(persisted_index, file, default=str)
+        temporary_path.replace(self.persist_path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    company_index = CompanyIndex()
+    merged, changed = company_index.merge([
+        Company(name="Aiven", domain="aiven.io", linkedin_endpoint="/company/aiven/", location="Helsinki",
+                founded_year=2016),
+    ])
+    logging.info(f"Merged: {merged}, to write: {changed}")
+    company_index.mark_stored([{"id": 1, "domain": "aiven.io"}])
+
+    merged, changed = company_index.merge([
+        Company(name="Aiven", domain="aiven.io", description="Your data cloud", industry="Data"),
+    ])
+    logging.info(f"Merged: {merged}, to write: {changed}")
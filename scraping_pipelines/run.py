@@ -0,0 +1,250 @@
+# Standard
+import time
+import logging
+import argparse
+from pathlib import Path
+from datetime import date
+from dataclasses import dataclass, replace
+from typing import Callable
+
+# Pipelines
+from scraping_pipelines.scrape_vc_home_page.main import scrape_portfolio_page_from_vc_domains
+from scraping_pipelines.scrape_vc_portfolio_page.main import (
+    scrape_portfolio_companies_information,
+    scrape_portfolio_companies_information_in_batch
+)
+from scraping_pipelines.scrape_vc_portfolio_page.streaming_pipeline import (
+    scrape_portfolio_companies_information_streaming,
+    StageConcurrency
+)
+from scraping_pipelines.scrape_company_jobs.main import scrape_company_jobs, JobsConcurrency
+
+# DB interactions
+from scraping_pipelines.scrape_vc_home_page.db_interactions import fetch_vc_domains
+from scraping_pipelines.scrape_vc_portfolio_page.db_interactions import fetch_portfolio_pages
+from scraping_pipelines.scrape_company_jobs.db_interactions import fetch_companies
+from database.interaction_utils import close_pool
+
+# Work selection
+from scraping_pipelines.work_selection import WorkSelection
+from scraping_pipelines.company_index import CompanyIndex
+
+# Metrics
+from utils.metrics import REGISTRY, start_metrics_server
+
+
+@dataclass(frozen=True)
+class Pipeline:
+    """
+    A pipeline that can be run from the command line.
+
+    :param fetch_work: Fetches the records of the VCs of a batch, used for dry runs.
+    :param run: Scrapes a batch of VCs with the given concurrency and returns the records of the scraped VCs.
+    :param records_outcomes: Whether the run records the scrape outcomes, which schedule the next scrape.
+        Only these pipelines can run prioritized, see WorkSelection.
+    """
+    fetch_work: Callable[[WorkSelection], list[dict[str, any]]]
+    run: Callable[[WorkSelection, int], list[dict[str, any]]]
+    records_outcomes: bool = True
+
+
+def build_pipelines(job_name: str, known_companies: CompanyIndex | None = None) -> dict[str, Pipeline]:
+    """
+    The pipelines selectable from the command line.
+
+    :param job_name: Name of the batch job, only used by the batch pipeline
+    :param known_companies: Index of the companies known in the run, shared by the batches of the companies pipelines
+    :return: Pipeline per name
+    """
+    return {
+        "portfolio-page": Pipeline(
+            fetch_work=fetch_vc_domains,
+            run=scrape_portfolio_page_from_vc_domains,
+            # Selects the VCs without a portfolio page, which are not scheduled
+            records_outcomes=False
+        ),
+        "portfolio-companies": Pipeline(
+            fetch_work=fetch_portfolio_pages,
+            run=lambda selection, concurrency: scrape_portfolio_companies_information(
+                selection, concurrency, known_companies
+            )
+        ),
+        "portfolio-companies-streaming": Pipeline(
+            fetch_work=fetch_portfolio_pages,
+            run=lambda selection, concurrency: scrape_portfolio_companies_information_streaming(
+                selection, StageConcurrency(fetchers=concurrency), known_companies
+            )
+        ),
+        "portfolio-companies-batch": Pipeline(
+            fetch_work=fetch_portfolio_pages,
+            # Every batch of VCs gets its own resumable batch job, also when the shard is drained again
+            run=lambda selection, concurrency: scrape_portfolio_companies_information_in_batch(
+                f"{job_name}-shard-{selection.shard_index}-of-{selection.shard_count}"
+                f"-drain-{selection.drain_cycle}-after-{selection.after_id}",
+                selection,
+                concurrency,
+                known_companies=known_companies
+            )
+        ),
+        # Scrapes the companies instead of the VCs, the concurrency limits the pages rendered by the browser
+        "company-jobs": Pipeline(
+            fetch_work=fetch_companies,
+            run=lambda selection, concurrency: scrape_company_jobs(
+                selection, JobsConcurrency(browser_pages=concurrency)
+            )
+        ),
+    }
+
+
+def run_pipeline(
+        pipeline: Pipeline,
+        selection: WorkSelection,
+        concurrency: int = 5,
+        max_items: int | None = None,
+        drain: bool = False,
+        poll_interval: float | None = None,
+        dry_run: bool = False
+) -> int:
+    """
+    Run a pipeline over the VCs of a shard, batch by batch.
+
+    Without drain a single batch is processed. With drain, batches are processed until the shard is exhausted,
+    so that N workers started with the shard indexes 0 to N-1 together cover the whole vc table.
+    A prioritized shard is exhausted once none of its VCs is due for a re-scrape, or every due VC was processed
+    in this drain. The latter ends the drain when outcomes are not recorded, e.g. in a dry run or a failed batch.
+    With a poll interval the worker keeps draining: after the shard is exhausted it waits and starts over.
+
+    :param pipeline: Pipeline to run
+    :param selection: Shard and batch size of the VCs to process
+    :param concurrency: Number of webpages scraped at the same time
+    :param max_items: Maximum number of VCs to process in total, None for no maximum
+    :param drain: Whether to process batches until the shard is exhausted
+    :param poll_interval: Seconds to wait before draining the shard again, None to stop once it is exhausted
+    :param dry_run: Only log the VCs that would be processed
+    :return: Number of processed VCs
+    """
+    if selection.prioritized and not pipeline.records_outcomes:
+        raise ValueError("The pipeline does not schedule the next scrape of its rows, it cannot run prioritized")
+
+    processed_items: int = 0
+    while max_items is None or processed_items < max_items:
+        if max_items is not None:
+            selection = replace(selection, batch_size=min(selection.batch_size, max_items - processed_items))
+
+        if dry_run:
+            db_records: list[dict[str, any]] = pipeline.fetch_work(selection)
+            for record in db_records:
+                logging.info(f"Would process: {record}")
+        else:
+            db_records: list[dict[str, any]] = pipeline.run(selection, concurrency)
+
+        processed_items += len(db_records)
+        logging.info(f"Processed {len(db_records)} VCs after id {selection.after_id}, {processed_items} in total")
+
+        if db_records:
+            selection = replace(
+                selection,
+                after_id=max(record['id'] for record in db_records),
+                processed_ids=(
+                    (*selection.processed_ids, *(record['id'] for record in db_records))
+                    if selection.prioritized else ()
+                )
+            )
+        elif drain and poll_interval is not None:
+            logging.info(f"Shard {selection.shard_index} is drained, starting over in {poll_interval} seconds")
+            time.sleep(poll_interval)
+            selection = replace(selection, after_id=0, processed_ids=(), drain_cycle=selection.drain_cycle + 1)
+            continue
+
+        if not drain or not db_records:
+            break
+
+    logging.info(f"Metrics of the run over {processed_items} VCs:")
+    REGISTRY.log_summary()
+
+    return processed_items
+
+
+def parse_arguments(pipeline_names: list[str]) -> argparse.Namespace:
+    """
+    Parse the command line arguments of the runner.
+
+    :param pipeline_names: Names of the selectable pipelines
+    :return: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Run a scraping pipeline over a shard of the VCs.")
+    parser.add_argument("pipeline", choices=pipeline_names, help="Pipeline to run")
+    parser.add_argument("--concurrency", type=int, default=5, help="Number of webpages scraped at the same time")
+    parser.add_argument("--batch-size", type=int, default=5, help="Number of VCs processed per batch")
+    parser.add_argument("--shard-index", type=int, default=0, help="Index of the shard of this worker")
+    parser.add_argument("--shard-count", type=int, default=1, help="Number of workers the VCs are split over")
+    parser.add_argument("--max-items", type=int, default=None, help="Maximum number of VCs to process")
+    parser.add_argument("--drain", action="store_true", help="Process batches until the shard is exhausted")
+    parser.add_argument(
+        "--poll-interval", type=float, default=None,
+        help="With --drain, seconds to wait before draining the shard again instead of stopping"
+    )
+    parser.add_argument(
+        "--prioritized", action="store_true",
+        help="Only process the VCs that are due for a re-scrape, most overdue first, instead of all VCs by id"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only log the VCs that would be processed")
+    parser.add_argument(
+        "--metrics-port", type=int, default=None, help="Expose the metrics for Prometheus on this local port"
+    )
+    parser.add_argument(
+        "--job-name", default=date.today().isoformat(), help="Name of the batch job of the batch pipeline"
+    )
+    parser.add_argument(
+        "--company-index", action="store_true",
+        help="Extract and write every company once per run, reusing the companies already in the database"
+    )
+    parser.add_argument(
+        "--company-index-path", type=Path, default=None,
+        help="With --company-index, JSON file to keep the company index in between runs"
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    """Entry point of the command line runner: python -m scraping_pipelines.run <pipeline> [options]"""
+    logging.basicConfig(level=logging.INFO)
+
+    pipeline_names: list[str] = list(build_pipelines(job_name="").keys())
+    arguments: argparse.Namespace = parse_arguments(pipeline_names)
+
+    selection = WorkSelection(
+        shard_index=arguments.shard_index,
+        shard_count=arguments.shard_count,
+        batch_size=arguments.batch_size,
+        prioritized=arguments.prioritized
+    )
+    known_companies: CompanyIndex | None = None
+    if arguments.company_index and not arguments.dry_run:
+        known_companies = CompanyIndex(persist_path=arguments.company_index_path)
+        known_companies.preload()
+    pipelines: dict[str, Pipeline] = build_pipelines(job_name=arguments.job_name, known_companies=known_companies)
+    pipeline: Pipeline = pipelines[arguments.pipeline]
+
+    if arguments.metrics_port is not None:
+        start_metrics_server(arguments.metrics_port)
+
+    try:
+        run_pipeline(
+            pipeline,
+            selection,
+            concurrency=arguments.concurrency,
+            max_items=arguments.max_items,
+            drain=arguments.drain,
+            poll_interval=arguments.poll_interval,
+            dry_run=arguments.dry_run
+        )
+    finally:
+        if known_companies is not None:
+            known_companies.save()
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+# Standard
+import re
+import logging
+from datetime import datetime, timezone
+from dataclasses import dataclass
+from typing import Callable
+
+# Result objects
+from graph.result_dataclasses.job_posting import JobPosting
+
+# Fetching the job boards of the ATS providers
+from scraper.http_fetch import fetch_json
+
+# General utilities
+from utils.general import iso_date
+from utils.html_processing import html_to_text
+
+
+@dataclass(frozen=True)
+class AtsExtractor:
+    """
+    Reads the job board of an ATS provider from its public JSON API, without the browser, BeautifulSoup or the LLM.
+
+    :param provider: Name of the ATS provider, the source of its postings
+    :param board_pattern: Pattern of the URLs of the job boards, the named groups fill the API endpoint
+    :param api_endpoint: API endpoint of a job board, e.g. https://api.lever.co/v0/postings/{token}?mode=json
+    :param parse: Reads the postings from the API response, given the response and the ID of the company
+    """
+    provider: str
+    board_pattern: re.Pattern
+    api_endpoint: str
+    parse: Callable[[any, int], list[JobPosting]]
+
+
+# Extractors by ATS provider, checked in the order of registration
+ATS_EXTRACTORS: dict[str, AtsExtractor] = {}
+
+
+def register_ats_extractor(provider: str, board_pattern: str, api_endpoint: str) -> Callable:
+    """
+    Decorator registering the parser of the API response of an ATS provider as the extractor of its job boards.
+
+    :param provider: Name of the ATS provider
+    :param board_pattern: Regular expression of the URLs of the job boards, with a named group per API endpoint field
+    :param api_endpoint: API endpoint of a job board, with a field per named group of the pattern
+    :return: Decorator returning the parser unchanged
+    """
+    def register(parse: Callable[[any, int], list[JobPosting]]) -> Callable[[any, int], list[JobPosting]]:
+        ATS_EXTRACTORS[provider] = AtsExtractor(provider, re.compile(board_pattern), api_endpoint, parse)
+        return parse
+
+    return register
+
+
+def find_ats_board(url: str) -> tuple[str, str] | None:
+    """
+    :param url: URL of a careers page, job board or embedded job board
+    :return: ATS provider and API endpoint of the job board, None when the URL is not a job board of a known provider
+    """
+    for extractor in ATS_EXTRACTORS.values():
+        board_match: re.Match | None = extractor.board_pattern.match(url)
+        if board_match:
+            # Optional groups which did not match, e.g. the region of the board, are left out of the endpoint
+            fields: dict[str, str] = {name: value or "" for name, value in board_match.groupdict().items()}
+            return extractor.provider, extractor.api_endpoint.format(**fields)
+
+    return None
+
+
+def ats_job_postings(provider: str, api_url: str, company_id: int) -> list[JobPosting]:
+    """
+    Fetch the postings of an ATS job board from the JSON API of the provider.
+
+    :param provider: ATS provider, one of ATS_EXTRACTORS
+    :param api_url: API endpoint of the job board, as found by find_ats_board
+    :param company_id: ID of the company in the database
+    :return: Job postings
+    """
+    return ATS_EXTRACTORS[provider].parse(fetch_json(api_url), company_id)
+
+
+@register_ats_extractor(
+    "greenhouse",
+    # Embedded boards and application forms, e.g. embed/job_app?for=<token>&token=<job id>, name the board in for=
+    r"https?://(?:boards|job-boards)\.(?P<region>eu\.)?greenhouse\.io/"
+    r"(?:embed/[\w/]+\?(?:[^#]*&)?for=|(?!embed/))(?P<token>[\w-]+)",
+    "https://boards-api.{region}greenhouse.io/v1/boards/{token}/jobs?content=true"
+)
+def _greenhouse_job_postings(response: dict[str, any], company_id: int) -> list[JobPosting]:
+    """Postings of the Greenhouse job board API response."""
+    return [
+        JobPosting(
+            company_id=company_id,
+            url=job["absolute_url"],
+            title=job["title"],
+            location=(job.get("location") or {}).get("name"),
+            department=", ".join(department["name"] for department in job.get("departments") or []) or None,
+            description=html_to_text(job.get("content")),
+            posted_at=iso_date(job.get("first_published") or job.get("updated_at")),
+            source="greenhouse",
+            external_id=str(job["id"]),
+        )
+        for job in response.get("jobs", [])
+        if job.get("absolute_url") and job.get("title")
+    ]
+
+
+@register_ats_extractor(
+    "lever",
+    r"https?://jobs\.(?P<region>eu\.)?lever\.co/(?P<token>[\w.-]+)",
+    "https://api.{region}lever.co/v0/postings/{token}?mode=json"
+)
+def _lever_job_postings(response: list[dict[str, any]], company_id: int) -> list[JobPosting]:
+    """Postings of the Lever postings API response, which dates the postings in milliseconds since the epoch."""
+    return [
+        JobPosting(
+            company_id=company_id,
+            url=job["hostedUrl"],
+            title=job["text"],
+            location=(job.get("categories") or {}).get("location"),
+            department=(job.get("categories") or {}).get("team"),
+            employment_type=(job.get("categories") or {}).get("commitment"),
+            remote=True if job.get("workplaceType") == "remote" else None,
+            description=job.get("descriptionPlain") or html_to_text(job.get("description")),
+            posted_at=(
+                datetime.fromtimestamp(job["createdAt"] / 1000, tz=timezone.utc).date().isoformat()
+                if isinstance(job.get("createdAt"), (int, float)) else None
+            ),
+            source="lever",
+            external_id=job.get("id"),
+        )
+        for job in response
+        if job.get("hostedUrl") and job.get("text")
+    ]
+
+
+@register_ats_extractor(
+    "ashby",
+    r"https?://jobs\.ashbyhq\.com/(?P<token>[\w.%-]+)",
+    "https://api.ashbyhq.com/posting-api/job-board/{token}"
+)
+def _ashby_job_postings(response: dict[str, any], company_id: int) -> list[JobPosting]:
+    """Postings of the Ashby job board API response, unlisted postings are left out."""
+    return [
+        JobPosting(
+            company_id=company_id,
+            url=job["jobUrl"],
+            title=job["title"],
+            location=job.get("location"),
+            department=job.get("department") or job.get("team"),
+            employment_type=job.get("employmentType"),
+            remote=True if job.get("isRemote") else None,
+            description=job.get("descriptionPlain") or html_to_text(job.get("descriptionHtml")),
+            posted_at=iso_date(job.get("publishedAt")),
+            source="ashby",
+            external_id=job.get("id"),
+        )
+        for job in response.get("jobs", [])
+        if job.get("jobUrl") and job.get("title") and job.get("isListed", True)
+    ]
+
+
+@register_ats_extractor(
+    "workable",
+    # Links to a single job, apply.workable.com/j/<shortcode>, carry no account
+    r"https?://apply\.workable\.com/(?!j/|api/)(?P<token>[\w-]+)",
+    "https://apply.workable.com/api/v1/widget/accounts/{token}?details=true"
+)
+def _workable_job_postings(response: dict[str, any], company_id: int) -> list[JobPosting]:
+    """Postings of the Workable widget API response."""
+    job_postings: list[JobPosting] = []
+    for job in response.get("jobs", []):
+        if not (job.get("url") or job.get("shortlink")) or not job.get("title"):
+            continue
+
+        locations: list[str] = [
+            ", ".join(filter(None, (
+                location.get("city"), location.get("region") or location.get("state"), location.get("country")
+            )))
+            for location in job.get("locations") or [job]
+            if not location.get("hidden")
+        ]
+        job_postings.append(JobPosting(
+            company_id=company_id,
+            url=job.get("url") or job["shortlink"],
+            title=job["title"],
+            location="; ".join(dict.fromkeys(filter(None, locations))) or None,
+            department=job.get("department") or None,
+            employment_type=job.get("employment_type") or None,
+            remote=True if job.get("telecommuting") else None,
+            description=html_to_text(job.get("description")),
+            posted_at=iso_date(job.get("published_on") or job.get("created_at")),
+            source="workable",
+            external_id=job.get("shortcode"),
+        ))
+
+    return job_postings
+
+
+@register_ats_extractor(
+    "recruitee",
+    r"https?://(?!www\.|app\.|api\.)(?P<token>[\w-]+)\.recruitee\.com",
+    "https://{token}.recruitee.com/api/offers/"
+)
+def _recruitee_job_postings(response: dict[str, any], company_id: int) -> list[JobPosting]:
+    """Postings of the Recruitee offers API response, only the published offers."""
+    return [
+        JobPosting(
+            company_id=company_id,
+            url=job["careers_url"],
+            title=job["title"],
+            location=job.get("location") or None,
+            department=job.get("department") or None,
+            employment_type=job.get("employment_type_code") or None,
+            remote=True if job.get("remote") else None,
+            description=html_to_text(job.get("description")),
+            posted_at=iso_date(job.get("published_at")),
+            source="recruitee",
+            external_id=str(job["id"]) if job.get("id") else None,
+        )
+        for job in response.get("offers", [])
+        if job.get("careers_url") and job.get("title") and job.get("status", "published") == "published"
+    ]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    BOARD_URLS: list[str] = [
+        "https://boards.greenhouse.io/embed/job_board?for=acme",
+        "https://boards.greenhouse.io/embed/job_app?for=acme&token=1", "https://job-boards.eu.greenhouse.io/acme",
+        "https://jobs.eu.lever.co/acme", "https://jobs.ashbyhq.com/acme/embed", "https://apply.workable.com/acme/",
+        "https://acme.recruitee.com/", "https://acme.com/careers",
+    ]
+    for board_url in BOARD_URLS:
+        logging.info(f"{board_url}: {find_ats_board(board_url)}")
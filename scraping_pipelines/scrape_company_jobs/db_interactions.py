@@ -0,0 +1,123 @@
+# Standard
+import logging
+
+# DB interactions
+from database.interaction_utils import execute_statement, records_as_sql_arrays, sql_unnest_arrays
+
+# Work selection
+from scraping_pipelines.work_selection import WorkSelection
+
+# Result objects
+from graph.result_dataclasses.job_posting import JobPosting
+
+
+# Type of the columns of the jobs table written by the pipeline, the postings are sent as one array per column
+JOB_COLUMN_TYPES: dict[str, str] = {
+    "company_id": "INTEGER", "url": "TEXT", "title": "TEXT", "location": "TEXT", "department": "TEXT",
+    "employment_type": "TEXT", "remote": "BOOLEAN", "description": "TEXT", "posted_at": "DATE", "source": "TEXT",
+    "external_id": "TEXT", "content_hash": "TEXT",
+}
+
+
+def fetch_companies(selection: WorkSelection = WorkSelection()) -> list[dict[str, any]]:
+    """
+    Fetch a batch of companies to scrape the job postings of from the database.
+
+    :param selection: Shard and batch of the companies to fetch
+    :return: List of company ids, domains, careers page urls and the content hash of the previous scrape
+    """
+    query: str = f"""
+    SELECT id,
+           domain,
+           careers_page_url,
+           content_hash
+    FROM public.companies
+    WHERE {selection.sql_filter()}
+    {selection.sql_page()};
+    """
+    return execute_statement(query, selection.sql_parameters(), return_values=True)
+
+
+def store_careers_pages_in_db(careers_pages: list[dict[str, any]]):
+    """
+    Store the careers pages found for the companies, so later runs fetch them directly.
+
+    :param careers_pages: Records with the id of the company and the careers_page_url
+    """
+    if not careers_pages:
+        return
+
+    query: str = """
+    UPDATE public.companies
+    SET careers_page_url = careers_page.careers_page_url,
+        updated_at = NOW()
+    FROM unnest(:id::INTEGER[], :careers_page_url::TEXT[]) AS careers_page (id, careers_page_url)
+    WHERE companies.id = careers_page.id
+      AND companies.careers_page_url IS DISTINCT FROM careers_page.careers_page_url;
+    """
+    execute_statement(query, records_as_sql_arrays(careers_pages, columns=("id", "careers_page_url")), verbose=False)
+
+
+def store_job_postings_in_db(company_ids: list[int], job_postings: list[tuple[JobPosting, str]]):
+    """
+    Store the job postings of the scraped companies, with a single statement for the companies of a batch:
+        - New postings are inserted.
+        - Known postings are only updated when their content hash changed, or when they were closed before.
+        - Open postings of the companies which the scrape no longer found are closed.
+
+    :param company_ids: IDs of the companies of which all postings were scraped
+    :param job_postings: Postings of the companies with the content hash of each posting,
+        unique per company and URL
+    """
+    if not company_ids:
+        return
+
+    posting_records: list[dict[str, any]] = [
+        {**job_posting.as_record(), "content_hash": posting_hash} for job_posting, posting_hash in job_postings
+    ]
+    columns: str = ", ".join(JOB_COLUMN_TYPES)
+
+    # The UPDATE sees the jobs table as before the INSERT, the postings inserted by the statement stay open
+    query: str = f"""
+    WITH posting AS (
+        SELECT * FROM {sql_unnest_arrays(JOB_COLUMN_TYPES)} AS posting ({columns})
+    ),
+    written_jobs AS (
+        INSERT INTO public.jobs ({columns})
+        SELECT {columns} FROM posting
+        ON CONFLICT (company_id, url)
+        DO UPDATE
+        SET title = excluded.title,
+            location = excluded.location,
+            department = excluded.department,
+            employment_type = excluded.employment_type,
+            remote = excluded.remote,
+            description = excluded.description,
+            posted_at = excluded.posted_at,
+            source = excluded.source,
+            external_id = excluded.external_id,
+            content_hash = excluded.content_hash,
+            closed_at = NULL,
+            updated_at = NOW()
+        WHERE jobs.content_hash IS DISTINCT FROM excluded.content_hash
+           OR jobs.closed_at IS NOT NULL
+    )
+    UPDATE public.jobs
+    SET closed_at = NOW(),
+        updated_at = NOW()
+    WHERE jobs.company_id = ANY(:scraped_company_ids::INTEGER[])
+      AND jobs.closed_at IS NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM posting WHERE posting.company_id = jobs.company_id AND posting.url = jobs.url
+      );
+    """
+    execute_statement(query, {
+        **records_as_sql_arrays(posting_records, columns=JOB_COLUMN_TYPES),
+        "scraped_company_ids": company_ids,
+    })
+    logging.info(f"Stored {len(posting_records)} job postings of {len(company_ids)} companies")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    logging.info(fetch_companies())
@@ -0,0 +1,204 @@
+# Standard
+import re
+import logging
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+# Result objects
+from graph.result_dataclasses.job_posting import JobPosting
+
+# Url parsing
+from utils.url_parsing import get_domain_name, get_registrable_domain
+from utils.html_processing import subpage_endpoint, html_to_text
+from utils.general import iso_date
+from utils.json_ld import load_json_ld, as_list, json_ld_nodes, json_ld_location
+
+# Job boards of the ATS providers
+from scraping_pipelines.scrape_company_jobs.ats_extractors import find_ats_board
+
+
+# Path segments of the links to job postings, e.g. /jobs/backend-engineer or /careers/123
+JOB_PATH_PATTERN: re.Pattern = re.compile(r"/(?:jobs?|careers?|positions?|openings?|vacanc(?:y|ies)|roles?)/[^/?#]+")
+# Texts of the links on a careers page which are navigation instead of a job
+NAVIGATION_TEXTS: frozenset[str] = frozenset({
+    "careers", "jobs", "open positions", "open roles", "all jobs", "see all jobs", "view all jobs", "apply",
+    "apply now", "learn more", "read more", "back", "next", "previous", "home",
+})
+
+
+class _JobPageParser(HTMLParser):
+    """
+    Collects in a single pass over a careers page: the JSON-LD blocks, the links with their text,
+    and the sources of the iframes and scripts, which embed the job boards of ATS providers.
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.json_ld_blocks: list[str] = []
+        self.links: list[tuple[str, str]] = []
+        self.embeds: list[str] = []
+
+        self._in_json_ld: bool = False
+        self._json_ld_parts: list[str] = []
+        self._link_href: str | None = None
+        self._link_text_parts: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        attributes: dict[str, str | None] = dict(attrs)
+        if tag == "script" and (attributes.get("type") or "").lower() == "application/ld+json":
+            self._in_json_ld = True
+            self._json_ld_parts = []
+        elif tag in ("script", "iframe") and attributes.get("src"):
+            self.embeds.append(attributes["src"])
+        elif tag == "a" and attributes.get("href"):
+            self._finish_link()
+            self._link_href = attributes["href"]
+
+    def handle_endtag(self, tag: str):
+        if tag == "script" and self._in_json_ld:
+            self.json_ld_blocks.append("".join(self._json_ld_parts))
+            self._in_json_ld = False
+        elif tag == "a":
+            self._finish_link()
+
+    def handle_data(self, data: str):
+        if self._in_json_ld:
+            self._json_ld_parts.append(data)
+        elif self._link_href is not None:
+            self._link_text_parts.append(data)
+
+    def _finish_link(self):
+        if self._link_href is not None:
+            self.links.append((self._link_href, " ".join("".join(self._link_text_parts).split())))
+        self._link_href = None
+        self._link_text_parts = []
+
+    def close(self):
+        super().close()
+        self._finish_link()
+
+
+def parse_job_page(page_html: str) -> dict[str, any]:
+    """
+    Parse a careers page or home page in a single pass, without building a tree of the page.
+
+    :param page_html: HTML content of the page
+    :return: Parsed JSON-LD objects, links as (href, text) pairs and the sources of the embedded iframes and scripts
+    """
+    parser = _JobPageParser()
+    parser.feed(page_html)
+    parser.close()
+
+    return {"json_ld": load_json_ld(parser.json_ld_blocks), "links": parser.links, "embeds": parser.embeds}
+
+
+def json_ld_job_postings(json_ld_objects: list[any], company_id: int, page_url: str) -> list[JobPosting]:
+    """
+    Read the JobPosting objects of the JSON-LD of a page, the structured data search engines index jobs from.
+
+    :param json_ld_objects: Parsed JSON-LD objects of the page
+    :param company_id: ID of the company in the database
+    :param page_url: URL of the page, the URL of a posting without a URL of its own
+    :return: Job postings
+    """
+    job_postings: list[JobPosting] = []
+    for node in json_ld_nodes(json_ld_objects):
+        if "JobPosting" not in as_list(node.get("@type")) or not node.get("title"):
+            continue
+
+        identifier: any = node.get("identifier")
+        identifier = identifier.get("value") if isinstance(identifier, dict) else identifier
+        job_postings.append(JobPosting(
+            company_id=company_id,
+            url=urljoin(page_url, node.get("url") or page_url),
+            title=" ".join(str(node["title"]).split()),
+            location=json_ld_location(node.get("jobLocation")),
+            department=", ".join(map(str, as_list(node.get("occupationalCategory")))) or None,
+            employment_type=", ".join(map(str, as_list(node.get("employmentType")))) or None,
+            remote=True if node.get("jobLocationType") == "TELECOMMUTE" else None,
+            description=html_to_text(node.get("description")),
+            posted_at=iso_date(node.get("datePosted")),
+            source="json_ld",
+            external_id=str(identifier) if identifier else None,
+        ))
+
+    return job_postings
+
+
+def job_link_postings(links: list[tuple[str, str]], company_id: int, page_url: str) -> list[JobPosting]:
+    """
+    Read the postings from the links of a careers page without structured data: links to job paths
+    on the same domain, with the text of the link as title.
+
+    :param links: Links of the page as (href, text) pairs
+    :param company_id: ID of the company in the database
+    :param page_url: URL of the careers page
+    :return: Job postings with a title and URL only
+    """
+    page_domain: str | None = get_domain_name(page_url)
+    job_postings: dict[str, JobPosting] = {}
+    for href, text in links:
+        endpoint: str | None = subpage_endpoint(href, page_url, page_domain)
+        if not endpoint or not JOB_PATH_PATTERN.search(endpoint):
+            continue
+        if not 3 <= len(text) <= 150 or text.lower() in NAVIGATION_TEXTS:
+            continue
+
+        url: str = f"https://{page_domain}{endpoint}"
+        job_postings.setdefault(url, JobPosting(company_id=company_id, url=url, title=text, source="page_links"))
+
+    return list(job_postings.values())
+
+
+def find_careers_page(links: list[tuple[str, str]], embeds: list[str], page_url: str) -> str | None:
+    """
+    Find the careers page among the links of a home page: a job board of an ATS provider,
+    otherwise the page on the same domain of which the path or link text best matches a careers keyword.
+
+    :param links: Links of the page as (href, text) pairs
+    :param embeds: Sources of the iframes and scripts of the page
+    :param page_url: URL of the page
+    :return: URL of the careers page, None when the page links to no careers page
+    """
+    # Most specific keywords first, the rank of the first matching keyword scores the link
+    CAREERS_KEYWORDS: tuple[str, ...] = (
+        "careers", "career", "jobs", "open-positions", "join-us", "work-with-us", "vacancies", "hiring", "join",
+        "karriere", "werken-bij", "jobs-at",
+    )
+
+    for url in (*embeds, *(href for href, _ in links)):
+        if find_ats_board(url):
+            return url
+
+    page_domain: str | None = get_domain_name(page_url)
+    careers_pages: list[tuple[int, int, str]] = []
+    for href, text in links:
+        endpoint: str | None = subpage_endpoint(href, page_url, page_domain)
+        # Careers pages on a subdomain, e.g. careers.example.com, are not subpages but belong to the company
+        if endpoint is None and get_registrable_domain(urljoin(page_url, href)) == get_registrable_domain(page_url):
+            endpoint = urljoin(page_url, href)
+        if not endpoint:
+            continue
+
+        candidates: str = f"{endpoint.lower()} {text.lower().replace(' ', '-')}"
+        for rank, keyword in enumerate(CAREERS_KEYWORDS):
+            if keyword in candidates:
+                careers_pages.append((rank, len(endpoint), urljoin(page_url, endpoint)))
+                break
+
+    return min(careers_pages)[2] if careers_pages else None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    PAGE_HTML: str = """
+    <html><head><script type="application/ld+json">
+    {"@context": "https://schema.org", "@type": "JobPosting", "title": "Backend engineer",
+     "url": "/careers/backend-engineer", "datePosted": "2024-05-01T09:00:00Z", "employmentType": "FULL_TIME",
+     "jobLocation": {"@type": "Place", "address": {"addressLocality": "Berlin", "addressCountry": "DE"}}}
+    </script></head>
+    <body><a href="/careers/designer">Product designer</a><a href="/careers">Careers</a></body></html>
+    """
+    parsed_page: dict[str, any] = parse_job_page(PAGE_HTML)
+    logging.info(json_ld_job_postings(parsed_page["json_ld"], company_id=1, page_url="https://example.com/careers"))
+    logging.info(job_link_postings(parsed_page["links"], company_id=1, page_url="https://example.com/careers"))
+    logging.info(find_careers_page(parsed_page["links"], parsed_page["embeds"], "https://example.com/"))
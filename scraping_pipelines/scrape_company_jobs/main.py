@@ -0,0 +1,311 @@
+# Standard
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+from dataclasses import dataclass
+from contextlib import AsyncExitStack
+
+# DB interactions
+from scraping_pipelines.scrape_company_jobs.db_interactions import (
+    fetch_companies,
+    store_careers_pages_in_db,
+    store_job_postings_in_db
+)
+
+# Scraper
+from scraper.http_fetch import fetch_url
+from scraper.playwrite_async import launch_browser_async, scrape_webpage_content_async
+if TYPE_CHECKING:
+    from playwright.async_api import Browser
+
+# Job extraction
+from scraping_pipelines.scrape_company_jobs.job_extraction import (
+    parse_job_page,
+    find_careers_page,
+    json_ld_job_postings,
+    job_link_postings
+)
+from scraping_pipelines.scrape_company_jobs.ats_extractors import find_ats_board, ats_job_postings
+
+# Result objects
+from graph.result_dataclasses.job_posting import JobPosting
+
+# Work selection
+from scraping_pipelines.work_selection import WorkSelection
+from scraping_pipelines.scrape_scheduling import content_hash, record_scrape_outcomes
+
+# Metrics
+from utils.metrics import ERRORS, JOB_POSTINGS
+
+
+@dataclass(frozen=True)
+class JobsConcurrency:
+    """
+    Concurrency and batching settings of the jobs pipeline.
+
+    :param http_workers: Number of companies scraped at the same time, with plain HTTP requests.
+    :param browser_pages: Number of pages rendered at the same time by the browser, the fallback for pages
+        which need JavaScript. The browser is only launched once a page needs it.
+    :param queue_size: Maximum number of companies waiting between two stages.
+    :param write_batch_size: Maximum number of companies of which the postings are written with one statement.
+    """
+    http_workers: int = 32
+    browser_pages: int = 4
+    queue_size: int = 256
+    write_batch_size: int = 100
+
+
+@dataclass
+class CompanyJobs:
+    """
+    The scraped job postings of a company.
+
+    :param record: Record of the company in the database, with the id, domain, careers_page_url and content_hash.
+    :param careers_page_url: URL of the careers page or job board the postings were scraped from.
+    :param job_postings: Postings of the company, None when scraping the company failed.
+    """
+    record: dict[str, any]
+    careers_page_url: str | None = None
+    job_postings: list[JobPosting] | None = None
+
+
+class StreamingJobsPipeline:
+    """
+    Scrapes the job postings of the companies, streaming the postings to the database while scraping:
+
+        scrape companies (HTTP, browser fallback) -> DB writer (batches of companies)
+
+    Every company is scraped from the cheapest source which has its postings:
+        1. The JSON API of the job board, when the careers page is hosted by a known ATS provider
+        2. The JobPosting JSON-LD of the careers page, fetched with a plain HTTP request
+        3. The links to job pages on the careers page
+        4. The same, on the careers page rendered by the browser
+    The careers page is found on the home page once and stored with the company.
+    """
+    def __init__(self, concurrency: JobsConcurrency = JobsConcurrency()):
+        """
+        :param concurrency: Concurrency and batching settings of the pipeline
+        """
+        self.concurrency = concurrency
+        self.company_queue: asyncio.Queue[dict[str, any] | None] = asyncio.Queue(maxsize=concurrency.queue_size)
+        self.result_queue: asyncio.Queue[CompanyJobs | None] = asyncio.Queue(maxsize=concurrency.queue_size)
+
+        self._exit_stack = AsyncExitStack()
+        self._browser: "Browser | None" = None
+        self._browser_lock = asyncio.Lock()
+        self._browser_pages = asyncio.Semaphore(concurrency.browser_pages)
+
+    async def _render_page(self, url: str) -> str:
+        """Render the page in the browser, which is launched by the first page that needs it."""
+        async with self._browser_lock:
+            if self._browser is None:
+                self._browser = await self._exit_stack.enter_async_context(launch_browser_async(headless=True))
+
+        async with self._browser_pages:
+            return await scrape_webpage_content_async(url, self._browser)
+
+    async def _fetch_page(self, url: str) -> str:
+        """Fetch the page with a plain HTTP request, and render it in the browser when the request is refused."""
+        try:
+            return await asyncio.to_thread(fetch_url, url)
+        except Exception as error:
+            logging.debug(f"Fetching {url} without the browser failed, rendering it instead: {error}")
+            return await self._render_page(url)
+
+    @staticmethod
+    async def _postings_of_page(
+            page: dict[str, any],
+            company_id: int,
+            page_url: str,
+            with_links: bool
+    ) -> list[JobPosting] | None:
+        """Postings of a parsed careers page: from the embedded job board, the JSON-LD or the job links."""
+        ats_board: tuple[str, str] | None = next(
+            filter(None, map(find_ats_board, (*page["embeds"], *(href for href, _ in page["links"])))), None
+        )
+        if ats_board:
+            return await asyncio.to_thread(ats_job_postings, *ats_board, company_id)
+
+        job_postings: list[JobPosting] = json_ld_job_postings(page["json_ld"], company_id, page_url)
+        if not job_postings and with_links:
+            job_postings = job_link_postings(page["links"], company_id, page_url)
+
+        return job_postings or None
+
+    async def _scrape_careers_page(self, company_id: int, careers_page_url: str) -> list[JobPosting]:
+        """Scrape the postings of the careers page, from the cheapest source that has them."""
+        ats_board: tuple[str, str] | None = find_ats_board(careers_page_url)
+        if ats_board:
+            return await asyncio.to_thread(ats_job_postings, *ats_board, company_id)
+
+        try:
+            page_html: str = await asyncio.to_thread(fetch_url, careers_page_url)
+            page: dict[str, any] = await asyncio.to_thread(parse_job_page, page_html)
+            job_postings: list[JobPosting] | None = await self._postings_of_page(
+                page, company_id, careers_page_url, with_links=True
+            )
+            if job_postings:
+                return job_postings
+        except Exception as error:
+            logging.debug(f"Fetching {careers_page_url} without the browser failed: {error}")
+
+        # Careers pages which load their jobs with JavaScript
+        page_html: str = await self._render_page(careers_page_url)
+        page: dict[str, any] = await asyncio.to_thread(parse_job_page, page_html)
+        return await self._postings_of_page(page, company_id, careers_page_url, with_links=True) or []
+
+    async def _scrape_company(self, record: dict[str, any]) -> CompanyJobs:
+        """Find the careers page of the company, unless it is known, and scrape its postings."""
+        careers_page_url: str | None = record.get("careers_page_url")
+        if not careers_page_url:
+            home_page_url: str = f"https://{record['domain']}/"
+            home_page: dict[str, any] = await asyncio.to_thread(parse_job_page, await self._fetch_page(home_page_url))
+            careers_page_url = find_careers_page(home_page["links"], home_page["embeds"], home_page_url)
+            if careers_page_url is None:
+                logging.info(f"No careers page found for {record['domain']}")
+                return CompanyJobs(record=record, job_postings=[])
+
+        job_postings: list[JobPosting] = await self._scrape_careers_page(record["id"], careers_page_url)
+        return CompanyJobs(record=record, careers_page_url=careers_page_url, job_postings=job_postings)
+
+    async def _company_worker(self):
+        """Scrape the companies of the queue until the queue ends."""
+        while (record := await self.company_queue.get()) is not None:
+            try:
+                company_jobs: CompanyJobs = await self._scrape_company(record)
+            except Exception as error:
+                logging.error(f"Failed to scrape the jobs of {record['domain']}: {error}")
+                ERRORS.inc(stage="jobs", domain=record["domain"])
+                company_jobs = CompanyJobs(record=record)
+
+            await self.result_queue.put(company_jobs)
+
+    @staticmethod
+    def _store_batch(batch: list[CompanyJobs]):
+        """
+        Store the postings of a batch of companies. The postings of a company are only written when they
+        changed since its previous scrape, a company without changes costs no write besides its schedule.
+        """
+        careers_pages: list[dict[str, any]] = []
+        changed_company_ids: list[int] = []
+        job_postings: list[tuple[JobPosting, str]] = []
+        outcomes: list[dict[str, any]] = []
+        for company_jobs in batch:
+            record: dict[str, any] = company_jobs.record
+            if company_jobs.job_postings is None:
+                outcomes.append({"id": record["id"], "failed": True})
+                continue
+
+            # Longer URLs do not fit the careers_page_url column, the page is found again on the next scrape
+            if company_jobs.careers_page_url and company_jobs.careers_page_url != record.get("careers_page_url") \
+                    and len(company_jobs.careers_page_url) <= JobPosting.COLUMN_LENGTHS["url"]:
+                careers_pages.append({"id": record["id"], "careers_page_url": company_jobs.careers_page_url})
+
+            # One posting per URL, listings often link to the same posting twice
+            unique_postings: dict[str, JobPosting] = {}
+            for job_posting in company_jobs.job_postings:
+                unique_postings.setdefault(job_posting.url, job_posting)
+            posting_hashes: dict[str, str] = {
+                url: content_hash(job_posting.as_record()) for url, job_posting in unique_postings.items()
+            }
+
+            # The hash of the postings of the company detects an unchanged job board without touching the jobs table
+            company_hash: str = content_hash(sorted(posting_hashes.values()))
+            outcomes.append({"id": record["id"], "content_hash": company_hash, "failed": False})
+            if company_hash == record.get("content_hash"):
+                continue
+
+            changed_company_ids.append(record["id"])
+            job_postings.extend((unique_postings[url], posting_hash) for url, posting_hash in posting_hashes.items())
+
+        store_careers_pages_in_db(careers_pages)
+        store_job_postings_in_db(changed_company_ids, job_postings)
+        record_scrape_outcomes("companies", outcomes)
+        logging.info(f"Stored a batch of {len(batch)} companies, {len(changed_company_ids)} with changed postings")
+
+        for company_jobs in batch:
+            for job_posting in company_jobs.job_postings or []:
+                JOB_POSTINGS.inc(source=job_posting.source)
+
+    def _store_companies(self, batch: list[CompanyJobs]):
+        """
+        Store a batch of companies. When the batch fails, e.g. on a single invalid posting, the companies are
+        stored one by one, and the companies that still fail are recorded as failed scrapes. A failed company
+        is not selected again before its next scheduled scrape.
+        """
+        try:
+            self._store_batch(batch)
+            return
+        except Exception as error:
+            logging.error(f"Failed to store the jobs of {len(batch)} companies, storing them one by one: {error}")
+
+        failed_outcomes: list[dict[str, any]] = []
+        for company_jobs in batch:
+            try:
+                self._store_batch([company_jobs])
+            except Exception as error:
+                logging.error(f"Failed to store the jobs of {company_jobs.record['domain']}: {error}")
+                ERRORS.inc(stage="store", domain=company_jobs.record["domain"])
+                failed_outcomes.append({"id": company_jobs.record["id"], "failed": True})
+
+        record_scrape_outcomes("companies", failed_outcomes)
+
+    async def _db_writer(self):
+        """
+        Store the scraped companies in batches. A batch is written once it is full, or once no more companies
+        are waiting, so the batches grow when the scrapers are faster than the database.
+        """
+        batch: list[CompanyJobs] = []
+        while (company_jobs := await self.result_queue.get()) is not None:
+            batch.append(company_jobs)
+            if len(batch) >= self.concurrency.write_batch_size or self.result_queue.empty():
+                try:
+                    await asyncio.to_thread(self._store_companies, batch)
+                except Exception as error:
+                    logging.error(f"Failed to record the scrapes of {len(batch)} companies: {error}")
+                    ERRORS.inc(stage="store", domain=None)
+                batch = []
+
+    async def run(self, db_records: list[dict[str, any]]):
+        """
+        Run the scrapers and the DB writer until the postings of every company are stored.
+
+        :param db_records: Records with the id, domain, careers_page_url and content_hash of the companies to scrape
+        """
+        async with self._exit_stack:
+            workers: list[asyncio.Task] = [
+                asyncio.create_task(self._company_worker()) for _ in range(self.concurrency.http_workers)
+            ]
+            db_writer: asyncio.Task = asyncio.create_task(self._db_writer())
+
+            for record in db_records:
+                await self.company_queue.put(record)
+            for _ in workers:
+                await self.company_queue.put(None)
+            await asyncio.gather(*workers)
+
+            await self.result_queue.put(None)
+            await db_writer
+
+
+def scrape_company_jobs(
+        selection: WorkSelection = WorkSelection(),
+        concurrency: JobsConcurrency = JobsConcurrency()
+) -> list[dict[str, any]]:
+    """
+    Scrapes the job postings of a batch of companies into the jobs table.
+
+    :param selection: Shard and batch of the companies to scrape
+    :param concurrency: Concurrency and batching settings of the pipeline
+    :return: Records of the companies that were scraped
+    """
+    db_records: list[dict[str, any]] = fetch_companies(selection)
+    if db_records:
+        asyncio.run(StreamingJobsPipeline(concurrency).run(db_records))
+
+    return db_records
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    scrape_company_jobs()
@@ -0,0 +1,95 @@
+# Standard
+import json
+import hashlib
+import logging
+
+# DB interactions
+from database.interaction_utils import execute_statement, records_as_sql_arrays
+
+
+# Tables of which the rows are re-scraped by the scheduler
+SCHEDULED_TABLES: tuple[str, ...] = ("vc", "companies")
+
+
+def content_hash(scraped_data: any) -> str:
+    """
+    Stable hash of the scraped data of a row, used to detect whether a re-scrape found new data.
+
+    :param scraped_data: JSON serializable data scraped for the row
+    :return: Hexadecimal hash of the data
+    """
+    serialized_data: str = json.dumps(scraped_data, sort_keys=True, default=str)
+    return hashlib.sha256(serialized_data.encode()).hexdigest()
+
+
+def record_scrape_outcomes(table: str, outcomes: list[dict[str, any]]):
+    """
+    Store the outcome of the scrapes of a run and schedule the next scrape of each row.
+
+    Rows are scheduled by their next_scrape_at, which the pipelines select in ascending order,
+    so the rows that are most overdue are scraped first. The interval until the next scrape follows from:
+        - The change rate: the share of the scrapes that found new data, smoothed so that new rows start at 50%.
+          Rows which change often are re-scraped sooner, between MIN_INTERVAL and MAX_INTERVAL.
+        - The failures: failed scrapes back off exponentially from MIN_INTERVAL, until a scrape succeeds.
+
+    :param table: Table of the scraped rows, one of SCHEDULED_TABLES
+    :param outcomes: Records with the id of the row, the content_hash of the scraped data and whether the scrape failed
+    """
+    # Interval between two scrapes of a row which changes on half of the scrapes
+    BASE_INTERVAL: str = "7 days"
+    MIN_INTERVAL: str = "1 day"
+    MAX_INTERVAL: str = "60 days"
+
+    if table not in SCHEDULED_TABLES:
+        raise ValueError(f"Table {table} is not scheduled, choose one of {SCHEDULED_TABLES}")
+    if not outcomes:
+        return
+
+    outcome_records: list[dict[str, any]] = [
+        {"id": outcome["id"], "content_hash": outcome.get("content_hash"), "failed": outcome["failed"]}
+        for outcome in outcomes
+    ]
+
+    # The expressions on the right-hand side all use the values of the row before the update
+    query: str = f"""
+    WITH outcome AS (
+        SELECT outcome_values.id, outcome_values.content_hash, outcome_values.failed,
+               NOT outcome_values.failed
+               AND outcome_values.content_hash IS DISTINCT FROM previous.content_hash AS changed
+        FROM unnest(:id::INTEGER[], :content_hash::TEXT[], :failed::BOOLEAN[])
+             AS outcome_values (id, content_hash, failed)
+        JOIN public.{table} AS previous ON previous.id = outcome_values.id
+    )
+    UPDATE public.{table} AS scraped
+    SET scrape_count = scraped.scrape_count + 1,
+        change_count = scraped.change_count + outcome.changed::int,
+        failure_count = CASE WHEN outcome.failed THEN scraped.failure_count + 1 ELSE 0 END,
+        content_hash = COALESCE(outcome.content_hash, scraped.content_hash),
+        last_scraped_at = NOW(),
+        next_scrape_at = NOW() + CASE
+            WHEN outcome.failed THEN LEAST(
+                INTERVAL '{MIN_INTERVAL}' * POWER(2, LEAST(scraped.failure_count, 16)),
+                INTERVAL '{MAX_INTERVAL}'
+            )
+            ELSE GREATEST(LEAST(
+                -- Change rate smoothed with one change in two scrapes: (changes + 1) / (scrapes + 2)
+                INTERVAL '{BASE_INTERVAL}' * 0.5 * (scraped.scrape_count + 3)
+                    / (scraped.change_count + outcome.changed::int + 1),
+                INTERVAL '{MAX_INTERVAL}'
+            ), INTERVAL '{MIN_INTERVAL}')
+        END
+    FROM outcome
+    WHERE scraped.id = outcome.id;
+    """
+    outcome_arrays: dict[str, list[any]] = records_as_sql_arrays(
+        outcome_records, columns=("id", "content_hash", "failed")
+    )
+    execute_statement(query, outcome_arrays, verbose=False)
+
+    failures: int = sum(outcome["failed"] for outcome in outcome_records)
+    logging.info(f"Scheduled the next scrape of {len(outcome_records)} {table} rows, {failures} failed")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    logging.info(content_hash([{"name": "Company", "website": "https://company.com"}]))
@@ -2,23 +2,29 @@
 import logging
 
 # DB interactions
-from database.interaction_utils import execute_sql, records_as_sql_values
+from database.interaction_utils import execute_statement, records_as_sql_arrays
 
+# Work selection
+from scraping_pipelines.work_selection import WorkSelection
 
-def fetch_vc_domains() -> list[dict[str, any]]:
+
+def fetch_vc_domains(selection: WorkSelection = WorkSelection()) -> list[dict[str, any]]:
     """
-    Fetch a list of random venture capital domains from the database.
+    Fetch a batch of venture capital domains without a portfolio page from the database.
 
-    :return: List of venture capital domains
+    :param selection: Shard and batch of the VCs to fetch
+    :return: List of venture capital ids and domains
     """
     # Get the list of venture capital domains
-    query: str = """
-    SELECT 'https://' || domain AS domain
+    query: str = f"""
+    SELECT id,
+           'https://' || domain AS domain
     FROM public.vc
     WHERE portfolio_page_endpoint IS NULL
-    limit 5;
+      AND {selection.sql_filter()}
+    {selection.sql_page()};
     """
-    return execute_sql(query, return_values=True)
+    return execute_statement(query, selection.sql_parameters(), return_values=True)
 
 
 def store_portfolio_page_in_db(portfolio_endpoints: list[dict[str, str]]):
@@ -27,16 +33,21 @@ def store_portfolio_page_in_db(portfolio_endpoints: list[dict[str, str]]):
 
     :param portfolio_endpoints: List of portfolio page endpoints
     """
+    if not portfolio_endpoints:
+        return
+
     # Store the portfolio links in the database
-    query: str = f"""
+    query: str = """
     INSERT INTO public.vc (domain, portfolio_page_endpoint)
-    VALUES {records_as_sql_values(portfolio_endpoints)}
+    SELECT * FROM unnest(:domain::VARCHAR[], :portfolio_page_endpoint::VARCHAR[])
     ON CONFLICT (domain)
     DO UPDATE 
     SET portfolio_page_endpoint = excluded.portfolio_page_endpoint,
+        -- A newly found portfolio page is due for scraping right away
+        next_scrape_at = NOW(),
         updated_at = NOW();
     """
-    execute_sql(query, verbose=True)
+    execute_statement(query, records_as_sql_arrays(portfolio_endpoints, columns=("domain", "portfolio_page_endpoint")))
 
 
 if __name__ == "__main__":
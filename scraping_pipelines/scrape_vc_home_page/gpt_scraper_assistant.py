@@ -2,12 +2,36 @@
 import os
 import json
 import logging
+import threading
+from typing import TYPE_CHECKING
 
-# OpenAI SDK
-from openai import OpenAI, ChatCompletion
+# OpenAI SDK, imported on first use
+from utils.lazy_import import lazy_import
+openai = lazy_import("openai")
+if TYPE_CHECKING:
+    from openai import OpenAI, ChatCompletion
 
+# Metrics
+from utils.metrics import track_llm_request, record_llm_usage
 
-CLIENT = OpenAI(api_key=os.getenv("PERSONAL_OPEN_AI_API_KEY"))
+
+_CLIENT: "OpenAI | None" = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_client() -> "OpenAI":
+    """
+    OpenAI client of the prompt, created on first use so that importing the module does not
+    import the SDK or require the API key.
+
+    :return: OpenAI client
+    """
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = openai.OpenAI(api_key=os.getenv("PERSONAL_OPEN_AI_API_KEY"))
+
+    return _CLIENT
 
 
 def determine_portfolio_page_link_with_gpt(links: list[str]) -> str:
@@ -36,16 +60,18 @@ def determine_portfolio_page_link_with_gpt(links: list[str]) -> str:
     }}
     """
 
-    response: ChatCompletion = CLIENT.chat.completions.create(
-        model=MODEL,
-        messages=[
-            {"role": "system", "content": SYSTEM_MESSAGE},
-            {"role": "user", "content": PROMPT.format(links=links)}
-        ],
-        temperature=0,
-        # JSON mode
-        response_format={"type": "json_object"},
-    )
+    with track_llm_request("determine_portfolio_page_link_with_gpt", MODEL):
+        response: ChatCompletion = get_client().chat.completions.create(
+            model=MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_MESSAGE},
+                {"role": "user", "content": PROMPT.format(links=links)}
+            ],
+            temperature=0,
+            # JSON mode
+            response_format={"type": "json_object"},
+        )
+    record_llm_usage("determine_portfolio_page_link_with_gpt", MODEL, response)
 
     # Extract the portfolio page link from the response
     response_content: str = response.choices[0].message.content
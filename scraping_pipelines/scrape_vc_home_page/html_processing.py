@@ -1,33 +1,21 @@
 # Standard
 import logging
 
-# HTML parsing
-from bs4 import BeautifulSoup
-
 # Url processing
-from utils.url_parsing import get_endpoint
-from utils.html_processing import is_subpage_link
+from utils.html_processing import extract_hrefs, find_subpage_endpoints
 
 
 def find_all_links_on_page(base_domain: str, page_html: str) -> list[str]:
     """
     Finds all unique subpage endpoints on a webpage.
 
-    :param base_domain: Domain of the webpage
+    :param base_domain: Domain of the webpage, with or without scheme, e.g. https://earlybird.com as fetched from the db
     :param page_html: HTML content of the webpage
-    :return: List of unique subpage endpoints
+    :return: List of unique subpage endpoints, in the order they appear on the page
     """
-    soup = BeautifulSoup(page_html, 'html.parser')
-    page_endpoints: set = set()
-    for tag in soup.find_all(href=True):
-        link: str = tag.get('href')
-        endpoint: str = get_endpoint(link)
-
-        # Check if the link directs to the same domain as the base domain
-        if is_subpage_link(link, endpoint, base_domain):
-            page_endpoints.add(endpoint)
-
-    return list(page_endpoints)
+    page_url: str = base_domain if "://" in base_domain else f"https://{base_domain}"
+    # Only the links are needed, so the page is not parsed into a tree
+    return find_subpage_endpoints(extract_hrefs(page_html), page_url=f"{page_url.rstrip('/')}/")
 
 
 if __name__ == "__main__":
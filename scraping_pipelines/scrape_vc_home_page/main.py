@@ -16,8 +16,14 @@ from scraping_pipelines.scrape_vc_home_page.gpt_scraper_assistant import determi
 # Url parsing
 from utils.url_parsing import get_domain_name
 
+# Work selection
+from scraping_pipelines.work_selection import WorkSelection
 
-def scrape_portfolio_page_from_vc_domains():
+
+def scrape_portfolio_page_from_vc_domains(
+        selection: WorkSelection = WorkSelection(),
+        concurrency: int = 5
+) -> list[dict[str, any]]:
     """
     Identifies the portfolio page of VCs using AgentQL.
 
@@ -26,11 +32,18 @@ def scrape_portfolio_page_from_vc_domains():
     2. Loop over the domains and find the portfolio page using AgentQL.
     3. Process the found links to have them all in the same format.
     4. Store the portfolio page links to their respective VC in the database.
+
+    :param selection: Shard and batch of the VCs to scrape
+    :param concurrency: Number of webpages scraped at the same time
+    :return: Records of the VCs that were scraped
     """
-    db_records: list[dict[str, any]] = fetch_vc_domains()
+    db_records: list[dict[str, any]] = fetch_vc_domains(selection)
+    if not db_records:
+        return []
+
     vc_domains: list[str] = [record['domain'] for record in db_records]
 
-    page_htmls: list[str] = asyncio.run(scrape_webpages_content_async(vc_domains))
+    page_htmls: list[str] = asyncio.run(scrape_webpages_content_async(vc_domains, batch_size=concurrency))
 
     portfolio_endpoint_records: list[dict[str, str]] = []
     for domain, page_html in zip(vc_domains, page_htmls):
@@ -52,6 +65,8 @@ def scrape_portfolio_page_from_vc_domains():
 
     store_portfolio_page_in_db(portfolio_endpoint_records)
 
+    return db_records
+
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
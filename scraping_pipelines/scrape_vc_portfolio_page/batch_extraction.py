@@ -0,0 +1,431 @@
+# Standard
+import io
+import json
+import time
+import logging
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, TYPE_CHECKING
+
+# OpenAI SDK
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from openai.types import Batch
+
+# Request composition shared with the synchronous extraction
+from scraping_pipelines.scrape_vc_portfolio_page.gpt_scraper_assistant import (
+    get_client,
+    company_information_request_body
+)
+
+
+# Directory in which every batch job keeps its request file, state and results
+BATCH_JOBS_PATH: Path = Path(__file__).parent.parent.parent / "batch_jobs"
+BATCH_ENDPOINT: str = "/v1/chat/completions"
+# Statuses after which a batch will not change anymore
+TERMINAL_BATCH_STATUSES: set[str] = {"completed", "failed", "expired", "cancelled"}
+
+
+def _job_path(job_name: str) -> Path:
+    """Directory of the files belonging to the batch job."""
+    return BATCH_JOBS_PATH / job_name
+
+
+def _load_job_state(job_name: str) -> dict[str, any]:
+    """Load the state of a batch job, which is used to resume a job at the last finished step."""
+    state_path: Path = _job_path(job_name) / "state.json"
+    if not state_path.exists():
+        return {}
+
+    with open(state_path, "r") as file:
+        return json.load(file)
+
+
+def _save_job_state(job_name: str, state: dict[str, any]):
+    """Store the state of a batch job."""
+    with open(_job_path(job_name) / "state.json", "w") as file:
+        json.dump(state, file, indent=2)
+
+
+def _load_structured_companies(job_name: str) -> dict[str, dict[str, any]]:
+    """
+    Load the company information of the job read from structured data, by the custom id of the company:
+    the complete company information of companies without a request, or the structured information
+    that takes precedence over the result of the request.
+    """
+    structured_companies_path: Path = _job_path(job_name) / "structured_companies.json"
+    if not structured_companies_path.exists():
+        return {}
+
+    with open(structured_companies_path, "r") as file:
+        return json.load(file)
+
+
+def company_request_custom_id(vc_id: int, company_index: int) -> str:
+    """
+    Compose the id of a single batch request, which is used to map the batch results back to the VC
+    and the position of the company on the portfolio page.
+
+    :param vc_id: ID of the VC in the database
+    :param company_index: Position of the company on the portfolio page of the VC
+    :return: Custom id of the batch request
+    """
+    return f"vc-{vc_id}-company-{company_index}"
+
+
+def _parse_company_request_custom_id(custom_id: str) -> tuple[int, int]:
+    """Extract the VC id and the company index from the custom id of a batch request."""
+    _, vc_id, _, company_index = custom_id.split("-")
+    return int(vc_id), int(company_index)
+
+
+def batch_job_exists(job_name: str) -> bool:
+    """Check if the requests of the batch job have already been written."""
+    return _load_job_state(job_name).get("status") is not None
+
+
+def batch_job_vc_ids(job_name: str) -> list[int]:
+    """
+    IDs of the VCs of which the companies are extracted by the batch job, stored when the job was created.
+
+    :param job_name: Name of the batch job
+    :return: VC ids in the order of the requests
+    """
+    return _load_job_state(job_name).get("vc_ids", [])
+
+
+def create_batch_job(job_name: str, company_texts: list[dict[str, any]]) -> Path:
+    """
+    Write the company extraction requests to the JSONL request file of a new batch job.
+    When the job already exists the request file is left untouched, so that a job can be resumed.
+    The ids of the VCs are stored in the job state, a resumed job maps its results to these VCs.
+
+    Companies of which the structured data is complete need no request, their company information is stored
+    with the job. The structured information of the other companies is stored as well, it takes precedence
+    over the result of their request (see complete_company_information).
+
+    :param job_name: Unique name of the batch job (e.g. the date of the nightly refresh)
+    :param company_texts: Records with the vc_id and either the extracted_company_text of each company,
+        optionally with its structured_information, or its complete company_information
+    :return: Path to the JSONL request file
+    """
+    requests_path: Path = _job_path(job_name) / "requests.jsonl"
+    if batch_job_exists(job_name):
+        logging.info(f"Batch job {job_name} already exists, reusing {requests_path}")
+        return requests_path
+
+    if not company_texts:
+        raise ValueError(f"Batch job {job_name} has no companies")
+
+    _job_path(job_name).mkdir(parents=True, exist_ok=True)
+
+    # Number the companies per VC to map the results back to the order of the portfolio page
+    company_indices: dict[int, int] = {}
+    structured_companies: dict[str, dict[str, any]] = {}
+    request_count: int = 0
+    with open(requests_path, "w") as file:
+        for record in company_texts:
+            vc_id: int = record["vc_id"]
+            company_index: int = company_indices.get(vc_id, 0)
+            company_indices[vc_id] = company_index + 1
+            custom_id: str = company_request_custom_id(vc_id, company_index)
+
+            if record.get("company_information") is not None:
+                structured_companies[custom_id] = {"company_information": record["company_information"]}
+                continue
+            if record.get("structured_information"):
+                structured_companies[custom_id] = {"structured_information": record["structured_information"]}
+
+            batch_request: dict[str, any] = {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": company_information_request_body(record["extracted_company_text"]),
+            }
+            file.write(json.dumps(batch_request) + "\n")
+            request_count += 1
+
+    with open(_job_path(job_name) / "structured_companies.json", "w") as file:
+        json.dump(structured_companies, file)
+
+    _save_job_state(job_name, {
+        "status": "created",
+        "request_count": request_count,
+        "vc_ids": list(company_indices),
+    })
+    logging.info(
+        f"Wrote {request_count} requests for batch job {job_name} to {requests_path}, "
+        f"{len(company_texts) - request_count} companies are complete without a request"
+    )
+
+    return requests_path
+
+
+def submit_batch_job(job_name: str, client: "OpenAI | None" = None) -> str:
+    """
+    Upload the request file and create the batch. Every step is recorded in the job state,
+    a job which was already submitted is not submitted a second time.
+
+    :param job_name: Name of the batch job
+    :param client: OpenAI client, or a stand-in with the same files and batches interface,
+        the shared client when None
+    :return: ID of the batch
+    """
+    client = client or get_client()
+    state: dict[str, any] = _load_job_state(job_name)
+
+    if "input_file_id" not in state:
+        with open(_job_path(job_name) / "requests.jsonl", "rb") as file:
+            state["input_file_id"] = client.files.create(file=file, purpose="batch").id
+        _save_job_state(job_name, state)
+
+    if "batch_id" not in state:
+        batch: Batch = client.batches.create(
+            input_file_id=state["input_file_id"],
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h",
+        )
+        state["batch_id"] = batch.id
+        state["status"] = batch.status
+        _save_job_state(job_name, state)
+        logging.info(f"Submitted batch job {job_name} as batch {batch.id}")
+
+    return state["batch_id"]
+
+
+def wait_for_batch_job(job_name: str, client: "OpenAI | None" = None, poll_interval: float = 60) -> "Batch":
+    """
+    Poll the batch until it reaches a terminal status.
+
+    :param job_name: Name of the batch job
+    :param client: OpenAI client, or a stand-in with the same files and batches interface,
+        the shared client when None
+    :param poll_interval: Seconds to wait between two status requests
+    :return: The finished batch
+    """
+    client = client or get_client()
+    state: dict[str, any] = _load_job_state(job_name)
+
+    while True:
+        batch: Batch = client.batches.retrieve(state["batch_id"])
+        if (batch.status, batch.output_file_id) != (state.get("status"), state.get("output_file_id")):
+            state["status"] = batch.status
+            state["output_file_id"] = batch.output_file_id
+            _save_job_state(job_name, state)
+            logging.info(f"Batch job {job_name} is {batch.status}")
+
+        if batch.status in TERMINAL_BATCH_STATUSES:
+            return batch
+
+        time.sleep(poll_interval)
+
+
+def download_batch_results(job_name: str, client: "OpenAI | None" = None) -> Path:
+    """
+    Download the output file of a completed batch. The results are only downloaded once.
+
+    :param job_name: Name of the batch job
+    :param client: OpenAI client, or a stand-in with the same files and batches interface,
+        the shared client when None
+    :return: Path to the JSONL results file
+    """
+    results_path: Path = _job_path(job_name) / "results.jsonl"
+    if results_path.exists():
+        return results_path
+
+    state: dict[str, any] = _load_job_state(job_name)
+    if not state.get("output_file_id"):
+        raise RuntimeError(f"Batch job {job_name} has no output file (status: {state.get('status')})")
+
+    client = client or get_client()
+    results_path.write_text(client.files.content(state["output_file_id"]).text)
+
+    return results_path
+
+
+def map_batch_results_to_vcs(
+        results_path: Path | None,
+        structured_companies: dict[str, dict[str, any]] | None = None
+) -> dict[int, list[dict[str, any]]]:
+    """
+    Map the results of the batch back to the VCs. Failed requests and responses that are not valid JSON
+    are logged and skipped.
+
+    :param results_path: Path to the JSONL results file, None when the batch job has no requests
+    :param structured_companies: Company information read from structured data by custom id, see create_batch_job
+    :return: Structured company information per VC id, in the order of the portfolio page
+    """
+    structured_companies: dict[str, dict[str, any]] = structured_companies or {}
+
+    indexed_companies: dict[int, list[tuple[int, dict[str, any]]]] = {}
+    for custom_id, structured_company in structured_companies.items():
+        if "company_information" in structured_company:
+            vc_id, company_index = _parse_company_request_custom_id(custom_id)
+            indexed_companies.setdefault(vc_id, []).append((company_index, structured_company["company_information"]))
+
+    result_lines: list[str] = results_path.read_text().splitlines() if results_path is not None else []
+    for line in result_lines:
+        if not line.strip():
+            continue
+
+        result: dict[str, any] = json.loads(line)
+        vc_id, company_index = _parse_company_request_custom_id(result["custom_id"])
+
+        response: dict[str, any] | None = result.get("response")
+        if result.get("error") or not response or response.get("status_code") != 200:
+            logging.error(f"Request {result['custom_id']} failed: {result.get('error') or response}")
+            continue
+
+        response_content: str = response["body"]["choices"][0]["message"]["content"]
+        try:
+            company_information: dict[str, any] = json.loads(response_content)
+        except json.JSONDecodeError:
+            logging.error(f"Request {result['custom_id']} returned invalid JSON: {response_content}")
+            continue
+
+        # The structured data of the company takes precedence over the extracted values
+        structured_information: dict[str, any] = (
+            structured_companies.get(result["custom_id"], {}).get("structured_information", {})
+        )
+        indexed_companies.setdefault(vc_id, []).append(
+            (company_index, {**company_information, **structured_information})
+        )
+
+    return {
+        vc_id: [company_information for _, company_information in sorted(companies, key=lambda c: c[0])]
+        for vc_id, companies in indexed_companies.items()
+    }
+
+
+def _discard_batch(job_name: str):
+    """Forget the batch of a job that ended without results, the uploaded request file is reused."""
+    state: dict[str, any] = _load_job_state(job_name)
+    for key in ("batch_id", "output_file_id"):
+        state.pop(key, None)
+    state["status"] = "created"
+    _save_job_state(job_name, state)
+
+
+def run_batch_job(
+        job_name: str,
+        client: "OpenAI | None" = None,
+        poll_interval: float = 60,
+        max_submissions: int = 3
+) -> dict[int, list[dict[str, any]]]:
+    """
+    Runs a created batch job to completion. Each step (upload, submission, polling and download) is
+    stored in the job state, so an interrupted run continues where it stopped when it is started again.
+    A batch that failed, expired or was cancelled is discarded and the job is submitted as a new batch,
+    also when the job is started again after running out of submissions.
+
+    Procedure:
+        1. Upload the request file and submit the batch, unless every company of the job is complete.
+        2. Poll the batch until it is finished.
+        3. Download the results.
+        4. Map the results back to the VCs.
+
+    :param job_name: Name of the batch job
+    :param client: OpenAI client, or a stand-in with the same files and batches interface,
+        the shared client when None
+    :param poll_interval: Seconds to wait between two status requests
+    :param max_submissions: Maximum number of batches submitted by this run
+    :return: Structured company information per VC id
+    """
+    structured_companies: dict[str, dict[str, any]] = _load_structured_companies(job_name)
+    # Every company of the job was complete without a request, there is no batch to submit
+    if _load_job_state(job_name).get("request_count") == 0:
+        return map_batch_results_to_vcs(None, structured_companies)
+
+    for _ in range(max_submissions):
+        submit_batch_job(job_name, client)
+
+        batch: Batch = wait_for_batch_job(job_name, client, poll_interval)
+        if batch.status == "completed":
+            break
+
+        logging.warning(f"Batch job {job_name} ended with status {batch.status}, discarding batch {batch.id}")
+        _discard_batch(job_name)
+    else:
+        raise RuntimeError(f"Batch job {job_name} ended without results {max_submissions} times")
+
+    results_path: Path = download_batch_results(job_name, client)
+
+    return map_batch_results_to_vcs(results_path, structured_companies)
+
+
+class LocalBatchClient:
+    """
+    Local stand-in for the files and batches endpoints of the OpenAI client. The requests of a batch are
+    answered synchronously with the given respond function, which makes it possible to run a batch job
+    without network access or costs.
+    """
+    def __init__(self, respond: Callable[[dict[str, any]], str], storage_path: Path):
+        """
+        :param respond: Function receiving the body of a chat completion request and returning the message content
+        :param storage_path: Directory to store the uploaded and generated files
+        """
+        self.respond = respond
+        self.storage_path = storage_path
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+
+        self._batches: dict[str, SimpleNamespace] = {}
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+
+    def _create_file(self, file: io.BufferedReader, purpose: str) -> SimpleNamespace:
+        """Store the uploaded file under a new file id."""
+        file_id: str = f"file-{len(list(self.storage_path.iterdir()))}"
+        (self.storage_path / file_id).write_bytes(file.read())
+        return SimpleNamespace(id=file_id, purpose=purpose)
+
+    def _file_content(self, file_id: str) -> SimpleNamespace:
+        """Return the content of a stored file."""
+        return SimpleNamespace(text=(self.storage_path / file_id).read_text())
+
+    def _create_batch(self, input_file_id: str, endpoint: str, completion_window: str) -> SimpleNamespace:
+        """Answer all requests of the input file and store the responses as output file."""
+        output_lines: list[str] = []
+        for line in self._file_content(input_file_id).text.splitlines():
+            request: dict[str, any] = json.loads(line)
+            response_body: dict[str, any] = {
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": self.respond(request["body"])}}]
+            }
+            output_lines.append(json.dumps({
+                "id": f"response-{request['custom_id']}",
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "body": response_body},
+                "error": None,
+            }))
+
+        output_file: SimpleNamespace = self._create_file(io.BytesIO("\n".join(output_lines).encode()), "batch_output")
+
+        batch_id: str = f"batch-{len(self._batches)}"
+        self._batches[batch_id] = SimpleNamespace(id=batch_id, status="completed", output_file_id=output_file.id)
+        return self._batches[batch_id]
+
+    def _retrieve_batch(self, batch_id: str) -> SimpleNamespace:
+        """Return the stored batch."""
+        return self._batches[batch_id]
+
+
+if __name__ == "__main__":
+    import tempfile
+    logging.basicConfig(level=logging.INFO)
+
+    COMPANY_TEXTS: list[dict[str, any]] = [
+        {"vc_id": 1, "extracted_company_text": "Aiven\nWebsite\n(https://aiven.io)"},
+        {"vc_id": 1, "extracted_company_text": "Klarna\nWebsite\n(https://klarna.com)"},
+        {"vc_id": 2, "extracted_company_text": "Spotify\nWebsite\n(https://spotify.com)"},
+    ]
+
+    def respond_with_company_name(request_body: dict[str, any]) -> str:
+        """Pretend to extract the company name from the first line of the company text."""
+        company_text: str = request_body["messages"][-1]["content"].split("'''")[1].strip()
+        return json.dumps({"name": company_text.splitlines()[0]})
+
+    with tempfile.TemporaryDirectory() as storage_dir:
+        BATCH_JOBS_PATH = Path(storage_dir) / "batch_jobs"
+        local_client = LocalBatchClient(respond_with_company_name, Path(storage_dir) / "files")
+
+        create_batch_job("local-example", COMPANY_TEXTS)
+        logging.info(run_batch_job("local-example", client=local_client, poll_interval=0))
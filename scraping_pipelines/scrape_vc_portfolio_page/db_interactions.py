@@ -2,44 +2,62 @@
 import logging
 
 # DB interactions
-from database.interaction_utils import execute_sql, records_as_sql_values
+from database.interaction_utils import execute_statement, records_as_sql_arrays, sql_unnest_arrays
 
-# Data processing
-from utils.url_parsing import get_domain_name, get_endpoint
-from utils.general import str_to_int
+# Work selection
+from scraping_pipelines.work_selection import WorkSelection
 
+# Deduplication of the companies across VCs
+from scraping_pipelines.company_index import CompanyIndex
 
-def fetch_portfolio_pages() -> list[dict[str, any]]:
+# Result objects
+from graph.result_dataclasses.company import Company
+from graph.result_dataclasses.investment import Investment
+
+
+# Type of the columns of the companies and investments, the records are sent as one array per column
+COMPANY_COLUMN_TYPES: dict[str, str] = {
+    "name": "TEXT", "domain": "TEXT", "linkedin_endpoint": "TEXT", "description": "TEXT", "location": "TEXT",
+    "founded_year": "INTEGER", "industry": "TEXT",
+}
+INVESTMENT_COLUMN_TYPES: dict[str, str] = {"vc_id": "INTEGER", "funding_year": "INTEGER", "round_type": "TEXT"}
+# Columns of the rows of the portfolio of a VC, a company with the investment of the VC in it
+PORTFOLIO_COLUMN_TYPES: dict[str, str] = {**COMPANY_COLUMN_TYPES, **INVESTMENT_COLUMN_TYPES, "write_company": "BOOLEAN"}
+
+
+def fetch_portfolio_pages(selection: WorkSelection = WorkSelection()) -> list[dict[str, any]]:
     """
-    Fetch a list of random venture capital domains from the database.
+    Fetch a batch of venture capital portfolio pages from the database.
 
-    :return: List of venture capital domains
+    :param selection: Shard and batch of the VCs to fetch
+    :return: List of venture capital ids and portfolio page urls
     """
     # Get the list of venture capital domains
-    query: str = """
+    query: str = f"""
     SELECT id, 
            'https://' || domain || portfolio_page_endpoint AS portfolio_page_url 
     FROM public.vc
     WHERE portfolio_page_endpoint IS NOT NULL
-    limit 5;
+      AND {selection.sql_filter()}
+    {selection.sql_page()};
     """
-    return execute_sql(query, return_values=True)
+    return execute_statement(query, selection.sql_parameters(), return_values=True)
 
 
-def store_companies_data_in_db(company_records: list[dict[str, str]]) -> list[dict[str, any]]:
+def store_companies_data_in_db(companies: list[Company]) -> list[dict[str, any]]:
     """
     Stores the scraped company information in the database.
 
-    :param company_records: List of dictionaries containing the company information
-    :return: List of created company IDs
+    :param companies: List of companies
+    :return: List of created company IDs, with the domain of each company
     """
-    if not company_records:
+    if not companies:
         return []
 
     # Store the portfolio information in the database
     query: str = f"""
-    INSERT INTO public.companies (name, domain, linkedin_endpoint, description, location, founded_year, industry) 
-    VALUES {records_as_sql_values(company_records)}
+    INSERT INTO public.companies ({', '.join(COMPANY_COLUMN_TYPES)})
+    SELECT * FROM {sql_unnest_arrays(COMPANY_COLUMN_TYPES)}
     ON CONFLICT (domain)
     DO UPDATE 
     SET name = excluded.name,
@@ -49,99 +67,144 @@ def store_companies_data_in_db(company_records: list[dict[str, str]]) -> list[di
         founded_year = excluded.founded_year,
         industry = excluded.industry,
         updated_at = NOW()
-    RETURNING id;
+    RETURNING id, domain;
     """
-    company_ids: list[dict[str, str]] = execute_sql(query, return_values=True, verbose=True)
+    company_ids: list[dict[str, str]] = execute_statement(
+        query, records_as_sql_arrays(companies, columns=COMPANY_COLUMN_TYPES), return_values=True
+    )
 
     return company_ids
 
 
-def store_investments_data_in_db(investment_records: list[dict[str, any]]):
-    """
-    Stores the scraped investment information in the database.
-
-    :param investment_records: List of dictionaries containing the investment information
-    """
-    if not investment_records:
-        return
-
-    # Store the investment information in the database
-    query: str = f"""
-    INSERT INTO public.investments (vc_id, funding_year, round_type, company_id)  
-    VALUES {records_as_sql_values(investment_records)}
-    ON CONFLICT (vc_id, company_id)
-    DO UPDATE 
-    SET funding_year = excluded.funding_year,
-        round_type = excluded.round_type,
-        updated_at = NOW();
-    """
-    execute_sql(query, verbose=True)
-
-
 def _transform_company_data_to_db_format(
         companies_data: list[dict[str, str]],
         vc_id: int
-) -> tuple[list[dict[str, any]], list[dict[str, any]]]:
+) -> tuple[list[Company], list[Investment]]:
     """
-    Transform the company data to match the database schema.
+    Validate the company data and convert it to records matching the database schema.
 
     :param companies_data: GPT extracted company data
-    :return: Transformed company data, Transformed investment data
+    :param vc_id: ID of the VC in the database
+    :return: Companies, Investments of the VC in the companies
     """
-    company_records: list[dict[str, any]] = []
-    investment_records: list[dict[str, any]] = []
-    for company in companies_data:
-        # Force required fields: name, website
-        if not company.get("name") or not get_domain_name(company.get("website")):
+    companies: list[Company] = []
+    investments: list[Investment] = []
+    seen_domains: set[str] = set()
+    for company_information in companies_data:
+        company: Company | None = Company.from_extraction(company_information)
+        if company is None:
+            continue
+        # A single upsert cannot update the same company twice, the first mention of a company is kept
+        if company.domain in seen_domains:
             continue
+        seen_domains.add(company.domain)
 
-        # Extract the company information
-        company_information = {
-            "name": company.get("name"),
-            "domain": get_domain_name(company.get("website")),
-            "linkedin_endpoint": get_endpoint(company.get("linkedin_url")),
-            "description": company.get("description"),
-            "location": company.get("location"),
-            "founded_year": str_to_int(company.get("founded_year")),
-            "industry": company.get("industry"),
-        }
-        company_records.append(company_information)
-
-        # Extract the investment information
-        investment_information = {
-            "vc_id": vc_id,
-            # Make sure that the year is in the correct format
-            "invested_year": str_to_int(company.get("invested_year")),
-            "round_type": company.get("round_type"),
-        }
-        investment_records.append(investment_information)
+        companies.append(company)
+        investments.append(Investment.from_extraction(company_information, vc_id, company.domain))
 
-    return company_records, investment_records
+    return companies, investments
 
 
-def store_portfolio_information_in_db(companies_data: list[dict[str, str]], vc_id: int):
+def store_portfolio_information_in_db(
+        companies_data: list[dict[str, str]],
+        vc_id: int,
+        known_companies: CompanyIndex | None = None
+) -> list[dict[str, any]]:
     """
-    Stores the scraped information about the portfolio companies of a single VC in the database.
+    Stores the scraped information about the portfolio companies of a single VC in the database,
+    the companies and the investments of the VC in them with a single statement.
 
     Procedure:
-        1. Map the keys GPT predicted to the keys in the database
-        2. Store the company information in the database
-        3. Store information about the investments in the database
+        1. Convert the information GPT extracted to companies and investments
+        2. Upsert the companies, returning the id of each domain
+        3. Upsert the investments, joined to the company ids on the domain
+
+    With a company index, the companies are merged with what is known about them from the other VCs,
+    and only the companies of which the merged information changed are written. The ids of the other
+    companies are looked up by their domain in the same statement.
 
     :param companies_data: List of dictionaries containing the company information
     :param vc_id: ID of the VC in the database
+    :param known_companies: Index of the companies known in the run, None to write every company
+    :return: ID and domain of the written companies
     """
-    company_records, investment_records = _transform_company_data_to_db_format(companies_data, vc_id)
+    companies, investments = _transform_company_data_to_db_format(companies_data, vc_id)
+    if not companies:
+        return []
 
-    company_ids: list[dict[str, str]] = store_companies_data_in_db(company_records)
+    changed_domains: set[str] | None = None
+    if known_companies is not None:
+        companies, changed_companies = known_companies.merge(companies)
+        changed_domains = {changed_company.domain for changed_company in changed_companies}
+
+    # One row per company, with the columns of the company and of the investment in it. Two companies can have the
+    # same canonical domain after the merge, and a statement cannot update a row twice, so the first investment is
+    # kept, with the last merged company, which holds the information of both.
+    merged_companies: dict[str, Company] = {company.domain: company for company in companies}
+    portfolio_records: dict[str, dict[str, any]] = {}
+    for company, investment in zip(companies, investments):
+        if company.domain in portfolio_records:
+            continue
 
-    # Add the company ids to the investment records
-    investment_records: list[dict[str, str]] = [
-        {**investment_record, "company_id": company_id["id"]}
-        for investment_record, company_id in zip(investment_records, company_ids)
-    ]
+        portfolio_records[company.domain] = {
+            **{column: getattr(merged_companies[company.domain], column) for column in COMPANY_COLUMN_TYPES},
+            **{column: getattr(investment, column) for column in INVESTMENT_COLUMN_TYPES},
+            "write_company": changed_domains is None or company.domain in changed_domains,
+        }
 
-    store_investments_data_in_db(investment_records)
+    # The companies inserted by the statement are not visible in public.companies within the statement,
+    # so their ids come from the RETURNING clause and the ids of the unchanged companies from the table.
+    # The statement has the same text for every VC, the rows are sent as arrays.
+    query: str = f"""
+    WITH portfolio AS (
+        SELECT * FROM {sql_unnest_arrays(PORTFOLIO_COLUMN_TYPES)} AS portfolio ({', '.join(PORTFOLIO_COLUMN_TYPES)})
+    ),
+    written_companies AS (
+        INSERT INTO public.companies ({', '.join(COMPANY_COLUMN_TYPES)})
+        SELECT {', '.join(COMPANY_COLUMN_TYPES)}
+        FROM portfolio
+        WHERE write_company
+        ON CONFLICT (domain)
+        DO UPDATE
+        SET name = excluded.name,
+            linkedin_endpoint = excluded.linkedin_endpoint,
+            description = excluded.description,
+            location = excluded.location,
+            founded_year = excluded.founded_year,
+            industry = excluded.industry,
+            updated_at = NOW()
+        RETURNING id, domain
+    ),
+    company_ids AS (
+        SELECT id, domain FROM written_companies
+        UNION ALL
+        SELECT companies.id, companies.domain
+        FROM public.companies
+        JOIN portfolio ON portfolio.domain = companies.domain
+        WHERE NOT portfolio.write_company
+    ),
+    written_investments AS (
+        INSERT INTO public.investments (vc_id, company_id, funding_year, round_type)
+        SELECT portfolio.vc_id, company_ids.id, portfolio.funding_year, portfolio.round_type
+        FROM portfolio
+        JOIN company_ids ON company_ids.domain = portfolio.domain
+        ON CONFLICT (vc_id, company_id)
+        DO UPDATE
+        SET funding_year = excluded.funding_year,
+            round_type = excluded.round_type,
+            updated_at = NOW()
+    )
+    SELECT id, domain FROM written_companies;
+    """
+    portfolio_arrays: dict[str, list[any]] = records_as_sql_arrays(
+        list(portfolio_records.values()), columns=PORTFOLIO_COLUMN_TYPES
+    )
+    company_ids: list[dict[str, any]] = execute_statement(query, portfolio_arrays, return_values=True)
+
+    if known_companies is not None:
+        known_companies.mark_stored(company_ids)
+
+    return company_ids
 
 
 if __name__ == "__main__":
@@ -2,16 +2,51 @@
 import os
 import json
 import logging
+import threading
+from typing import TYPE_CHECKING
 
-# OpenAI SDK
-from openai import OpenAI
-from openai.types.chat import ChatCompletion, ChatCompletionMessageToolCall
+# OpenAI SDK, imported on first use
+from utils.lazy_import import lazy_import
+openai = lazy_import("openai")
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from openai.types.chat import ChatCompletion, ChatCompletionMessageToolCall
 
+# Metrics
+from utils.metrics import track_llm_request, record_llm_usage
 
-CLIENT = OpenAI(api_key=os.getenv("PERSONAL_OPEN_AI_API_KEY"))
 
+_CLIENT: "OpenAI | None" = None
+_CLIENT_LOCK = threading.Lock()
 
-def prompt_gpt_for_next_scraping_step(extracted_company_text: str) -> ChatCompletionMessageToolCall | None:
+
+def get_client() -> "OpenAI":
+    """
+    OpenAI client shared by the prompts, created on first use so that importing the module does not
+    import the SDK or require the API key.
+
+    :return: OpenAI client
+    """
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = openai.OpenAI(api_key=os.getenv("PERSONAL_OPEN_AI_API_KEY"))
+
+    return _CLIENT
+
+
+def set_client(client: any):
+    """
+    Replace the client of the prompts, e.g. by a local stand-in with the same chat completions interface.
+
+    :param client: OpenAI client or stand-in
+    """
+    global _CLIENT
+    with _CLIENT_LOCK:
+        _CLIENT = client
+
+
+def prompt_gpt_for_next_scraping_step(extracted_company_text: str) -> "ChatCompletionMessageToolCall | None":
     """
     This function uses GPT function calling to determine the next scraping step.
 
@@ -69,30 +104,31 @@ def prompt_gpt_for_next_scraping_step(extracted_company_text: str) -> ChatComple
         },
     ]
 
-    response: ChatCompletion = CLIENT.chat.completions.create(
-        model=MODEL,
-        messages=[
-            {"role": "system", "content": SYSTEM_MESSAGE},
-            {"role": "user", "content": PROMPT.format(company_tag_text=extracted_company_text)}
-        ],
-        temperature=0,
-        # JSON mode
-        tools=tools,
-    )
+    with track_llm_request("prompt_gpt_for_next_scraping_step", MODEL):
+        response: ChatCompletion = get_client().chat.completions.create(
+            model=MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_MESSAGE},
+                {"role": "user", "content": PROMPT.format(company_tag_text=extracted_company_text)}
+            ],
+            temperature=0,
+            # JSON mode
+            tools=tools,
+        )
+    record_llm_usage("prompt_gpt_for_next_scraping_step", MODEL, response)
 
     # Extract the first tool call from the response
     tool_calls = response.choices[0].message.tool_calls
     return tool_calls[0] if tool_calls else None
 
 
-def extract_company_information(extracted_company_text: str) -> dict[str, str]:
+def company_information_request_body(extracted_company_text: str) -> dict[str, any]:
     """
-    Transforms the raw unstructured text of a company tag into structured company details using GPT.
-    The model is prompted to identify specific information about the company such as
-    name, website and description.
+    Compose the chat completion request that transforms the raw unstructured text of a company tag
+    into structured company details. The body is shared between the synchronous and the batch extraction.
 
     :param extracted_company_text: Text extracted about the company
-    :return: Structured company information
+    :return: Keyword arguments of the chat completion request
     """
     MODEL: str = "gpt-3.5-turbo-1106"
     SYSTEM_MESSAGE: str = """
@@ -122,16 +158,31 @@ def extract_company_information(extracted_company_text: str) -> dict[str, str]:
     }}
     """
 
-    response: ChatCompletion = CLIENT.chat.completions.create(
-        model=MODEL,
-        messages=[
+    return {
+        "model": MODEL,
+        "messages": [
             {"role": "system", "content": SYSTEM_MESSAGE},
             {"role": "user", "content": PROMPT.format(company_text=extracted_company_text)}
         ],
-        temperature=0,
+        "temperature": 0,
         # JSON mode
-        response_format={"type": "json_object"},
-    )
+        "response_format": {"type": "json_object"},
+    }
+
+
+def extract_company_information(extracted_company_text: str) -> dict[str, str]:
+    """
+    Transforms the raw unstructured text of a company tag into structured company details using GPT.
+    The model is prompted to identify specific information about the company such as
+    name, website and description.
+
+    :param extracted_company_text: Text extracted about the company
+    :return: Structured company information
+    """
+    request_body: dict[str, any] = company_information_request_body(extracted_company_text)
+    with track_llm_request("extract_company_information", request_body["model"]):
+        response: ChatCompletion = get_client().chat.completions.create(**request_body)
+    record_llm_usage("extract_company_information", request_body["model"], response)
 
     # Extract the company information from the response
     response_content: str = response.choices[0].message.content
@@ -1,15 +1,18 @@
 # Standard
 import logging
+from typing import TYPE_CHECKING
 
 # HTML parsing
-from bs4 import BeautifulSoup, Tag, NavigableString
+from utils.lazy_import import lazy_import
+bs4 = lazy_import("bs4")
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup, Tag
 
 # Url parsing
-from utils.url_parsing import get_endpoint
-from utils.html_processing import is_subpage_link
+from utils.html_processing import subpage_endpoint
 
 
-def find_tag_with_most_children(soup: BeautifulSoup) -> Tag:
+def find_tag_with_most_children(soup: "BeautifulSoup") -> "Tag":
     """
     Finds the tag with the most children in the HTML content. This tag is likely
     to be the portfolio companies section of the page.
@@ -24,7 +27,7 @@ def find_tag_with_most_children(soup: BeautifulSoup) -> Tag:
     max_tag = None
     # Traverse all tags and count the number of children for each tag
     for tag in base_tag.find_all(True):
-        children_count = sum(1 for child in tag.children if isinstance(child, Tag))
+        children_count = sum(1 for child in tag.children if isinstance(child, bs4.Tag))
 
         # Update the tag with the most children
         if children_count >= max_children_count:
@@ -34,7 +37,7 @@ def find_tag_with_most_children(soup: BeautifulSoup) -> Tag:
     return max_tag
 
 
-def extract_text_and_links(base_tag: Tag) -> str:
+def extract_text_and_links(base_tag: "Tag") -> str:
     """
     Formats the text and links from a tag and its children into a single string.
 
@@ -46,7 +49,7 @@ def extract_text_and_links(base_tag: Tag) -> str:
 
     # Append link as text to content of the tag
     for tag in base_tag.find_all(href=True):
-        tag.contents.append(NavigableString(f" ({tag.get('href')})"))
+        tag.contents.append(bs4.NavigableString(f" ({tag.get('href')})"))
 
     # Combine all text and links into a single string
     for tag in base_tag.find_all(True):
@@ -56,24 +59,25 @@ def extract_text_and_links(base_tag: Tag) -> str:
     return str(base_tag.get_text(separator='\n', strip=True))
 
 
-def extract_first_endpoint(base_tag: Tag, base_domain: str) -> str | None:
+def extract_first_endpoint(base_tag: "Tag", base_domain: str, page_url: str | None = None) -> str | None:
     """
     Extract the first endpoint from a tag.
 
     :param base_tag: Tag containing the endpoints
     :param base_domain: Base domain of the webpage
+    :param page_url: URL of the webpage to resolve relative links against, the root of the base domain when None
     :return: First endpoint
     """
+    page_url: str = page_url or f"https://{base_domain}/"
     for tag in base_tag.find_all(href=True):
-        link: str = tag.get('href')
-        endpoint: str = get_endpoint(url=link)
-
-        if is_subpage_link(link, endpoint, base_domain):
+        endpoint: str | None = subpage_endpoint(tag.get('href'), page_url, base_domain)
+        if endpoint:
             return endpoint
 
 
 if __name__ == "__main__":
     from pathlib import Path
+    from bs4 import BeautifulSoup, Tag
     logging.basicConfig(level=logging.INFO)
 
     # Create a directory to store the HTML content
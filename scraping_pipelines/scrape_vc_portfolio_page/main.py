@@ -1,6 +1,8 @@
 # Standard
 import logging
 import asyncio
+from functools import partial
+from typing import TYPE_CHECKING
 
 # DB interactions
 from scraping_pipelines.scrape_vc_portfolio_page.db_interactions import (
@@ -9,78 +11,181 @@ from scraping_pipelines.scrape_vc_portfolio_page.db_interactions import (
 )
 
 # Scraper
-from bs4 import BeautifulSoup, Tag
+from utils.lazy_import import lazy_import
+bs4 = lazy_import("bs4")
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup, Tag
 from scraper.playwrite_async import scrape_webpages_content_async
 from scraping_pipelines.scrape_vc_portfolio_page.html_processing import (
     find_tag_with_most_children,
     extract_text_and_links,
     extract_first_endpoint
 )
+from scraping_pipelines.scrape_vc_portfolio_page.structured_extraction import (
+    extract_structured_company_information,
+    fast_path_company_information,
+    complete_company_information
+)
 
 # OpenAI SDK
 from scraping_pipelines.scrape_vc_portfolio_page.gpt_scraper_assistant import (
     prompt_gpt_for_next_scraping_step,
-    ChatCompletionMessageToolCall,
     extract_company_information
 )
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionMessageToolCall
+
+# Batch extraction
+from scraping_pipelines.scrape_vc_portfolio_page.batch_extraction import (
+    batch_job_exists,
+    batch_job_vc_ids,
+    create_batch_job,
+    run_batch_job
+)
 
 # Url parsing
 from utils.url_parsing import get_domain_name
 
+# Work selection
+from scraping_pipelines.work_selection import WorkSelection
+from scraping_pipelines.company_index import CompanyIndex
+from scraping_pipelines.scrape_scheduling import content_hash, record_scrape_outcomes
+
+# Metrics
+from utils.metrics import ERRORS
+
+
+# Scraping steps GPT decides on when the portfolio page holds no companies to extract
+SKIPPING_STEPS: tuple[str | None, ...] = (None, "skip_vc_page")
+
+
+def extract_companies_text(portfolio_companies_tag: "Tag") -> list[str]:
+    """
+    Extract the text and links of each company tag in the portfolio companies section.
+
+    :param portfolio_companies_tag: Tag containing the portfolio companies
+    :return: Text extracted from each company tag
+    """
+    return [
+        extract_text_and_links(company_tag)
+        for company_tag in portfolio_companies_tag.children
+        if isinstance(company_tag, bs4.Tag)
+    ]
+
+
+def scrape_subpages(portfolio_companies_tag: "Tag", base_domain: str, page_url: str | None = None) -> list[str]:
+    """
+    Navigate to the subpage of each company tag and scrape its content.
 
-def extract_companies_information(portfolio_companies_tag: Tag) -> list[dict[str, any]]:
+    :param portfolio_companies_tag: Tag containing the portfolio companies
+    :param base_domain: Base domain of the webpage
+    :param page_url: URL of the portfolio page, to resolve relative subpage links against
+    :return: HTML content of each company subpage, for the company tags with a link to a subpage
+    """
+    # Extract the link to the company subpage, company tags without a link have no subpage to scrape
+    sub_page_endpoints: list[str | None] = [
+        extract_first_endpoint(tag, base_domain, page_url)
+        for tag in portfolio_companies_tag.children
+        if isinstance(tag, bs4.Tag)
+    ]
+    sub_page_links = [f"https://{base_domain}{endpoint}" for endpoint in sub_page_endpoints if endpoint]
+
+    # Scrape the main content of the subpages
+    return asyncio.run(scrape_webpages_content_async(sub_page_links))
+
+
+def extract_subpages_companies(
+        portfolio_companies_tag: "Tag",
+        base_domain: str,
+        page_url: str | None = None
+) -> list[dict[str, any]]:
+    """
+    Navigate to the subpage of each company tag and read the company from the structured data of the subpage.
+    The text and links of the subpage are extracted for the companies that still need the LLM.
+
+    :param portfolio_companies_tag: Tag containing the portfolio companies
+    :param base_domain: Base domain of the webpage
+    :param page_url: URL of the portfolio page, to resolve relative subpage links against
+    :return: Per company subpage either the complete company_information, or the extracted_company_text
+        with the structured_information read from the subpage
+    """
+    subpage_companies: list[dict[str, any]] = []
+    for subpage_content in scrape_subpages(portfolio_companies_tag, base_domain, page_url):
+        extracted_company_text: str = extract_text_and_links(bs4.BeautifulSoup(subpage_content))
+        structured_information: dict[str, any] = extract_structured_company_information(subpage_content, base_domain)
+
+        company_information: dict[str, any] | None = fast_path_company_information(
+            structured_information, extracted_company_text
+        )
+        if company_information is not None:
+            subpage_companies.append({"company_information": company_information})
+        else:
+            subpage_companies.append({
+                "extracted_company_text": extracted_company_text,
+                "structured_information": structured_information,
+            })
+
+    return subpage_companies
+
+
+def extract_companies_information(
+        portfolio_companies_tag: "Tag",
+        known_companies: CompanyIndex | None = None
+) -> list[dict[str, any]]:
     """
     Extract structured information about the portfolio companies from each company tag.
 
     :param portfolio_companies_tag: Tag containing the portfolio companies
+    :param known_companies: Index of the companies known in the run, skips the extraction of known companies
     :return: List of structured company information
     """
     structured_data: list[dict[str, any]] = []
-    i = 0
-    for company_tag in portfolio_companies_tag.children:
-        if not isinstance(company_tag, Tag):
-            continue
-
-        if i >= 3:
-            break
-
-        extracted_company_text: str = extract_text_and_links(company_tag)
+    for extracted_company_text in extract_companies_text(portfolio_companies_tag):
         logging.info(f"Extracted company text: {extracted_company_text}")
-        company_information: dict[str, str] = extract_company_information(extracted_company_text)
+        if known_companies is None:
+            company_information: dict[str, str] = extract_company_information(extracted_company_text)
+        else:
+            company_information: dict[str, str] = known_companies.extract(
+                extracted_company_text, extract_company_information
+            )
         logging.info(f"Company information: {company_information}")
 
         structured_data.append(company_information)
-        i += 1
 
     return structured_data
 
 
-def extract_from_company_subpage(portfolio_companies_tag: Tag, base_domain: str) -> list[dict[str, str]]:
+def extract_from_company_subpage(
+        portfolio_companies_tag: "Tag",
+        base_domain: str,
+        known_companies: CompanyIndex | None = None,
+        page_url: str | None = None
+) -> list[dict[str, str]]:
     """
     Extract structured information about the portfolio companies from each company subpage.
     This function is needed when the information is not directly available in the company tag.
     In this case we need to navigate to the company subpage to extract the information.
+    The structured data embedded in the subpage is read first, GPT is only prompted when it is incomplete.
 
     :param portfolio_companies_tag: Tag containing the portfolio companies
     :param base_domain: Base domain of the webpage
+    :param known_companies: Index of the companies known in the run, skips the extraction of known companies
+    :param page_url: URL of the portfolio page, to resolve relative subpage links against
     :return: List of structured company information
     """
-    # Extract the link to the company subpage
-    sub_page_links = [
-        f"https://{base_domain}{extract_first_endpoint(tag, base_domain)}"
-        for tag in portfolio_companies_tag.children
-        if isinstance(tag, Tag)
-    ]
-
-    # Scrape the main content of the subpages
-    subpages_content: list[str] = asyncio.run(scrape_webpages_content_async(sub_page_links))
-
     structured_data: list[dict[str, any]] = []
-    for subpage_content in subpages_content:
-        soup: BeautifulSoup = BeautifulSoup(subpage_content)
-        extracted_company_text: str = extract_text_and_links(soup)
+    for subpage_content in scrape_subpages(portfolio_companies_tag, base_domain, page_url):
+        extracted_company_text: str = extract_text_and_links(bs4.BeautifulSoup(subpage_content))
         logging.info(f"Extracted company text: {extracted_company_text}")
-        company_information: dict[str, str] = extract_company_information(extracted_company_text)
+        extract = partial(
+            complete_company_information,
+            extract_structured_company_information(subpage_content, base_domain),
+            extract=extract_company_information
+        )
+        if known_companies is None:
+            company_information: dict[str, str] = extract(extracted_company_text)
+        else:
+            company_information: dict[str, str] = known_companies.extract(extracted_company_text, extract)
         logging.info(f"Company information: {company_information}")
 
         structured_data.append(company_information)
@@ -88,7 +193,37 @@ def extract_from_company_subpage(portfolio_companies_tag: Tag, base_domain: str)
     return structured_data
 
 
-def scrape_portfolio_companies_information():
+def find_portfolio_companies_section(domain: str, page_html: str) -> "tuple[Tag, str | None]":
+    """
+    Find the portfolio companies section of a portfolio page and prompt GPT for the scraping step
+    that will give us the desired information.
+
+    :param domain: URL of the portfolio page
+    :param page_html: HTML content of the portfolio page
+    :return: Tag containing the portfolio companies, name of the scraping step (None if GPT decided on none)
+    """
+    logging.info(f"Extracting information from: {domain}")
+    soup: BeautifulSoup = bs4.BeautifulSoup(page_html)
+
+    # Find the portfolio companies section in the HTML
+    portfolio_companies_tag: Tag = find_tag_with_most_children(soup)
+
+    # Prompt to determine the scraping step that will give us the desired information
+    sample_tag: Tag = portfolio_companies_tag.find()
+    sample_company_text: str = extract_text_and_links(sample_tag)
+    tool_call: ChatCompletionMessageToolCall = prompt_gpt_for_next_scraping_step(
+        extracted_company_text=sample_company_text,
+    )
+    logging.info(f"Function to call: {tool_call}")
+
+    return portfolio_companies_tag, tool_call.function.name if tool_call else None
+
+
+def scrape_portfolio_companies_information(
+        selection: WorkSelection = WorkSelection(),
+        concurrency: int = 5,
+        known_companies: CompanyIndex | None = None
+) -> list[dict[str, any]]:
     """
     Extracts structured information about the VC portfolio companies from the VC portfolio pages.
 
@@ -99,54 +234,173 @@ def scrape_portfolio_companies_information():
     4. Prompt to determine the scraping step that will give us the desired information.
     5. Extract the structured information about the portfolio companies.
     6. Store the information in the database.
+    7. Schedule the next scrape of the VCs.
+
+    :param selection: Shard and batch of the VCs to scrape
+    :param concurrency: Number of portfolio pages scraped at the same time
+    :param known_companies: Index of the companies known in the run, to extract and write every company once
+    :return: Records of the VCs that were scraped
     """
     # 1. Fetch the portfolio pages from the database
-    db_records: list[dict[str, any]] = fetch_portfolio_pages()
+    db_records: list[dict[str, any]] = fetch_portfolio_pages(selection)
+    if not db_records:
+        return []
+
     vc_portfolio_urls: list[str] = [record['portfolio_page_url'] for record in db_records]
     vc_ids: list[int] = [record['id'] for record in db_records]
 
     # 2. Scrape the content of the portfolio pages
-    page_htmls: list[str] = asyncio.run(scrape_webpages_content_async(vc_portfolio_urls))
+    page_htmls: list[str] = asyncio.run(scrape_webpages_content_async(vc_portfolio_urls, batch_size=concurrency))
 
+    scrape_outcomes: list[dict[str, any]] = []
     for id, domain, page_html in zip(vc_ids, vc_portfolio_urls, page_htmls):
-        if get_domain_name(domain) != 'atomico.com':
-            continue
+        # A failed VC is recorded as failed, so it is not selected again before its next scheduled scrape
+        try:
+            # 3. & 4. Find the portfolio companies section and determine the scraping step
+            portfolio_companies_tag, function_name = find_portfolio_companies_section(domain, page_html)
 
-        logging.info(f"Extracting information from: {domain}")
-        soup: BeautifulSoup = BeautifulSoup(page_html)
+            # Check if the model decided to skip the page, or did not decide to use a function
+            if function_name in SKIPPING_STEPS:
+                logging.info(f"Skipping {domain}, no portfolio companies to extract")
+                scrape_outcomes.append({"id": id, "failed": True})
+                continue
 
-        # 3. Find the portfolio companies section in the HTML
-        portfolio_companies_tag: Tag = find_tag_with_most_children(soup)
+            # 5. Extract the structured information about the portfolio companies
+            if function_name == "extract_company_information":
+                companies_data: list[dict[str, any]] = extract_companies_information(
+                    portfolio_companies_tag=portfolio_companies_tag,
+                    known_companies=known_companies
+                )
+            elif function_name == "navigate_to_company_subpage":
+                companies_data: list[dict[str, any]] = extract_from_company_subpage(
+                    portfolio_companies_tag=portfolio_companies_tag,
+                    base_domain=get_domain_name(domain),
+                    known_companies=known_companies,
+                    page_url=domain
+                )
+            else:
+                logging.error(f"Function {function_name} not implemented.")
+                scrape_outcomes.append({"id": id, "failed": True})
+                continue
 
-        # 4. Prompt to determine the scraping step that will give us the desired information
-        sample_tag: Tag = portfolio_companies_tag.find()
-        sample_company_text: str = extract_text_and_links(sample_tag)
-        tool_call: ChatCompletionMessageToolCall = prompt_gpt_for_next_scraping_step(
-            extracted_company_text=sample_company_text,
-        )
-        logging.info(f"Function to call: {tool_call}")
+            # 6. Store the information in the database
+            store_portfolio_information_in_db(companies_data, vc_id=id, known_companies=known_companies)
+            scrape_outcomes.append({"id": id, "content_hash": content_hash(companies_data), "failed": False})
+        except Exception as error:
+            logging.error(f"Failed to scrape the portfolio companies of {domain}: {error}")
+            ERRORS.inc(stage="portfolio", domain=get_domain_name(domain))
+            scrape_outcomes.append({"id": id, "failed": True})
 
-        # Check if the model did not decided to use a function
-        if tool_call is None:
-            continue
+    # 7. Schedule the next scrape of the VCs
+    record_scrape_outcomes("vc", scrape_outcomes)
 
-        # 5. Extract the structured information about the portfolio companies
-        function_name: str = tool_call.function.name
-        if function_name == "extract_company_information":
-            companies_data: list[dict[str, any]] = extract_companies_information(
-                portfolio_companies_tag=portfolio_companies_tag
-            )
-        elif function_name == "navigate_to_company_subpage":
-            companies_data: list[dict[str, any]] = extract_from_company_subpage(
-                portfolio_companies_tag=portfolio_companies_tag,
-                base_domain=get_domain_name(domain)
-            )
-        else:
-            logging.error(f"Function {function_name} not implemented.")
-            continue
+    return db_records
+
+
+def scrape_portfolio_companies_information_in_batch(
+        job_name: str,
+        selection: WorkSelection = WorkSelection(),
+        concurrency: int = 5,
+        poll_interval: float = 60,
+        known_companies: CompanyIndex | None = None
+) -> list[dict[str, any]]:
+    """
+    Extracts structured information about the VC portfolio companies with the OpenAI batch API.
+    Used for the nightly full-portfolio refresh, where latency does not matter but cost and rate limits do.
+    The batch job is resumable: when a job with the same name already exists, the scraping is skipped
+    and the job continues from its last finished step. The job is named after the selected VCs as well,
+    so that the job is only resumed by a batch of the same VCs.
+
+    Procedure:
+    1. Fetch and scrape the portfolio pages, and extract the text of each company. Companies of which
+       the structured data of the subpage is complete do not need the LLM.
+    2. Write the extraction requests of the other companies to the request file of the batch job.
+    3. Submit the batch job and wait for the results.
+    4. Store the information in the database.
+    5. Schedule the next scrape of the VCs, the VCs without companies or results failed.
+
+    :param job_name: Unique name of the batch job (e.g. the date of the nightly refresh), suffixed with
+        a hash of the ids of the selected VCs
+    :param selection: Shard and batch of the VCs to scrape
+    :param concurrency: Number of portfolio pages scraped at the same time
+    :param poll_interval: Seconds to wait between two status requests of the batch
+    :param known_companies: Index of the companies known in the run, to write every company once
+    :return: Records of the VCs that were scraped
+    """
+    db_records: list[dict[str, any]] = fetch_portfolio_pages(selection)
+    if not db_records:
+        return []
+
+    # A different selection under the same name (e.g. after the VCs were re-scheduled) gets its own job
+    job_name = f"{job_name}-vcs-{content_hash(sorted(record['id'] for record in db_records))[:12]}"
+    if not batch_job_exists(job_name):
+        # 1. Fetch and scrape the portfolio pages, and extract the text of each company
+        vc_portfolio_urls: list[str] = [record['portfolio_page_url'] for record in db_records]
+        page_htmls: list[str] = asyncio.run(scrape_webpages_content_async(vc_portfolio_urls, batch_size=concurrency))
+
+        company_texts: list[dict[str, any]] = []
+        for record, page_html in zip(db_records, page_htmls):
+            domain: str = record['portfolio_page_url']
+            # A failed VC only misses its requests, the batch job is created for the other VCs
+            try:
+                portfolio_companies_tag, function_name = find_portfolio_companies_section(domain, page_html)
+
+                if function_name == "extract_company_information":
+                    companies: list[dict[str, any]] = [
+                        {"extracted_company_text": company_text}
+                        for company_text in extract_companies_text(portfolio_companies_tag)
+                    ]
+                elif function_name == "navigate_to_company_subpage":
+                    # Only the companies of which the structured data is incomplete get a request
+                    companies: list[dict[str, any]] = extract_subpages_companies(
+                        portfolio_companies_tag, get_domain_name(domain), page_url=domain
+                    )
+                elif function_name in SKIPPING_STEPS:
+                    logging.info(f"Skipping {domain}, no portfolio companies to extract")
+                    continue
+                else:
+                    logging.error(f"Function {function_name} not implemented.")
+                    continue
+            except Exception as error:
+                logging.error(f"Failed to scrape the portfolio companies of {domain}: {error}")
+                ERRORS.inc(stage="portfolio", domain=get_domain_name(domain))
+                continue
+
+            company_texts.extend({"vc_id": record['id'], **company} for company in companies)
+
+        # The VCs without companies failed, they are not part of the batch job
+        job_vc_ids: set[int] = {company_text['vc_id'] for company_text in company_texts}
+        record_scrape_outcomes("vc", [
+            {"id": record['id'], "failed": True} for record in db_records if record['id'] not in job_vc_ids
+        ])
+        if not company_texts:
+            logging.info(f"No companies to extract for batch job {job_name}, not creating the job")
+            return db_records
+
+        # 2. Write the extraction requests of the incomplete companies to the request file of the batch job
+        create_batch_job(job_name, company_texts)
+
+    # 3. Submit the batch job and wait for the results
+    companies_data_per_vc: dict[int, list[dict[str, any]]] = run_batch_job(job_name, poll_interval=poll_interval)
+
+    # 4. Store the information in the database, a VC of which the companies could not be stored failed
+    stored_companies_per_vc: dict[int, list[dict[str, any]]] = {}
+    for vc_id, companies_data in companies_data_per_vc.items():
+        try:
+            store_portfolio_information_in_db(companies_data, vc_id=vc_id, known_companies=known_companies)
+            stored_companies_per_vc[vc_id] = companies_data
+        except Exception as error:
+            logging.error(f"Failed to store the portfolio companies of VC {vc_id}: {error}")
+            ERRORS.inc(stage="store", domain=None)
+
+    # 5. Schedule the next scrape of the VCs of the batch job, which are the VCs it was created for when resumed
+    record_scrape_outcomes("vc", [
+        {"id": vc_id, "content_hash": content_hash(stored_companies_per_vc[vc_id]), "failed": False}
+        if vc_id in stored_companies_per_vc else {"id": vc_id, "failed": True}
+        for vc_id in batch_job_vc_ids(job_name)
+    ])
 
-        # 6. Store the information in the database
-        store_portfolio_information_in_db(companies_data, vc_id=id)
+    return db_records
 
 
 if __name__ == "__main__":
@@ -0,0 +1,442 @@
+# Standard
+import os
+import asyncio
+import logging
+from functools import partial
+from typing import TYPE_CHECKING, Callable
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# DB interactions
+from scraping_pipelines.scrape_vc_portfolio_page.db_interactions import (
+    fetch_portfolio_pages,
+    store_portfolio_information_in_db
+)
+
+# Scraper
+from utils.lazy_import import lazy_import
+bs4 = lazy_import("bs4")
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup, Tag
+    from playwright.async_api import Browser
+from scraper.playwrite_async import launch_browser_async, scrape_webpage_content_async
+from scraping_pipelines.scrape_vc_portfolio_page.html_processing import (
+    find_tag_with_most_children,
+    extract_text_and_links,
+    extract_first_endpoint
+)
+from scraping_pipelines.scrape_vc_portfolio_page.structured_extraction import (
+    extract_structured_company_information,
+    complete_company_information
+)
+
+# OpenAI SDK
+from scraping_pipelines.scrape_vc_portfolio_page.gpt_scraper_assistant import (
+    prompt_gpt_for_next_scraping_step,
+    extract_company_information
+)
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionMessageToolCall
+
+# Url parsing
+from utils.url_parsing import get_domain_name
+
+# Work selection
+from scraping_pipelines.work_selection import WorkSelection
+from scraping_pipelines.company_index import CompanyIndex
+from scraping_pipelines.scrape_scheduling import content_hash, record_scrape_outcomes
+
+# Metrics
+from utils.metrics import ERRORS
+
+
+@dataclass(frozen=True)
+class StageConcurrency:
+    """
+    Concurrency and backpressure settings of the stages of the streaming pipeline.
+
+    :param fetchers: Number of pages fetched at the same time by the browser.
+    :param parsers: Number of processes parsing HTML.
+    :param llm_workers: Number of LLM requests in flight at the same time.
+    :param queue_size: Maximum number of jobs waiting between two stages. A full queue blocks the stage
+        before it, which bounds the number of HTML documents held in memory.
+    """
+    fetchers: int = 5
+    parsers: int = os.cpu_count() or 1
+    llm_workers: int = 8
+    queue_size: int = 16
+
+
+@dataclass
+class PageJob:
+    """
+    A page to fetch and parse: the portfolio page of a VC or the subpage of one of its portfolio companies.
+
+    :param vc_id: ID of the VC in the database.
+    :param url: URL of the page.
+    :param company_index: Position of the company on the portfolio page, None for the portfolio page itself.
+    :param html: HTML content of the page, once fetched.
+    """
+    vc_id: int
+    url: str
+    company_index: int | None = None
+    html: str | None = None
+
+
+@dataclass
+class ExtractionJob:
+    """
+    Work for the LLM stage: either deciding the scraping step of a portfolio page or extracting a single company.
+
+    :param vc_id: ID of the VC in the database.
+    :param base_domain: Domain of the VC website.
+    :param company_index: Position of the company on the portfolio page, None to decide the scraping step.
+    :param company_text: Text of the company tag or subpage to extract the information from.
+    :param portfolio_page: Parsed portfolio page, used to decide the scraping step.
+    :param structured_information: Company information found in the structured data of a company subpage.
+    """
+    vc_id: int
+    base_domain: str
+    company_index: int | None = None
+    company_text: str | None = None
+    portfolio_page: dict[str, any] | None = None
+    structured_information: dict[str, any] | None = None
+
+
+@dataclass
+class VcProgress:
+    """
+    Collects the extracted companies of a VC until all companies are extracted and the VC can be written.
+
+    :param expected_companies: Number of companies to extract, None until the scraping step is decided.
+    :param companies_data: Extracted company information per position on the portfolio page.
+    """
+    expected_companies: int | None = None
+    companies_data: dict[int, dict[str, any] | None] = field(default_factory=dict)
+
+    @property
+    def is_complete(self) -> bool:
+        """Whether every company of the VC was extracted (or failed)."""
+        return self.expected_companies is not None and len(self.companies_data) >= self.expected_companies
+
+
+def parse_portfolio_page(page_html: str, base_domain: str, page_url: str | None = None) -> dict[str, any]:
+    """
+    Find the portfolio companies section of a portfolio page and extract the text and subpage link of every company.
+    Runs in a worker process, so the input and output only contain picklable values.
+
+    :param page_html: HTML content of the portfolio page
+    :param base_domain: Domain of the VC website
+    :param page_url: URL of the portfolio page, to resolve relative subpage links against
+    :return: Text of a sample company tag, text of each company tag, subpage link of each company tag with a link
+    """
+    soup: BeautifulSoup = bs4.BeautifulSoup(page_html, 'html.parser')
+    portfolio_companies_tag: Tag = find_tag_with_most_children(soup)
+    company_tags: list[Tag] = [tag for tag in portfolio_companies_tag.children if isinstance(tag, bs4.Tag)]
+
+    # Company tags without a link to a subpage have no subpage to fetch
+    subpage_endpoints: list[str | None] = [extract_first_endpoint(tag, base_domain, page_url) for tag in company_tags]
+
+    sample_tag: Tag | None = portfolio_companies_tag.find()
+    return {
+        "sample_company_text": extract_text_and_links(sample_tag) if sample_tag else "",
+        "companies_text": [extract_text_and_links(tag) for tag in company_tags],
+        "subpage_links": [f"https://{base_domain}{endpoint}" for endpoint in subpage_endpoints if endpoint],
+    }
+
+
+def parse_company_subpage(page_html: str, base_domain: str) -> dict[str, any]:
+    """
+    Extract the text and links and the structured data of a company subpage. Runs in a worker process.
+
+    :param page_html: HTML content of the company subpage
+    :param base_domain: Domain of the VC website
+    :return: Text and links of the subpage, company information found in its structured data
+    """
+    return {
+        "company_text": extract_text_and_links(bs4.BeautifulSoup(page_html, 'html.parser')),
+        "structured_information": extract_structured_company_information(page_html, base_domain),
+    }
+
+
+class StreamingPortfolioPipeline:
+    """
+    Scrapes the portfolio companies of the VCs as overlapping stages connected by bounded queues:
+
+        fetch (browser pages) -> parse (process pool) -> LLM extraction (thread pool) -> DB writer
+
+    Every stage runs its own number of workers, so the browser keeps fetching while earlier pages wait for the LLM,
+    and a full queue pauses the stage before it. When GPT decides to navigate to the company subpages, the subpages
+    are fed back to the fetch stage. Fetching subpages takes priority over new portfolio pages, so VCs that are in
+    progress are finished first and the number of VCs held in memory stays small.
+    """
+    def __init__(
+            self,
+            concurrency: StageConcurrency = StageConcurrency(),
+            known_companies: CompanyIndex | None = None
+    ):
+        """
+        :param concurrency: Concurrency and backpressure settings of the stages
+        :param known_companies: Index of the companies known in the run, to extract and write every company once
+        """
+        self.concurrency = concurrency
+        self.known_companies: CompanyIndex | None = known_companies
+
+        self.portfolio_page_queue: asyncio.Queue[PageJob] = asyncio.Queue(maxsize=concurrency.queue_size)
+        # Subpages and companies are produced by the LLM stage, unbounded queues prevent a cycle of full queues
+        self.subpage_queue: asyncio.Queue[PageJob] = asyncio.Queue()
+        self.company_queue: asyncio.Queue[ExtractionJob] = asyncio.Queue()
+        self.parse_queue: asyncio.Queue[PageJob] = asyncio.Queue(maxsize=concurrency.queue_size)
+        self.extraction_queue: asyncio.Queue[ExtractionJob] = asyncio.Queue(maxsize=concurrency.queue_size)
+        self.db_queue: asyncio.Queue[tuple[int, list[dict[str, any]]]] = asyncio.Queue(maxsize=concurrency.queue_size)
+
+        self.vc_progress: dict[int, VcProgress] = {}
+        self.base_domains: dict[int, str] = {}
+        self.all_vcs_done = asyncio.Event()
+        self.source_exhausted: bool = False
+        self.scrape_outcomes: list[dict[str, any]] = []
+
+    @staticmethod
+    async def _get_prioritized(priority_queue: asyncio.Queue, queue: asyncio.Queue) -> any:
+        """
+        Get the next job, preferring the priority queue. Jobs of VCs in progress are put on the priority queues,
+        so they are finished before new VCs are started.
+        """
+        while True:
+            if not priority_queue.empty():
+                return priority_queue.get_nowait()
+
+            try:
+                return await asyncio.wait_for(queue.get(), timeout=0.1)
+            except asyncio.TimeoutError:
+                continue
+
+    def _finish_vc(self, vc_id: int, scraped_content_hash: str | None = None):
+        """
+        Stop tracking a VC, signalling the end of the pipeline when it was the last one.
+
+        :param vc_id: ID of the VC in the database
+        :param scraped_content_hash: Hash of the stored companies, None when scraping the VC failed
+        """
+        self.scrape_outcomes.append({
+            "id": vc_id, "content_hash": scraped_content_hash, "failed": scraped_content_hash is None
+        })
+        self.vc_progress.pop(vc_id, None)
+        if self.source_exhausted and not self.vc_progress:
+            self.all_vcs_done.set()
+
+    async def _record_company(self, vc_id: int, company_index: int, company_information: dict[str, any] | None):
+        """Record an extracted company, and pass the VC to the DB writer once all of its companies are extracted."""
+        progress: VcProgress = self.vc_progress[vc_id]
+        progress.companies_data[company_index] = company_information
+
+        if progress.is_complete:
+            companies_data: list[dict[str, any]] = [
+                progress.companies_data[index] for index in sorted(progress.companies_data)
+                if progress.companies_data[index] is not None
+            ]
+            await self.db_queue.put((vc_id, companies_data))
+
+    async def _produce_portfolio_pages(self, db_records: list[dict[str, any]]):
+        """Feed the portfolio pages of the VCs into the fetch stage."""
+        for record in db_records:
+            self.vc_progress[record['id']] = VcProgress()
+            self.base_domains[record['id']] = get_domain_name(record['portfolio_page_url'])
+            await self.portfolio_page_queue.put(PageJob(vc_id=record['id'], url=record['portfolio_page_url']))
+
+        self.source_exhausted = True
+        if not self.vc_progress:
+            self.all_vcs_done.set()
+
+    async def _fetch_worker(self, browser: "Browser"):
+        """Fetch pages with the shared browser, company subpages first."""
+        while True:
+            page_job: PageJob = await self._get_prioritized(self.subpage_queue, self.portfolio_page_queue)
+
+            try:
+                page_job.html = await scrape_webpage_content_async(page_job.url, browser)
+            except Exception as error:
+                logging.error(f"Failed to fetch {page_job.url}: {error}")
+                await self._handle_failed_page(page_job)
+                continue
+
+            await self.parse_queue.put(page_job)
+
+    async def _handle_failed_page(self, page_job: PageJob):
+        """A failed portfolio page ends the VC, a failed subpage only skips the company."""
+        if page_job.company_index is None:
+            self._finish_vc(page_job.vc_id)
+        else:
+            await self._record_company(page_job.vc_id, page_job.company_index, None)
+
+    async def _parse_worker(self, process_pool: ProcessPoolExecutor):
+        """Parse fetched pages in the process pool and pass the extracted text to the LLM stage."""
+        loop = asyncio.get_running_loop()
+        while True:
+            page_job: PageJob = await self.parse_queue.get()
+            base_domain: str = self.base_domains[page_job.vc_id]
+
+            try:
+                if page_job.company_index is None:
+                    portfolio_page: dict[str, any] = await loop.run_in_executor(
+                        process_pool, parse_portfolio_page, page_job.html, base_domain, page_job.url
+                    )
+                    extraction_job = ExtractionJob(
+                        vc_id=page_job.vc_id, base_domain=base_domain, portfolio_page=portfolio_page
+                    )
+                else:
+                    company_subpage: dict[str, any] = await loop.run_in_executor(
+                        process_pool, parse_company_subpage, page_job.html, base_domain
+                    )
+                    extraction_job = ExtractionJob(
+                        vc_id=page_job.vc_id, base_domain=base_domain, company_index=page_job.company_index,
+                        company_text=company_subpage["company_text"],
+                        structured_information=company_subpage["structured_information"]
+                    )
+            except Exception as error:
+                logging.error(f"Failed to parse {page_job.url}: {error}")
+                ERRORS.inc(stage="parse", domain=base_domain)
+                await self._handle_failed_page(page_job)
+                continue
+
+            await self.extraction_queue.put(extraction_job)
+
+    async def _decide_scraping_step(self, extraction_job: ExtractionJob, thread_pool: ThreadPoolExecutor):
+        """Prompt GPT for the scraping step of a portfolio page and schedule the extraction of its companies."""
+        loop = asyncio.get_running_loop()
+        portfolio_page: dict[str, any] = extraction_job.portfolio_page
+        progress: VcProgress = self.vc_progress[extraction_job.vc_id]
+
+        tool_call: ChatCompletionMessageToolCall | None = await loop.run_in_executor(
+            thread_pool, prompt_gpt_for_next_scraping_step, portfolio_page["sample_company_text"]
+        )
+        function_name: str | None = tool_call.function.name if tool_call else None
+        logging.info(f"Function to call for VC {extraction_job.vc_id}: {function_name}")
+
+        if function_name == "extract_company_information" and portfolio_page["companies_text"]:
+            progress.expected_companies = len(portfolio_page["companies_text"])
+            for company_index, company_text in enumerate(portfolio_page["companies_text"]):
+                self.company_queue.put_nowait(ExtractionJob(
+                    vc_id=extraction_job.vc_id, base_domain=extraction_job.base_domain,
+                    company_index=company_index, company_text=company_text
+                ))
+        elif function_name == "navigate_to_company_subpage" and portfolio_page["subpage_links"]:
+            progress.expected_companies = len(portfolio_page["subpage_links"])
+            for company_index, subpage_link in enumerate(portfolio_page["subpage_links"]):
+                self.subpage_queue.put_nowait(PageJob(
+                    vc_id=extraction_job.vc_id, url=subpage_link, company_index=company_index
+                ))
+        else:
+            self._finish_vc(extraction_job.vc_id)
+
+    def _extract_company(
+            self,
+            company_text: str,
+            structured_information: dict[str, any] | None = None
+    ) -> dict[str, any]:
+        """
+        Extract the company information with the LLM, unless the company index knows the company
+        or the structured data of the company subpage is complete.
+        """
+        extract: Callable[[str], dict[str, any]] = extract_company_information
+        if structured_information is not None:
+            extract = partial(complete_company_information, structured_information, extract=extract_company_information)
+
+        if self.known_companies is None:
+            return extract(company_text)
+
+        return self.known_companies.extract(company_text, extract)
+
+    async def _extraction_worker(self, thread_pool: ThreadPoolExecutor):
+        """Execute the LLM requests in the thread pool, companies of VCs in progress first."""
+        loop = asyncio.get_running_loop()
+        while True:
+            extraction_job: ExtractionJob = await self._get_prioritized(self.company_queue, self.extraction_queue)
+
+            try:
+                if extraction_job.company_index is None:
+                    await self._decide_scraping_step(extraction_job, thread_pool)
+                    continue
+
+                company_information: dict[str, any] | None = await loop.run_in_executor(
+                    thread_pool,
+                    self._extract_company,
+                    extraction_job.company_text,
+                    extraction_job.structured_information
+                )
+            except Exception as error:
+                logging.error(f"LLM request for VC {extraction_job.vc_id} failed: {error}")
+                ERRORS.inc(stage="llm", domain=extraction_job.base_domain)
+                if extraction_job.company_index is None:
+                    self._finish_vc(extraction_job.vc_id)
+                    continue
+                company_information = None
+
+            await self._record_company(extraction_job.vc_id, extraction_job.company_index, company_information)
+
+    async def _db_writer(self):
+        """Store the companies of each completed VC, one VC at a time."""
+        while True:
+            vc_id, companies_data = await self.db_queue.get()
+            scraped_content_hash: str | None = None
+            try:
+                await asyncio.to_thread(store_portfolio_information_in_db, companies_data, vc_id, self.known_companies)
+                logging.info(f"Stored {len(companies_data)} companies of VC {vc_id}")
+                scraped_content_hash = content_hash(companies_data)
+            except Exception as error:
+                logging.error(f"Failed to store the companies of VC {vc_id}: {error}")
+                ERRORS.inc(stage="store", domain=self.base_domains.get(vc_id))
+            finally:
+                self._finish_vc(vc_id, scraped_content_hash)
+
+    async def run(self, db_records: list[dict[str, any]]):
+        """
+        Run all stages until every VC is stored or skipped, and schedule the next scrape of the VCs.
+
+        :param db_records: Records with the id and portfolio_page_url of the VCs to scrape
+        """
+        with ProcessPoolExecutor(max_workers=self.concurrency.parsers) as process_pool, \
+                ThreadPoolExecutor(max_workers=self.concurrency.llm_workers) as thread_pool:
+            async with launch_browser_async() as browser:
+                workers: list[asyncio.Task] = [
+                    *(asyncio.create_task(self._fetch_worker(browser)) for _ in range(self.concurrency.fetchers)),
+                    *(asyncio.create_task(self._parse_worker(process_pool)) for _ in range(self.concurrency.parsers)),
+                    *(asyncio.create_task(self._extraction_worker(thread_pool))
+                      for _ in range(self.concurrency.llm_workers)),
+                    asyncio.create_task(self._db_writer()),
+                ]
+
+                await self._produce_portfolio_pages(db_records)
+                await self.all_vcs_done.wait()
+
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+        await asyncio.to_thread(record_scrape_outcomes, "vc", self.scrape_outcomes)
+
+
+def scrape_portfolio_companies_information_streaming(
+        selection: WorkSelection = WorkSelection(),
+        concurrency: StageConcurrency = StageConcurrency(),
+        known_companies: CompanyIndex | None = None
+) -> list[dict[str, any]]:
+    """
+    Extracts structured information about the VC portfolio companies with the streaming pipeline,
+    which keeps the browser, the parsers, the LLM and the database busy at the same time.
+
+    :param selection: Shard and batch of the VCs to scrape
+    :param concurrency: Concurrency and backpressure settings of the stages
+    :param known_companies: Index of the companies known in the run, to extract and write every company once
+    :return: Records of the VCs that were scraped
+    """
+    db_records: list[dict[str, any]] = fetch_portfolio_pages(selection)
+    if db_records:
+        asyncio.run(StreamingPortfolioPipeline(concurrency, known_companies).run(db_records))
+
+    return db_records
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    scrape_portfolio_companies_information_streaming()
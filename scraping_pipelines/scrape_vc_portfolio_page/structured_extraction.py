@@ -0,0 +1,340 @@
+# Standard
+import re
+import logging
+from html.parser import HTMLParser
+from typing import Callable
+
+# Structured data
+from utils.json_ld import load_json_ld, as_list, json_ld_nodes, json_ld_location
+from utils.html_processing import html_to_text
+from utils.url_parsing import get_registrable_domain
+
+# Metrics
+from utils.metrics import STRUCTURED_DATA
+
+
+# Fields of the LLM extraction prompt, the format of the extracted company information
+COMPANY_INFORMATION_FIELDS: tuple[str, ...] = (
+    "name", "website", "linkedin_url", "description", "location", "founded_year", "invested_year", "industry",
+    "round_type",
+)
+# Fields that make the structured data of a page a complete company, without asking the LLM for the rest
+FAST_PATH_FIELDS: tuple[str, ...] = ("name", "website", "description")
+# Schema.org types of the organizations whose structured data describes a company
+ORGANIZATION_TYPES: frozenset[str] = frozenset({
+    "Organization", "Corporation", "LocalBusiness", "OnlineBusiness", "NGO", "ResearchOrganization",
+    "MedicalOrganization",
+})
+# Elements without a closing tag, their item properties are in their attributes
+VOID_ELEMENTS: frozenset[str] = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr",
+})
+_YEAR_PATTERN: re.Pattern = re.compile(r"\d{4}")
+
+# Investment fields, which structured data does not describe, with the pattern of a labelled value in the page text,
+# e.g. Invested 2021 or Stage: Series A, and the pattern of any mention of the field
+INVESTMENT_PATTERNS: dict[str, tuple[re.Pattern, re.Pattern]] = {
+    "invested_year": (
+        re.compile(r"\binvest(?:ed|ment)(?:\s+(?:in|year|date))?\s*[:-]?\s*((?:19|20)\d{2})\b", re.IGNORECASE),
+        re.compile(r"\binvest(?:ed|ment)\b", re.IGNORECASE),
+    ),
+    "round_type": (
+        re.compile(
+            r"\b(?:stage|round)\s*[:-]?\s*(pre[\s-]?seed|seed|series[\s-]?[a-f]|growth)\b", re.IGNORECASE
+        ),
+        re.compile(r"\b(?:stage|round|seed|series[\s-]?[a-f])\b", re.IGNORECASE),
+    ),
+}
+
+
+class _StructuredDataParser(HTMLParser):
+    """
+    Collects in a single pass over a page: the JSON-LD blocks, the content of the meta tags (OpenGraph and
+    description) and the schema.org microdata items. The microdata items are collected as dicts in the shape
+    of JSON-LD nodes, so both are read the same way.
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.json_ld_blocks: list[str] = []
+        self.meta: dict[str, str] = {}
+        self.microdata_items: list[dict[str, any]] = []
+
+        self._in_json_ld: bool = False
+        self._json_ld_parts: list[str] = []
+        # Open elements of an item or a text property: [tag, nested open tags of the same name, item or text parts,
+        # name of the property the element is the value of]
+        self._open_elements: list[list[any]] = []
+
+    def _current_item(self) -> dict[str, any] | None:
+        for element in reversed(self._open_elements):
+            if isinstance(element[2], dict):
+                return element[2]
+
+        return None
+
+    def _set_property(self, name: str, value: any):
+        item: dict[str, any] | None = self._current_item()
+        if item is None or value in (None, ""):
+            return
+
+        # A property given more than once holds a list of values, as in JSON-LD
+        if name in item:
+            item[name] = [*as_list(item[name]), value]
+        else:
+            item[name] = value
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        attributes: dict[str, str | None] = dict(attrs)
+        if tag == "script" and (attributes.get("type") or "").lower() == "application/ld+json":
+            self._in_json_ld = True
+            self._json_ld_parts = []
+            return
+
+        if tag == "meta" and attributes.get("content") and "itemprop" not in attributes:
+            key: str = (attributes.get("property") or attributes.get("name") or "").lower()
+            if key:
+                self.meta.setdefault(key, attributes["content"])
+
+        if tag not in VOID_ELEMENTS:
+            for element in self._open_elements:
+                if element[0] == tag:
+                    element[1] += 1
+
+        # Attributes can list more property names and item types, the first one is used
+        item_property: str | None = next(iter((attributes.get("itemprop") or "").split()), None)
+        if "itemscope" in attributes and tag not in VOID_ELEMENTS:
+            item_type: str = next(iter((attributes.get("itemtype") or "").split()), "")
+            self._open_elements.append([tag, 0, {"@type": item_type.rstrip("/").rsplit("/", 1)[-1]}, item_property])
+        elif item_property and self._current_item() is not None:
+            value: str | None = (
+                attributes.get("content") or attributes.get("href") or attributes.get("src")
+                or attributes.get("datetime")
+            )
+            if value is not None or tag in VOID_ELEMENTS:
+                self._set_property(item_property, value)
+            else:
+                self._open_elements.append([tag, 0, [], item_property])
+
+    def handle_endtag(self, tag: str):
+        if tag == "script" and self._in_json_ld:
+            self.json_ld_blocks.append("".join(self._json_ld_parts))
+            self._in_json_ld = False
+            return
+
+        same_tag_elements: list[list[any]] = [element for element in self._open_elements if element[0] == tag]
+        if not same_tag_elements:
+            return
+
+        for element in same_tag_elements:
+            element[1] -= 1
+        if same_tag_elements[-1][1] >= 0:
+            return
+
+        # The closing tag belongs to the innermost open element of the tag, close it and the elements left open in it
+        closed_element: list[any] = same_tag_elements[-1]
+        while self._open_elements:
+            element: list[any] = self._open_elements.pop()
+            self._close_element(element)
+            if element is closed_element:
+                break
+
+    def _close_element(self, element: list[any]):
+        _, _, value, item_property = element
+        if isinstance(value, list):
+            value = " ".join("".join(value).split())
+
+        if item_property and self._current_item() is not None:
+            self._set_property(item_property, value)
+        elif isinstance(value, dict):
+            self.microdata_items.append(value)
+
+    def handle_data(self, data: str):
+        if self._in_json_ld:
+            self._json_ld_parts.append(data)
+        elif self._open_elements and isinstance(self._open_elements[-1][2], list):
+            self._open_elements[-1][2].append(data)
+
+    def close(self):
+        super().close()
+        while self._open_elements:
+            self._close_element(self._open_elements.pop())
+
+
+def _first_text(value: any) -> str | None:
+    """First text of a property, properties hold text, a list of texts or nodes with an @id or name."""
+    for single_value in as_list(value):
+        if isinstance(single_value, dict):
+            single_value = single_value.get("@id") or single_value.get("url") or single_value.get("name")
+        if isinstance(single_value, str) and single_value.strip():
+            return single_value.strip()
+
+    return None
+
+
+def _organization_information(node: dict[str, any]) -> dict[str, any]:
+    """Company information of an Organization node, in the format of the LLM extraction."""
+    same_as: list[str] = [url for url in as_list(node.get("sameAs")) if isinstance(url, str)]
+    founding_year: re.Match | None = _YEAR_PATTERN.match(_first_text(node.get("foundingDate")) or "")
+    return {
+        "name": _first_text(node.get("name")) or _first_text(node.get("legalName")),
+        "website": _first_text(node.get("url")),
+        "linkedin_url": next((url for url in same_as if "linkedin.com/" in url), None),
+        "description": html_to_text(_first_text(node.get("description"))),
+        "location": json_ld_location(node.get("address") or node.get("location")),
+        "founded_year": founding_year.group(0) if founding_year else None,
+    }
+
+
+def extract_structured_company_information(page_html: str, base_domain: str | None = None) -> dict[str, any]:
+    """
+    Read the company information from the structured data a page embeds for search engines and link previews:
+    Organization JSON-LD, Organization microdata and OpenGraph tags, in that order of precedence.
+    Organizations on the website of the VC, or without a website, describe the VC instead of the company.
+
+    :param page_html: HTML content of a company subpage or company website
+    :param base_domain: Domain of the VC website
+    :return: Company information in the format of the LLM extraction, only with the fields that were found
+    """
+    parser = _StructuredDataParser()
+    parser.feed(page_html)
+    parser.close()
+
+    vc_domain: str | None = get_registrable_domain(base_domain)
+    organizations: list[dict[str, any]] = [
+        node for node in (*json_ld_nodes(load_json_ld(parser.json_ld_blocks)), *parser.microdata_items)
+        if ORGANIZATION_TYPES.intersection(as_list(node.get("@type")))
+    ]
+
+    company_information: dict[str, any] = {}
+    company_domain: str | None = None
+    for organization in organizations:
+        organization_information: dict[str, any] = _organization_information(organization)
+        organization_domain: str | None = get_registrable_domain(organization_information["website"])
+        if not organization_domain or organization_domain == vc_domain:
+            continue
+        # Pages can describe more organizations, e.g. the investors of the company, the first one is the company
+        if company_domain not in (None, organization_domain):
+            continue
+
+        company_domain = organization_domain
+        for field, value in organization_information.items():
+            if value and not company_information.get(field):
+                company_information[field] = value
+
+    # OpenGraph tags describe the page, they describe the company only on a website other than the VC's
+    opengraph_url: str | None = parser.meta.get("og:url")
+    opengraph_domain: str | None = get_registrable_domain(opengraph_url)
+    if opengraph_domain and opengraph_domain != vc_domain and company_domain in (None, opengraph_domain):
+        opengraph_information: dict[str, any] = {
+            "name": parser.meta.get("og:site_name"),
+            "website": opengraph_url,
+            "description": parser.meta.get("og:description") or parser.meta.get("description"),
+        }
+        for field, value in opengraph_information.items():
+            if value and not company_information.get(field):
+                company_information[field] = " ".join(value.split())
+
+    return company_information
+
+
+def _round_type(round_name: str) -> str:
+    """Round name in the format of the LLM extraction, e.g. Series A becomes series-A."""
+    words: list[str] = round_name.lower().replace("-", " ").split()
+    if words[0] == "series":
+        return f"series-{words[-1][-1].upper()}"
+
+    return "-".join(words)
+
+
+def extract_investment_information(company_text: str) -> tuple[dict[str, any], bool]:
+    """
+    Read the investment fields from the labelled values in the text of a page, e.g. Invested 2021 and Stage seed.
+
+    :param company_text: Text and links of the page
+    :return: Investment fields that were found, and whether the text mentions an investment field that was not found
+    """
+    investment_information: dict[str, any] = {}
+    unread_mention: bool = False
+    for field, (value_pattern, mention_pattern) in INVESTMENT_PATTERNS.items():
+        value_match: re.Match | None = value_pattern.search(company_text)
+        if value_match:
+            investment_information[field] = value_match.group(1)
+        else:
+            unread_mention = unread_mention or mention_pattern.search(company_text) is not None
+
+    if "round_type" in investment_information:
+        investment_information["round_type"] = _round_type(investment_information["round_type"])
+
+    return investment_information, unread_mention
+
+
+def fast_path_company_information(structured_information: dict[str, any], company_text: str) -> dict[str, any] | None:
+    """
+    Complete the company information read from the structured data of a page without the LLM. Structured data
+    does not describe the investment, which is read from the labelled values in the text. The LLM is needed when
+    the structured data misses one of the FAST_PATH_FIELDS, or the text mentions an investment field that could
+    not be read.
+
+    :param structured_information: Company information found in the structured data of the page
+    :param company_text: Text and links of the page
+    :return: Company information in the format of the LLM extraction, None when the LLM is needed
+    """
+    if not all(structured_information.get(field) for field in FAST_PATH_FIELDS):
+        STRUCTURED_DATA.inc(result="partial" if structured_information else "missing")
+        return None
+
+    investment_information, unread_mention = extract_investment_information(company_text)
+    if unread_mention:
+        STRUCTURED_DATA.inc(result="investment_unread")
+        return None
+
+    # Counted apart from the complete pages, as the investment of the company stays unknown
+    complete: bool = all(investment_information.get(field) for field in INVESTMENT_PATTERNS)
+    STRUCTURED_DATA.inc(result="complete" if complete else "complete_without_investment")
+    return {**dict.fromkeys(COMPANY_INFORMATION_FIELDS), **investment_information, **structured_information}
+
+
+def complete_company_information(
+        structured_information: dict[str, any],
+        company_text: str,
+        extract: Callable[[str], dict[str, any]]
+) -> dict[str, any]:
+    """
+    Complete the company information read from the structured data of a page, only asking the LLM when the
+    fast path can not (see fast_path_company_information). The structured data then takes precedence over
+    the values extracted by the LLM.
+
+    :param structured_information: Company information found in the structured data of the page
+    :param company_text: Text and links of the page, for the LLM extraction
+    :param extract: Extraction of the company information from the text, e.g. the LLM extraction
+    :return: Company information in the format of the LLM extraction
+    """
+    company_information: dict[str, any] | None = fast_path_company_information(structured_information, company_text)
+    if company_information is not None:
+        return company_information
+
+    return {**extract(company_text), **structured_information}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    PAGE_HTML: str = """
+    <html><head>
+    <meta property="og:url" content="https://earlybird.com/portfolio/aiven">
+    <meta property="og:site_name" content="Earlybird">
+    <script type="application/ld+json">
+    {"@context": "https://schema.org", "@graph": [
+        {"@type": "Organization", "name": "Earlybird", "url": "https://earlybird.com"},
+        {"@type": "Corporation", "name": "Aiven", "url": "https://aiven.io", "foundingDate": "2016",
+         "sameAs": ["https://twitter.com/aiven_io", "https://www.linkedin.com/company/aiven/"]}
+    ]}
+    </script></head>
+    <body><div itemscope itemtype="https://schema.org/Organization">
+        <span itemprop="name">Aiven</span><a itemprop="url" href="https://aiven.io">aiven.io</a>
+        <p itemprop="description">Aiven is a <b>data cloud</b>.</p>
+        <div itemprop="address" itemscope itemtype="https://schema.org/PostalAddress">
+            <span itemprop="addressLocality">Helsinki</span>
+        </div>
+    </div></body></html>
+    """
+    logging.info(extract_structured_company_information(PAGE_HTML, base_domain="earlybird.com"))
@@ -0,0 +1,94 @@
+# Standard
+import logging
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class WorkSelection:
+    """
+    Selects the VCs a pipeline run works on. The VCs are split into shards by hashing their id,
+    so that identical workers on different machines each cover a disjoint part of the vc table.
+    Within a shard the VCs are processed in batches ordered by id, continuing after the last processed id.
+    Prioritized selections instead only select the VCs that are due for a re-scrape, most overdue first
+    (see scrape_scheduling.record_scrape_outcomes), which spends the budget of a run on the VCs most likely
+    to have new data.
+
+    :param shard_index: Index of the shard of this worker, from 0 up to shard_count.
+    :param shard_count: Number of shards the VCs are split into.
+    :param batch_size: Maximum number of VCs fetched for a single run of a pipeline.
+    :param after_id: Only select VCs with a higher id, the last id of the previous batch. Unused when prioritized.
+    :param prioritized: Whether to select the VCs that are due for a re-scrape instead of paginating by id.
+    :param processed_ids: Ids of the VCs already processed in this drain of a prioritized shard. They are skipped,
+        as a VC stays due when its scrape outcome is not recorded, e.g. in a dry run. Unused when not prioritized.
+    :param drain_cycle: Number of times the shard was drained before by this worker, which distinguishes the batches
+        of a worker that keeps polling the shard (e.g. in the names of their batch jobs).
+    """
+    shard_index: int = 0
+    shard_count: int = 1
+    batch_size: int = 5
+    after_id: int = 0
+    prioritized: bool = False
+    processed_ids: tuple[int, ...] = ()
+    drain_cycle: int = 0
+
+    def __post_init__(self):
+        if self.shard_count < 1:
+            raise ValueError(f"The shard count must be positive, got {self.shard_count}")
+        if not 0 <= self.shard_index < self.shard_count:
+            raise ValueError(f"The shard index must be between 0 and {self.shard_count - 1}, got {self.shard_index}")
+        if self.batch_size < 1:
+            raise ValueError(f"The batch size must be positive, got {self.batch_size}")
+
+    def sql_filter(self, id_column: str = "id") -> str:
+        """
+        SQL condition selecting the VCs of the shard after the last processed id, or that are due when prioritized.
+        hashtext spreads consecutive ids evenly over the shards, the double modulo keeps negative hashes in range.
+        The condition has named parameters, see sql_parameters, so every batch runs the same prepared statement.
+
+        :param id_column: Column containing the id of the VC
+        :return: SQL condition to use in a WHERE clause
+        """
+        shard_condition: str = (
+            f"((hashtext({id_column}::text) % :shard_count) + :shard_count) % :shard_count = :shard_index"
+        )
+        if self.prioritized:
+            return (
+                f"next_scrape_at <= NOW() AND NOT {id_column} = ANY(:processed_ids::INTEGER[]) AND {shard_condition}"
+            )
+
+        return f"{id_column} > :after_id AND {shard_condition}"
+
+    def sql_page(self, id_column: str = "id") -> str:
+        """
+        SQL ordering and limit of a batch, paginating on the id instead of an offset.
+        Prioritized batches are ordered most overdue first.
+
+        :param id_column: Column containing the id of the VC
+        :return: SQL ORDER BY and LIMIT clauses, with the batch size as named parameter
+        """
+        if self.prioritized:
+            return f"ORDER BY next_scrape_at, {id_column} LIMIT :batch_size"
+
+        return f"ORDER BY {id_column} LIMIT :batch_size"
+
+    def sql_parameters(self) -> dict[str, int | list[int]]:
+        """
+        :return: Value of every named parameter of sql_filter and sql_page
+        """
+        parameters: dict[str, int | list[int]] = {
+            "shard_count": int(self.shard_count),
+            "shard_index": int(self.shard_index),
+            "batch_size": int(self.batch_size),
+        }
+        if self.prioritized:
+            parameters["processed_ids"] = [int(processed_id) for processed_id in self.processed_ids]
+        else:
+            parameters["after_id"] = int(self.after_id)
+
+        return parameters
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    selection = WorkSelection(shard_index=1, shard_count=4, after_id=120)
+    logging.info(f"WHERE {selection.sql_filter()} {selection.sql_page()}, {selection.sql_parameters()}")
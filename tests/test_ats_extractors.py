@@ -0,0 +1,85 @@
+# Standard
+from typing import Iterator
+
+# Testing
+import pytest
+
+# Extractors under test
+from scraping_pipelines.scrape_company_jobs.ats_extractors import ATS_EXTRACTORS, find_ats_board, ats_job_postings
+
+# Recorded API responses of the ATS job boards
+from benchmarks.ats_extractors import ATS_CORPUS_PATH, ATS_CORPUS_VERSION, load_ats_manifest
+from benchmarks.corpus_server import serve_corpus
+
+
+BOARDS: list[dict[str, any]] = load_ats_manifest()
+
+
+@pytest.fixture(scope="module")
+def corpus_url() -> Iterator[str]:
+    """Base URL of the local server replaying the recorded API responses."""
+    with serve_corpus(ATS_CORPUS_PATH / ATS_CORPUS_VERSION) as base_url:
+        yield base_url
+
+
+def test_every_extractor_has_a_recorded_board():
+    assert {board["provider"] for board in BOARDS} == set(ATS_EXTRACTORS)
+
+
+@pytest.mark.parametrize("board", BOARDS, ids=[board["provider"] for board in BOARDS])
+def test_board_url_is_routed_to_its_provider(board: dict[str, any]):
+    provider, _ = find_ats_board(board["board_url"])
+    assert provider == board["provider"]
+
+
+@pytest.mark.parametrize("board", BOARDS, ids=[board["provider"] for board in BOARDS])
+def test_extractor_reads_the_recorded_postings(board: dict[str, any], corpus_url: str):
+    job_postings = ats_job_postings(board["provider"], f"{corpus_url}/{board['path']}", company_id=7)
+
+    assert all(job_posting.company_id == 7 for job_posting in job_postings)
+    assert [
+        {column: value for column, value in job_posting.as_record().items() if column != "company_id"}
+        for job_posting in job_postings
+    ] == board["postings"]
+
+
+@pytest.mark.parametrize("url, expected_board", [
+    (
+        "https://boards.greenhouse.io/acme",
+        ("greenhouse", "https://boards-api.greenhouse.io/v1/boards/acme/jobs?content=true")
+    ),
+    (
+        "https://boards.greenhouse.io/embed/job_board?for=acme",
+        ("greenhouse", "https://boards-api.greenhouse.io/v1/boards/acme/jobs?content=true")
+    ),
+    (
+        "https://boards.greenhouse.io/embed/job_board/js?for=acme",
+        ("greenhouse", "https://boards-api.greenhouse.io/v1/boards/acme/jobs?content=true")
+    ),
+    (
+        "https://boards.greenhouse.io/embed/job_app?for=acme&token=4012345006",
+        ("greenhouse", "https://boards-api.greenhouse.io/v1/boards/acme/jobs?content=true")
+    ),
+    (
+        "https://boards.greenhouse.io/embed/job_app?token=4012345006&for=acme",
+        ("greenhouse", "https://boards-api.greenhouse.io/v1/boards/acme/jobs?content=true")
+    ),
+    (
+        "https://job-boards.eu.greenhouse.io/acme",
+        ("greenhouse", "https://boards-api.eu.greenhouse.io/v1/boards/acme/jobs?content=true")
+    ),
+    ("https://boards.greenhouse.io/embed/job_app?token=4012345006", None),
+    ("https://jobs.lever.co/acme", ("lever", "https://api.lever.co/v0/postings/acme?mode=json")),
+    ("https://jobs.eu.lever.co/acme/apply", ("lever", "https://api.eu.lever.co/v0/postings/acme?mode=json")),
+    ("https://jobs.ashbyhq.com/acme/embed", ("ashby", "https://api.ashbyhq.com/posting-api/job-board/acme")),
+    (
+        "https://apply.workable.com/acme/",
+        ("workable", "https://apply.workable.com/api/v1/widget/accounts/acme?details=true")
+    ),
+    ("https://apply.workable.com/j/4A1B2C3D4E", None),
+    ("https://acme.recruitee.com/o/backend-engineer", ("recruitee", "https://acme.recruitee.com/api/offers/")),
+    ("https://www.recruitee.com/", None),
+    ("https://acme.com/careers", None),
+])
+def test_find_ats_board(url: str, expected_board: tuple[str, str] | None):
+    assert find_ats_board(url) == expected_board
@@ -0,0 +1,357 @@
+# Standard
+import json
+import asyncio
+import tracemalloc
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Testing
+import pytest
+
+# Graph engine under test
+from graph.node import Node, MapNode, GatherNode
+from graph.scraper_graph import ScraperGraph
+from graph.compiled_graph import GraphValidationError
+from graph.checkpoints import CheckpointStore
+from graph.node_cache import CachePolicy, NodeOutputCache
+from graph.profiling import GraphProfiler
+from graph.constants.node_functions_map import NODE_NAME_TO_FUNCTION_MAP
+
+
+# Names of the executed node functions, in the order of execution
+CALLS: list[str] = []
+# Items on which the work node fails, e.g. as if the browser crashed
+FAILING_ITEMS: set[int] = set()
+
+
+def items(output_previous_node: int, **kwargs) -> list[int]:
+    CALLS.append("items")
+    return list(range(output_previous_node))
+
+
+def square(output_previous_node: int, **kwargs) -> int:
+    CALLS.append(f"square{output_previous_node}")
+    return output_previous_node ** 2
+
+
+async def square_async(output_previous_node: int, **kwargs) -> int:
+    CALLS.append(f"square_async{output_previous_node}")
+    await asyncio.sleep(0)
+    return output_previous_node ** 2
+
+
+def increment(output_previous_node: int, **kwargs) -> int:
+    CALLS.append(f"increment{output_previous_node}")
+    return output_previous_node + 1
+
+
+def work(node: Node, output_previous_node: int, **kwargs) -> int:
+    CALLS.append(f"work{output_previous_node}")
+    if output_previous_node in FAILING_ITEMS:
+        raise RuntimeError("browser crash")
+    return output_previous_node * 10
+
+
+def set_offset(node: Node, output_previous_node: int, **kwargs) -> int:
+    CALLS.append("set_offset")
+    node.context["offset"] = 100
+    return output_previous_node
+
+
+def add_offset(output_previous_node: int, offset: int, **kwargs) -> int:
+    CALLS.append("add_offset")
+    return output_previous_node + offset
+
+
+def collect(output_previous_node: list[int], **kwargs) -> list[int]:
+    CALLS.append("collect")
+    return output_previous_node
+
+
+def total(output_previous_node: list[int], **kwargs) -> int:
+    CALLS.append("total")
+    return sum(output_previous_node)
+
+
+@pytest.fixture(autouse=True)
+def node_functions(monkeypatch: pytest.MonkeyPatch):
+    """Register the node functions of the tests, as the graph only accepts registered functions."""
+    for function in (items, square, square_async, increment, work, set_offset, add_offset, collect, total):
+        monkeypatch.setitem(NODE_NAME_TO_FUNCTION_MAP, function.__name__, function)
+    CALLS.clear()
+    FAILING_ITEMS.clear()
+
+
+def build_graph(nodes: list[Node], edges: list[tuple[str, str]]) -> ScraperGraph:
+    """Graph of the nodes and the edges between node ids, starting at the first node."""
+    graph = ScraperGraph(page_driver=None, start_node_id=nodes[0].id)
+    for node in nodes:
+        graph.add_node(node)
+    for parent_node_id, child_node_id in edges:
+        graph.add_edge(graph.nodes[parent_node_id], graph.nodes[child_node_id])
+    return graph
+
+
+def branching_graph(square_function=square) -> ScraperGraph:
+    """The start node passes its input to a chain of two nodes and to a single leaf node."""
+    return build_graph(
+        nodes=[
+            Node(id="1", function=increment, static_inputs={}),
+            Node(id="2", function=square_function, static_inputs={}),
+            Node(id="3", function=increment, static_inputs={}),
+            Node(id="4", function=square_function, static_inputs={}),
+        ],
+        edges=[("1", "2"), ("2", "3"), ("1", "4")],
+    )
+
+
+def map_graph(max_parallelism: int = 1) -> ScraperGraph:
+    """The map node fans out over the items, every item is squared and incremented before the gather node sums them."""
+    return build_graph(
+        nodes=[
+            MapNode(id="1", function=items, static_inputs={}, gather_node_id="4", max_parallelism=max_parallelism),
+            Node(id="2", function=square, static_inputs={}),
+            Node(id="3", function=increment, static_inputs={}),
+            GatherNode(id="4", function=collect, static_inputs={}),
+            Node(id="5", function=total, static_inputs={}),
+        ],
+        edges=[("1", "2"), ("2", "3"), ("3", "4"), ("4", "5")],
+    )
+
+
+def test_sync_execution_returns_the_leaf_outputs_depth_first(tmp_path: Path):
+    compiled_graph = branching_graph().compile(node_cache=NodeOutputCache(disk_path=tmp_path))
+
+    # The last child is executed first
+    assert compiled_graph.execute(2) == [9, 10]
+    assert CALLS == ["increment2", "square3", "square3", "increment9"]
+
+
+@pytest.mark.parametrize("max_parallelism", [2, 4])
+def test_parallel_execution_returns_the_outputs_of_the_sync_execution(max_parallelism: int, tmp_path: Path):
+    compiled_graph = branching_graph().compile(node_cache=NodeOutputCache(disk_path=tmp_path))
+
+    assert compiled_graph.execute(2, max_parallelism=max_parallelism) == compiled_graph.execute(2) == [9, 10]
+
+
+def test_async_node_functions_are_awaited(tmp_path: Path):
+    compiled_graph = branching_graph(square_async).compile(node_cache=NodeOutputCache(disk_path=tmp_path))
+
+    # Execute switches to the concurrent scheduler for coroutine functions
+    assert compiled_graph.execute(2) == [9, 10]
+    assert asyncio.run(compiled_graph.execute_async(2, max_parallelism=2)) == [9, 10]
+    assert CALLS.count("square_async3") == 4
+
+
+def test_execute_in_a_running_event_loop_points_to_execute_async(tmp_path: Path):
+    compiled_graph = branching_graph(square_async).compile(node_cache=NodeOutputCache(disk_path=tmp_path))
+
+    async def execute_in_event_loop():
+        with pytest.raises(RuntimeError, match="await execute_async"):
+            compiled_graph.execute(2)
+        return await compiled_graph.execute_async(2)
+
+    assert asyncio.run(execute_in_event_loop()) == [9, 10]
+
+
+@pytest.mark.parametrize("max_parallelism", [1, 2])
+def test_context_set_through_the_node_is_passed_to_the_children(max_parallelism: int, tmp_path: Path):
+    graph = build_graph(
+        nodes=[
+            Node(id="1", function=set_offset, static_inputs={}),
+            Node(id="2", function=add_offset, static_inputs={}),
+        ],
+        edges=[("1", "2")],
+    )
+
+    compiled_graph = graph.compile(node_cache=NodeOutputCache(disk_path=tmp_path))
+
+    assert compiled_graph.execute(1, max_parallelism=max_parallelism) == [101]
+
+
+@pytest.mark.parametrize("max_parallelism", [1, 4])
+def test_gather_node_receives_the_outputs_in_the_order_of_the_items(max_parallelism: int, tmp_path: Path):
+    compiled_graph = map_graph(max_parallelism).compile(node_cache=NodeOutputCache(disk_path=tmp_path))
+
+    assert compiled_graph.execute(4, max_parallelism=max_parallelism) == [1 + 2 + 5 + 10]
+    assert CALLS.count("collect") == 1
+    assert CALLS.count("total") == 1
+
+
+@pytest.mark.parametrize("max_parallelism", [1, 4])
+def test_gather_node_collects_one_output_per_item_for_every_incoming_edge(max_parallelism: int, tmp_path: Path):
+    graph = build_graph(
+        nodes=[
+            MapNode(id="1", function=items, static_inputs={}, gather_node_id="4", max_parallelism=max_parallelism),
+            Node(id="2", function=square, static_inputs={}),
+            Node(id="3", function=increment, static_inputs={}),
+            GatherNode(id="4", function=collect, static_inputs={}),
+        ],
+        edges=[("1", "2"), ("1", "3"), ("2", "4"), ("3", "4")],
+    )
+    compiled_graph = graph.compile(node_cache=NodeOutputCache(disk_path=tmp_path))
+
+    # Per item the outputs of the incremented and the squared item, in the depth-first order of the children
+    assert compiled_graph.execute(3, max_parallelism=max_parallelism) == [[1, 0, 2, 1, 3, 4]]
+
+
+def test_map_branch_that_does_not_reach_the_gather_node_is_rejected():
+    graph = build_graph(
+        nodes=[
+            MapNode(id="1", function=items, static_inputs={}, gather_node_id="4"),
+            Node(id="2", function=square, static_inputs={}),
+            Node(id="3", function=increment, static_inputs={}),
+            GatherNode(id="4", function=collect, static_inputs={}),
+        ],
+        edges=[("1", "2"), ("1", "3"), ("2", "4")],
+    )
+
+    with pytest.raises(GraphValidationError, match="does not reach gather node 4"):
+        graph.compile()
+
+
+def test_unregistered_node_function_is_rejected(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delitem(NODE_NAME_TO_FUNCTION_MAP, square.__name__)
+
+    with pytest.raises(GraphValidationError):
+        branching_graph().compile()
+
+
+def test_serialize_round_trip():
+    graph = map_graph(max_parallelism=3)
+    graph.nodes["2"].cache_policy = CachePolicy(ttl_seconds=60, persist=True)
+    graph_dict: dict[str, any] = json.loads(json.dumps(graph.serialize()))
+
+    deserialized_graph = ScraperGraph.deserialize(graph_dict, page_driver=None)
+
+    assert deserialized_graph.serialize() == graph.serialize()
+    assert isinstance(deserialized_graph.nodes["1"], MapNode)
+    assert deserialized_graph.nodes["1"].max_parallelism == 3
+    assert isinstance(deserialized_graph.nodes["4"], GatherNode)
+    assert deserialized_graph.nodes["2"].cache_policy == CachePolicy(ttl_seconds=60, persist=True)
+    assert deserialized_graph.compile().graph_hash == graph.compile().graph_hash
+
+
+@pytest.mark.parametrize("max_parallelism", [1, 3])
+def test_resume_skips_the_nodes_completed_before_the_crash(max_parallelism: int, tmp_path: Path):
+    graph = build_graph(
+        nodes=[
+            MapNode(id="1", function=items, static_inputs={}, gather_node_id="3", max_parallelism=max_parallelism),
+            Node(id="2", function=work, static_inputs={}),
+            GatherNode(id="3", function=total, static_inputs={}),
+        ],
+        edges=[("1", "2"), ("2", "3")],
+    )
+    checkpoint_store = CheckpointStore(tmp_path / "checkpoints")
+    compiled_graph = graph.compile(checkpoint_store, node_cache=None)
+
+    FAILING_ITEMS.add(2)
+    with pytest.raises(RuntimeError, match="browser crash"):
+        compiled_graph.execute(4, max_parallelism=max_parallelism, run_id="run")
+
+    FAILING_ITEMS.clear()
+    CALLS.clear()
+    assert compiled_graph.resume("run", max_parallelism=max_parallelism) == [0 + 10 + 20 + 30]
+
+    # Only the crashed item and, sequentially, the items after it are executed again
+    assert "items" not in CALLS
+    assert "work0" not in CALLS and "work1" not in CALLS
+    assert "work2" in CALLS
+    assert CALLS.count("total") == 1
+
+
+def test_checkpoints_of_completed_runs_are_deleted(tmp_path: Path):
+    checkpoint_store = CheckpointStore(tmp_path / "checkpoints")
+    compiled_graph = map_graph().compile(checkpoint_store, node_cache=None)
+
+    compiled_graph.execute(3, run_id="run")
+
+    assert not (tmp_path / "checkpoints" / compiled_graph.graph_hash).exists()
+    with pytest.raises(KeyError):
+        compiled_graph.resume("run")
+
+
+def test_checkpoints_of_completed_runs_are_kept_when_configured(tmp_path: Path):
+    checkpoint_store = CheckpointStore(tmp_path / "checkpoints", keep_completed_runs=True)
+    compiled_graph = map_graph().compile(checkpoint_store, node_cache=None)
+
+    compiled_graph.execute(3, run_id="run")
+    CALLS.clear()
+
+    assert compiled_graph.resume("run") == [1 + 2 + 5]
+    assert CALLS == []
+
+
+def test_concurrent_checkpoints_of_the_same_step_do_not_interleave(tmp_path: Path):
+    checkpoint_store = CheckpointStore(tmp_path)
+    outputs: list[list[int]] = [[index] * 10_000 for index in range(16)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda output: checkpoint_store.save("graph", "run", "1", output, {}), outputs))
+
+    found, output, _ = checkpoint_store.load("graph", "run", "1")
+    assert found and output in outputs
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+@pytest.mark.parametrize("max_parallelism", [1, 4])
+def test_cached_nodes_are_not_executed_again(max_parallelism: int, tmp_path: Path):
+    graph = map_graph(max_parallelism)
+    graph.nodes["2"].cache_policy = CachePolicy()
+    node_cache = NodeOutputCache(disk_path=tmp_path)
+    compiled_graph = graph.compile(node_cache=node_cache)
+
+    compiled_graph.execute(3, max_parallelism=max_parallelism)
+    CALLS.clear()
+
+    assert compiled_graph.execute(3, max_parallelism=max_parallelism) == [1 + 2 + 5]
+    assert not any(call.startswith("square") for call in CALLS)
+    assert CALLS.count("increment0") == 1
+    assert node_cache.stats() == {"2": {"hits": 3, "misses": 3}}
+
+
+def test_persisted_cache_is_shared_across_caches(tmp_path: Path):
+    graph = map_graph()
+    graph.nodes["2"].cache_policy = CachePolicy(persist=True)
+
+    graph.compile(node_cache=NodeOutputCache(disk_path=tmp_path)).execute(3)
+    CALLS.clear()
+
+    node_cache = NodeOutputCache(disk_path=tmp_path)
+    assert graph.compile(node_cache=node_cache).execute(3) == [1 + 2 + 5]
+    assert not any(call.startswith("square") for call in CALLS)
+    assert node_cache.stats() == {"2": {"hits": 3, "misses": 0}}
+
+
+def test_expired_cached_outputs_are_executed_again(tmp_path: Path):
+    graph = map_graph()
+    graph.nodes["2"].cache_policy = CachePolicy(ttl_seconds=0)
+    compiled_graph = graph.compile(node_cache=NodeOutputCache(disk_path=tmp_path))
+
+    compiled_graph.execute(2)
+    CALLS.clear()
+    compiled_graph.execute(2)
+
+    assert CALLS.count("square0") == 1
+
+
+def test_profiler_stops_the_memory_tracing_it_started(tmp_path: Path):
+    compiled_graph = map_graph().compile(node_cache=NodeOutputCache(disk_path=tmp_path))
+
+    with GraphProfiler(track_memory=True) as profiler:
+        compiled_graph.execute(3, profiler=profiler)
+        assert tracemalloc.is_tracing()
+
+    assert not tracemalloc.is_tracing()
+    assert all(node_profile.memory_delta is not None for node_profile in profiler.profiles)
+    assert {node_summary["node_id"] for node_summary in profiler.summary()} == {"1", "2", "3", "4", "5"}
+
+
+def test_profiler_leaves_the_memory_tracing_of_others_running():
+    tracemalloc.start()
+    try:
+        with GraphProfiler(track_memory=True):
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
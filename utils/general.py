@@ -1,7 +1,11 @@
 # Standard
+import re
 import logging
 
 
+_DATE_PATTERN: re.Pattern = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
 def str_to_int(s: str) -> int | None:
     """
     Converts a string to an integer if possible, otherwise returns None.
@@ -27,6 +31,17 @@ def lst_in_batches(lst: list[any], batch_size: int = 10) -> list[list[any]]:
         yield lst[i:i + batch_size]
 
 
+def iso_date(value: any) -> str | None:
+    """
+    Date part of an ISO date or datetime, e.g. 2024-05-01T09:00:00Z becomes 2024-05-01.
+
+    :param value: Date, datetime or text starting with a date
+    :return: Date in ISO format (YYYY-MM-DD), None when the value does not start with a date
+    """
+    date_match: re.Match | None = _DATE_PATTERN.match(str(value)) if value else None
+    return date_match.group(0) if date_match else None
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     s = "123"
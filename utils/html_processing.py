@@ -1,32 +1,127 @@
 # Standard
-import logging
 import re
+import html
+import logging
+from typing import Iterable
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit, SplitResult
+
+# Url parsing
+from utils.url_parsing import get_domain_name
+
+
+# Extensions of links to webpages, links with any other extension (.css, .js, .pdf, ...) are files
+PAGE_EXTENSIONS: frozenset[str] = frozenset({"", "html", "htm", "php", "asp", "aspx", "jsp"})
+# Schemes of links to webpages, e.g. not mailto: or javascript:
+PAGE_SCHEMES: frozenset[str] = frozenset({"http", "https"})
+_TAG_PATTERN: re.Pattern = re.compile(r"<[^>]+>")
+# Whitespace left in front of punctuation by a closing inline tag, e.g. <em>operations</em>.
+_SPACE_BEFORE_PUNCTUATION_PATTERN: re.Pattern = re.compile(r" ([.,;:!?)])")
+
+
+class _HrefParser(HTMLParser):
+    """Collects the href attribute of every tag, without building a tree of the page."""
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.hrefs: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        for name, value in attrs:
+            if name == "href" and value:
+                self.hrefs.append(value)
+                return
+
+    handle_startendtag = handle_starttag
+
+
+def extract_hrefs(page_html: str) -> list[str]:
+    """
+    Extract the href of every tag on the page, in the order of the page.
+
+    :param page_html: HTML content of the webpage
+    :return: Href attribute values
+    """
+    parser = _HrefParser()
+    parser.feed(page_html)
+    parser.close()
+
+    return parser.hrefs
+
+
+def subpage_endpoint(href: str, page_url: str, page_domain: str | None = None) -> str | None:
+    """
+    Resolve the link against the page it is on and return its endpoint when it is a webpage on the same domain.
+
+    :param href: Link as found on the page, absolute or relative
+    :param page_url: URL of the page the link is on
+    :param page_domain: Domain of the page, derived from the page URL when None
+    :return: Endpoint of the link, None for links to other domains, files or other schemes
+    """
+    href = href.strip()
+    if not href or href.startswith("#"):
+        return None
+
+    # Links from the root of the domain need no resolving, these are the majority of the subpage links
+    if href.startswith("/") and not href.startswith("//"):
+        endpoint: str = href.split("#", 1)[0].split("?", 1)[0]
+    else:
+        resolved_url: str = urljoin(page_url, href)
+        parsed_url: SplitResult = urlsplit(resolved_url)
+        if parsed_url.scheme not in PAGE_SCHEMES:
+            return None
+        # The exact domain, so that e.g. earlybird.com.evil.io or linkedin.com/company/earlybird are excluded
+        if get_domain_name(resolved_url) != (page_domain or get_domain_name(page_url)):
+            return None
+        endpoint: str = parsed_url.path
+
+    # Only the last part of the path has an extension, e.g. /v1.0/about is a page
+    last_part: str = endpoint.rpartition("/")[2]
+    if "." in last_part and last_part.rpartition(".")[2].lower() not in PAGE_EXTENSIONS:
+        return None
+
+    return endpoint or None
+
+
+def find_subpage_endpoints(hrefs: Iterable[str], page_url: str) -> list[str]:
+    """
+    Classify all links of a page in a single pass: resolve them against the page, keep the webpages
+    on the same domain and remove duplicates.
+
+    :param hrefs: Links as found on the page
+    :param page_url: URL of the page the links are on
+    :return: Unique subpage endpoints, in the order they are first linked on the page
+    """
+    page_domain: str | None = get_domain_name(page_url)
+    # A dict keeps the order of the first appearance, unlike a set
+    endpoints: dict[str, None] = {}
+    for href in hrefs:
+        endpoint: str | None = subpage_endpoint(href, page_url, page_domain)
+        if endpoint:
+            endpoints[endpoint] = None
+
+    return list(endpoints)
 
 
-def is_subpage_link(link: str, endpoint: str, base_domain: str) -> bool:
+def html_to_text(snippet_html: str | None) -> str | None:
     """
-    Check if the link is a subpage link of the base domain.
+    Convert an HTML snippet, e.g. the description of a job posting, to plain text. Some sources escape the HTML twice.
 
-    :param link: Full link
-    :param endpoint: extracted endpoint from the link
-    :param base_domain: Base domain to compare the relative page link to
+    :param snippet_html: HTML snippet
+    :return: Text of the snippet, None when empty
     """
-    # Checks for any weird extensions like .css or .js
-    if not endpoint or re.match(r'.*\..*$', endpoint):
-        return False
-    # Link was already a subpage
-    if link == endpoint:
-        return True
-    # Link is a subpage
-    if base_domain in link:
-        return True
+    if not snippet_html:
+        return None
 
-    return False
+    text: str = html.unescape(_TAG_PATTERN.sub(" ", html.unescape(snippet_html)))
+    return _SPACE_BEFORE_PUNCTUATION_PATTERN.sub(r"\1", " ".join(text.split())) or None
 
 
 if __name__ == '__main__':
-    LINK: str = 'https://earlybird.com/portfolio'
-    ENDPOINT: str = '/portfolio'
-    DOMAIN: str = 'earlybird.com'
+    logging.basicConfig(level=logging.INFO)
+    PAGE_URL: str = 'https://earlybird.com/'
+    HREFS: list[str] = [
+        'https://earlybird.com/portfolio', '/team', 'news?page=2', '/static/main.css',
+        'https://www.linkedin.com/company/earlybird', 'mailto:hello@earlybird.com', '/team#partners'
+    ]
 
-    logging.info(is_subpage_link(LINK, ENDPOINT, DOMAIN))
+    logging.info(find_subpage_endpoints(HREFS, PAGE_URL))
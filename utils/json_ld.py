@@ -0,0 +1,89 @@
+# Standard
+import json
+import logging
+
+
+def load_json_ld(json_ld_blocks: list[str]) -> list[any]:
+    """
+    Parse the JSON-LD script blocks of a page, skipping invalid blocks.
+
+    :param json_ld_blocks: Content of the application/ld+json scripts of the page
+    :return: Parsed JSON-LD objects
+    """
+    json_ld_objects: list[any] = []
+    for json_ld_block in json_ld_blocks:
+        try:
+            json_ld_objects.append(json.loads(json_ld_block))
+        except json.JSONDecodeError:
+            logging.debug(f"Skipping invalid JSON-LD block: {json_ld_block[:100]}")
+
+    return json_ld_objects
+
+
+def as_list(value: any) -> list[any]:
+    """JSON-LD properties hold a single value or a list of values."""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def json_ld_nodes(json_ld: any) -> list[dict[str, any]]:
+    """
+    Flatten the JSON-LD objects of a page: lists, @graph containers and ItemList elements.
+
+    :param json_ld: Parsed JSON-LD objects
+    :return: Every node of the objects, e.g. to find the nodes of a type
+    """
+    nodes: list[dict[str, any]] = []
+    pending: list[any] = [json_ld]
+    while pending:
+        node: any = pending.pop()
+        if isinstance(node, list):
+            pending.extend(node)
+        elif isinstance(node, dict):
+            nodes.append(node)
+            pending.extend(as_list(node.get("@graph")))
+            pending.extend(as_list(node.get("itemListElement")))
+            if isinstance(node.get("item"), dict):
+                pending.append(node["item"])
+
+    return nodes
+
+
+def json_ld_location(places: any) -> str | None:
+    """
+    Readable location of a location or address property, e.g. Berlin, Germany.
+
+    :param places: Places with an address, postal addresses or addresses as text
+    :return: Location of every place, None when no place has a locality, region or country
+    """
+    locations: list[str] = []
+    for place in as_list(places):
+        # A Place holds its PostalAddress in the address property, an Organization can hold the PostalAddress itself
+        address: any = place.get("address", place) if isinstance(place, dict) else place
+        if isinstance(address, str):
+            locations.append(address)
+            continue
+        if not isinstance(address, dict):
+            continue
+
+        country: any = address.get("addressCountry")
+        country = country.get("name") if isinstance(country, dict) else country
+        parts: list[str] = [
+            str(part) for part in (address.get("addressLocality"), address.get("addressRegion"), country) if part
+        ]
+        if parts:
+            locations.append(", ".join(parts))
+
+    return "; ".join(dict.fromkeys(locations)) or None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    JSON_LD_BLOCKS: list[str] = [
+        '{"@graph": [{"@type": "Organization", "name": "Aiven", "address": {"addressLocality": "Helsinki"}}]}',
+        '{"invalid": ',
+    ]
+    for json_ld_node in json_ld_nodes(load_json_ld(JSON_LD_BLOCKS)):
+        if json_ld_node.get("@type"):
+            logging.info(f"{json_ld_node['@type']}: {json_ld_location(json_ld_node.get('address'))}")
@@ -0,0 +1,46 @@
+# Standard
+import logging
+import importlib
+import threading
+from types import ModuleType
+
+
+class _LazyModule(ModuleType):
+    """
+    Stand-in for a module which is imported on first attribute access. After the import, the attributes
+    of the module are copied onto the stand-in, so later accesses are as fast as on the module itself.
+    """
+    def __init__(self, module_name: str):
+        super().__init__(module_name)
+        self._import_lock = threading.Lock()
+
+    def __getattr__(self, attribute: str) -> any:
+        # Only called for attributes which are not set yet, i.e. until the module is imported
+        with self._import_lock:
+            module: ModuleType = importlib.import_module(self.__name__)
+            self.__dict__.update(
+                {name: value for name, value in vars(module).items() if name not in ("__name__", "__spec__")}
+            )
+
+        return getattr(module, attribute)
+
+
+def lazy_import(module_name: str) -> ModuleType:
+    """
+    Import a module on first attribute access instead of right away. Heavy dependencies (e.g. openai, playwright)
+    are imported this way, so that importing a pipeline module or starting the CLI does not pay their import time
+    when they are not used.
+
+    Type annotations must not access the module, as they are evaluated when a function is defined:
+    import the types inside an `if TYPE_CHECKING:` block and quote the annotations.
+
+    :param module_name: Absolute name of the module, e.g. playwright.async_api
+    :return: Module which is imported on first attribute access
+    """
+    return _LazyModule(module_name)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    json = lazy_import("json")
+    logging.info(json.dumps({"lazy": True}))
@@ -0,0 +1,364 @@
+# Standard
+import time
+import logging
+import threading
+from typing import Iterator
+from contextlib import contextmanager
+
+
+# Latency buckets in seconds, from a cached lookup up to a slow page load or LLM request
+DEFAULT_BUCKETS: tuple[float, ...] = (0.005, 0.025, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _label_key(labelnames: tuple[str, ...], labels: dict[str, any]) -> tuple[str, ...]:
+    """Values of the labels in the order of the label names, missing labels are empty."""
+    unknown_labels: set[str] = set(labels) - set(labelnames)
+    if unknown_labels:
+        raise ValueError(f"Unknown labels {unknown_labels}, expected {labelnames}")
+
+    return tuple(str(labels.get(labelname, "")) for labelname in labelnames)
+
+
+def _escape_label_value(value: str) -> str:
+    """Escape backslashes, quotes and newlines of a label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: tuple[str, ...], label_values: tuple[str, ...], **extra_labels) -> str:
+    """Labels in the Prometheus text format, e.g. {source="browser",status="ok"}"""
+    pairs: list[tuple[str, str]] = [*zip(labelnames, label_values), *extra_labels.items()]
+    if not pairs:
+        return ""
+
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    """Base of the metric types: a named value per combination of label values, safe to update from any thread."""
+    metric_type: str = ""
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = ()):
+        """
+        :param name: Name of the metric, e.g. scraper_pages_fetched_total
+        :param description: Description shown in the help line of the metric
+        :param labelnames: Names of the labels, e.g. ("source", "status")
+        """
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def render(self) -> list[str]:
+        """Lines of the metric in the Prometheus text format."""
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.metric_type}"]
+
+
+class Counter(_Metric):
+    """A value that only goes up, e.g. the number of fetched pages."""
+    metric_type: str = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        """
+        Increase the counter of the labels.
+
+        :param amount: Amount to increase the counter with
+        :param labels: Values of the labels
+        """
+        label_key: tuple[str, ...] = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[label_key] = self._values.get(label_key, 0) + amount
+
+    def values(self) -> dict[tuple[str, ...], float]:
+        """Value per combination of label values."""
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> list[str]:
+        return super().render() + [
+            f"{self.name}{_format_labels(self.labelnames, label_key)} {value}"
+            for label_key, value in sorted(self.values().items())
+        ]
+
+
+class Gauge(Counter):
+    """A value that goes up and down, e.g. the number of pages in flight."""
+    metric_type: str = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        """Decrease the gauge of the labels."""
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        """Set the gauge of the labels."""
+        label_key: tuple[str, ...] = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[label_key] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over buckets, e.g. the latency of page fetches."""
+    metric_type: str = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            description: str,
+            labelnames: tuple[str, ...] = (),
+            buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        """
+        :param buckets: Upper bounds of the buckets, in increasing order
+        """
+        super().__init__(name, description, labelnames)
+        self.buckets = buckets
+        # Per combination of label values: observations per bucket, sum and count of all observations
+        self._observations: dict[tuple[str, ...], tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, **labels):
+        """
+        Record an observed value.
+
+        :param value: Observed value, e.g. a duration in seconds
+        :param labels: Values of the labels
+        """
+        label_key: tuple[str, ...] = _label_key(self.labelnames, labels)
+        with self._lock:
+            bucket_counts, total, count = self._observations.get(label_key, ([0] * len(self.buckets), 0.0, 0))
+            for bucket_index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    bucket_counts[bucket_index] += 1
+                    break
+            self._observations[label_key] = (bucket_counts, total + value, count + 1)
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the duration of the block in seconds, also when it raises."""
+        start_time: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start_time, **labels)
+
+    def observations(self) -> dict[tuple[str, ...], tuple[float, int]]:
+        """Sum and count of the observations per combination of label values."""
+        with self._lock:
+            return {label_key: (total, count) for label_key, (_, total, count) in self._observations.items()}
+
+    def render(self) -> list[str]:
+        with self._lock:
+            observations: list = sorted(
+                (label_key, list(bucket_counts), total, count)
+                for label_key, (bucket_counts, total, count) in self._observations.items()
+            )
+
+        lines: list[str] = super().render()
+        for label_key, bucket_counts, total, count in observations:
+            cumulative_count: int = 0
+            for upper_bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative_count += bucket_count
+                bucket_labels: str = _format_labels(self.labelnames, label_key, le=str(upper_bound))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative_count}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, label_key, le='+Inf')} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, label_key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, label_key)} {count}")
+
+        return lines
+
+
+class MetricsRegistry:
+    """
+    In-process registry of the metrics of a scraper worker, rendered in the Prometheus text format
+    or logged as a summary at the end of a pipeline run.
+    """
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        """Register a metric, returning the registered metric when the name is already taken."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, description: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        """Create or get a counter."""
+        return self._register(Counter(name, description, labelnames))
+
+    def gauge(self, name: str, description: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        """Create or get a gauge."""
+        return self._register(Gauge(name, description, labelnames))
+
+    def histogram(
+            self,
+            name: str,
+            description: str,
+            labelnames: tuple[str, ...] = (),
+            buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Create or get a histogram."""
+        return self._register(Histogram(name, description, labelnames, buckets))
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics: list[_Metric] = list(self._metrics.values())
+
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+    def summary(self) -> dict[str, dict[str, any]]:
+        """
+        Totals of the metrics which were updated: the value of counters and gauges, the count, sum and mean
+        of histograms, per combination of label values.
+
+        :return: Totals per metric name and label values
+        """
+        with self._lock:
+            metrics: list[_Metric] = list(self._metrics.values())
+
+        metrics_summary: dict[str, dict[str, any]] = {}
+        for metric in metrics:
+            if isinstance(metric, Histogram):
+                values: dict[str, any] = {
+                    _format_labels(metric.labelnames, label_key): {
+                        "count": count, "sum": total, "mean": total / count if count else 0.0
+                    }
+                    for label_key, (total, count) in metric.observations().items()
+                }
+            else:
+                values: dict[str, any] = {
+                    _format_labels(metric.labelnames, label_key): value
+                    for label_key, value in metric.values().items()
+                }
+
+            if values:
+                metrics_summary[metric.name] = values
+
+        return metrics_summary
+
+    def log_summary(self):
+        """Log the totals of the metrics which were updated, one line per label combination."""
+        for name, values in self.summary().items():
+            for labels, value in values.items():
+                if isinstance(value, dict):
+                    logging.info(f"{name}{labels}: {value['count']} observations, mean {value['mean']:.3f}")
+                else:
+                    logging.info(f"{name}{labels}: {value:g}")
+
+
+# Registry shared by all modules of the worker process
+REGISTRY: MetricsRegistry = MetricsRegistry()
+
+# The fetch metrics are labelled by source (browser or http) and not by domain, which is unbounded
+# when the jobs pipeline fetches the pages of every company; the failures per domain are counted by ERRORS
+PAGES_FETCHED: Counter = REGISTRY.counter(
+    "scraper_pages_fetched_total", "Pages fetched by the browser or with plain HTTP requests", ("source", "status")
+)
+FETCH_LATENCY: Histogram = REGISTRY.histogram(
+    "scraper_fetch_duration_seconds", "Duration of loading (and rendering) a page", ("source",)
+)
+PAGES_IN_FLIGHT: Gauge = REGISTRY.gauge("scraper_pages_in_flight", "Pages being fetched at the moment")
+LLM_REQUESTS: Counter = REGISTRY.counter(
+    "llm_requests_total", "Requests to the LLM", ("operation", "model", "status")
+)
+LLM_TOKENS: Counter = REGISTRY.counter(
+    "llm_tokens_total", "Tokens used by the LLM requests", ("operation", "model", "kind")
+)
+LLM_LATENCY: Histogram = REGISTRY.histogram(
+    "llm_request_duration_seconds", "Duration of the LLM requests", ("operation", "model")
+)
+CACHE_REQUESTS: Counter = REGISTRY.counter("cache_requests_total", "Lookups in the caches", ("cache", "result"))
+DB_QUERIES: Counter = REGISTRY.counter("db_queries_total", "Executed database queries", ("statement", "status"))
+DB_ROWS: Counter = REGISTRY.counter(
+    "db_rows_total", "Rows affected by the plain queries and returned by the prepared statements", ("statement",)
+)
+DB_LATENCY: Histogram = REGISTRY.histogram(
+    "db_query_duration_seconds", "Duration of the database queries", ("statement",)
+)
+ERRORS: Counter = REGISTRY.counter("scraper_errors_total", "Errors per stage and domain", ("stage", "domain"))
+JOB_POSTINGS: Counter = REGISTRY.counter("job_postings_total", "Job postings scraped per source", ("source",))
+STRUCTURED_DATA: Counter = REGISTRY.counter(
+    "structured_data_extractions_total",
+    "Company pages by how much of the company their structured data and labelled investment text hold",
+    ("result",)
+)
+
+
+@contextmanager
+def track_llm_request(operation: str, model: str) -> Iterator[None]:
+    """
+    Count and time the LLM request made in the block.
+
+    :param operation: Name of the prompt, e.g. extract_company_information
+    :param model: Model of the request
+    """
+    status: str = "error"
+    try:
+        with LLM_LATENCY.time(operation=operation, model=model):
+            yield
+        status = "ok"
+    finally:
+        LLM_REQUESTS.inc(operation=operation, model=model, status=status)
+
+
+def record_llm_usage(operation: str, model: str, response: any):
+    """
+    Count the tokens of a chat completion response, responses without usage (e.g. stubs) are skipped.
+
+    :param operation: Name of the prompt, e.g. extract_company_information
+    :param model: Model of the request
+    :param response: Chat completion response
+    """
+    usage: any = getattr(response, "usage", None)
+    if usage is None:
+        return
+
+    LLM_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, operation=operation, model=model, kind="prompt")
+    LLM_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, operation=operation, model=model, kind="completion")
+
+
+def start_metrics_server(port: int = 9100, host: str = "127.0.0.1", registry: MetricsRegistry = REGISTRY):
+    """
+    Expose the metrics on http://host:port/metrics for Prometheus, from a daemon thread.
+
+    :param port: Port to listen on, 0 for a free port
+    :param host: Interface to listen on, local only by default
+    :param registry: Registry of the metrics to expose
+    :return: The running server, server.server_address holds the bound address
+    """
+    # Only imported when the metrics are served, to keep the import of the metrics fast
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class _MetricsRequestHandler(BaseHTTPRequestHandler):
+        """Serves the metrics of the registry of the server on /metrics."""
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+
+            body: bytes = self.server.registry.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), _MetricsRequestHandler)
+    server.registry = registry
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logging.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+
+    return server
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    PAGES_FETCHED.inc(source="browser", status="ok")
+    FETCH_LATENCY.observe(1.2, source="browser")
+    logging.info(REGISTRY.render_prometheus())
+    REGISTRY.log_summary()
@@ -1,24 +1,113 @@
 # Standard
+import re
 import logging
+from functools import lru_cache
 
 # URL parsing
-from urllib.parse import urlparse
+from urllib.parse import urlsplit, SplitResult
 
 
+# Number of parsed URLs kept in memory, pages and company lists repeat the same URLs many times
+URL_CACHE_SIZE: int = 2 ** 16
+
+# Public suffixes with more than one label, under which every domain belongs to a different owner.
+# Single-label suffixes (com, io, de, ...) need no list: the last label of a host is always a public suffix.
+# A subset of the public suffix list (publicsuffix.org), covering the suffixes of the scraped companies.
+PUBLIC_SUFFIXES: frozenset[str] = frozenset({
+    # Country code second-level domains
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "ltd.uk", "plc.uk", "me.uk", "net.uk",
+    "com.au", "net.au", "org.au", "edu.au", "gov.au",
+    "co.nz", "org.nz", "net.nz",
+    "co.jp", "ne.jp", "or.jp", "ac.jp",
+    "co.kr", "or.kr",
+    "com.cn", "net.cn", "org.cn",
+    "com.hk", "org.hk",
+    "com.sg", "edu.sg",
+    "com.tw", "org.tw",
+    "co.in", "net.in", "org.in", "firm.in",
+    "co.il", "org.il",
+    "co.za", "org.za",
+    "com.br", "net.br", "org.br",
+    "com.mx", "org.mx",
+    "com.ar", "com.co", "com.pe", "com.uy",
+    "com.tr", "com.pl", "com.pt", "com.es", "com.gr", "com.cy", "com.mt", "com.ua",
+    "co.at", "or.at",
+    "com.ng", "com.eg", "co.ke",
+    # Hosting platforms on which every subdomain is a separate website
+    "github.io", "gitlab.io", "herokuapp.com", "netlify.app", "vercel.app", "pages.dev", "web.app",
+    "firebaseapp.com", "webflow.io", "framer.website", "framer.ai", "notion.site", "carrd.co", "wixsite.com",
+    "squarespace.com", "azurewebsites.net", "cloudfront.net", "blogspot.com", "wordpress.com", "substack.com",
+})
+
+# Host after the scheme and credentials, until the port, path, query or fragment. IPv6 hosts are in brackets.
+_HOST_PATTERN: re.Pattern = re.compile(
+    r"(?:[a-z][a-z0-9+.-]*:)?//(?:[^/?#@]*@)?(?:\[([^\]/?#@]*)\]|([^/?#@:\[\]]*))", re.IGNORECASE
+)
+# A host without scheme has a dot before the port or path, e.g. example.com:8080/portfolio,
+# but not /portfolio or mailto:name@example.com. The empty first group puts the host in the second group, as above.
+_SCHEMELESS_HOST_PATTERN: re.Pattern = re.compile(r"()([^/?#:@.][^/?#:@]*\.[^/?#:@]*)(?=[:/?#]|$)")
+
+
+def _host_of(url: str) -> str | None:
+    """Lowercase host of the URL without port and credentials, URLs without a scheme (example.com/path) included."""
+    # Equivalent to urlsplit(url).hostname, but without splitting the path, query and fragment
+    host_match: re.Match | None = _HOST_PATTERN.match(url) or _SCHEMELESS_HOST_PATTERN.match(url)
+    if not host_match:
+        return None
+
+    # The first group is an IPv6 host, the second any other host.
+    # A fully qualified host ends with a dot, example.com. is the same host as example.com
+    host: str = host_match.group(1) or host_match.group(2)
+    return host.lower().rstrip(".") or None
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
 def get_domain_name(url: str | None) -> str | None:
     """
-    Extracts the domain name from the URL. This excludes the subdomains and the path.
+    Extracts the domain name from the URL: the lowercase host without a www. prefix, port or path.
+    The domain of a URL without scheme is extracted as well, e.g. example.com/portfolio.
 
-    :param url: URL to extract the base domain from
-    :return: Base domain of the URL
+    :param url: URL to extract the domain from
+    :return: Domain of the URL, None if the URL has no domain
     """
     if not url:
         return None
 
-    parsed_url = urlparse(url)
-    return parsed_url.netloc.strip("www.") if parsed_url.netloc else None
+    host: str | None = _host_of(url.strip())
+    if host and host.startswith("www."):
+        host = host[len("www."):]
+
+    return host or None
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def get_registrable_domain(url: str | None) -> str | None:
+    """
+    Extracts the registrable domain from the URL: the public suffix plus one label, e.g. app.example.co.uk
+    becomes example.co.uk. Every website of the same owner has the same registrable domain, so it is
+    the canonical key to deduplicate companies on.
+
+    :param url: URL to extract the registrable domain from
+    :return: Registrable domain of the URL, None if the URL has no domain
+    """
+    domain: str | None = get_domain_name(url)
+    if not domain:
+        return None
+
+    labels: list[str] = domain.split(".")
+    # IP addresses and single-label hosts have no public suffix
+    if len(labels) < 2 or labels[-1].isdigit():
+        return domain
+
+    # The longest public suffix that leaves a label for the owner
+    for suffix_length in (3, 2):
+        if len(labels) > suffix_length and ".".join(labels[-suffix_length:]) in PUBLIC_SUFFIXES:
+            return ".".join(labels[-suffix_length - 1:])
+
+    return ".".join(labels[-2:])
 
 
+@lru_cache(maxsize=URL_CACHE_SIZE)
 def get_endpoint(url: str | None) -> str | None:
     """
     Extracts the endpoint from the URL. This excludes any parameters of the URL.
@@ -29,7 +118,7 @@ def get_endpoint(url: str | None) -> str | None:
     if not url:
         return None
 
-    parsed_url = urlparse(url)
+    parsed_url: SplitResult = urlsplit(url)
     return parsed_url.path
 
 
@@ -38,6 +127,8 @@ if __name__ == "__main__":
     url = "https://www.example.com/path/to/page"
     logging.info(f"Domain name: {get_domain_name(url)}")
 
+    url = "https://app.example.co.uk/path/to/page"
+    logging.info(f"Registrable domain: {get_registrable_domain(url)}")
+
     url = "https://www.example.com/path/to/page?param1=value1&param2=value2"
     logging.info(f"Endpoint: {get_endpoint(url)}")
-